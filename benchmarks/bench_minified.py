@@ -0,0 +1,35 @@
+"""
+Throughput of a single-line minified bundle vs. the same code split into ordinary lines.
+
+Usage: python benchmarks/bench_minified.py [size_mb]
+"""
+import sys
+import time
+from jsleak.scanner import Scanner
+
+CHUNK = (
+    'var a=function(e){return e.map(function(t){return t*2})};'
+    'fetch("https://api.example.com/v1/items?id=1");'
+    'var k="AKIA1234567890123456";'
+    'var p="/api/v2/user";'
+)
+
+def build(size_mb: int, sep: str) -> str:
+    count = (size_mb * 1024 * 1024) // (len(CHUNK) + len(sep))
+    return sep.join([CHUNK] * count)
+
+def run(label: str, content: str, scanner: Scanner):
+    start = time.perf_counter()
+    result = scanner.scan(content)
+    elapsed = time.perf_counter() - start
+    mb = len(content) / (1024 * 1024)
+    print(f"{label:<12} {mb:6.1f} MB  {elapsed:7.3f}s  {mb / elapsed:7.1f} MB/s  "
+          f"{len(result.matches)} secrets, {len(result.endpoint_matches)} endpoints")
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    run("multi-line", build(size_mb, "\n"), Scanner())
+    run("minified", build(size_mb, ""), Scanner(context_size=40))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Memory and throughput of the scan -> filter -> report result path on a URL-heavy corpus.
+
+Results are kept for every file, so the peak includes the per-finding
+objects that would live until reporting. Retained memory is split between
+the endpoint indexes (the URLs themselves, most of it on this corpus) and
+the match records, and the per-finding dicts the records replace are built
+afterwards to measure what they would cost.
+
+Usage: python benchmarks/bench_result_path.py [files] [urls_per_file]
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+import tracemalloc
+from jsleak.directory import scan_directory
+from jsleak.sarif import generate_sarif
+
+def build(path: str, files: int, urls: int):
+    for i in range(files):
+        lines = []
+        for j in range(urls):
+            lines.append(f'fetch("https://cdn{j % 50}.example.com/v1/assets/{i}/{j}?x=1");')
+            if j % 10 == 0:
+                lines.append(f'var k{j} = "AKIA{i:08d}{j:08d}";')
+        with open(os.path.join(path, f"bundle{i}.js"), "w") as f:
+            f.write("\n".join(lines))
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    urls = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    path = tempfile.mkdtemp()
+    try:
+        build(path, files, urls)
+        scanned = elapsed = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            results = list(scan_directory(path))
+            scanned = min(scanned, time.perf_counter() - start)
+            generate_sarif(results)
+            elapsed = min(elapsed, time.perf_counter() - start)
+            findings = sum(len(r["matches"]) for r in results)
+            del results
+
+        # Separate run for memory, tracemalloc slows allocation down considerably
+        tracemalloc.start()
+        results = list(scan_directory(path))
+        retained, peak = tracemalloc.get_traced_memory()
+        endpoints = sum(stat.size for stat in tracemalloc.take_snapshot().statistics("filename")
+                        if stat.traceback[0].filename.endswith("endpoints.py"))
+        dicts = [[m.to_dict() for m in res["matches"]] + [res["secrets"]] for res in results]
+        legacy = tracemalloc.get_traced_memory()[0] - retained
+        tracemalloc.stop()
+        mb = 1024 * 1024
+        print(f"{files} files, {files * urls} urls, {findings} secrets")
+        print(f"scan {scanned:.3f}s  scan+sarif {elapsed:.3f}s (best of 3)")
+        print(f"retained {retained / mb:.1f} MB (endpoint indexes {endpoints / mb:.1f} MB, "
+              f"matches and the rest {(retained - endpoints) / mb:.1f} MB)  peak {peak / mb:.1f} MB")
+        print(f"per-finding and legacy secrets dicts, no longer built: +{legacy / mb:.1f} MB")
+        del dicts
+    finally:
+        shutil.rmtree(path)
+
+if __name__ == "__main__":
+    main()
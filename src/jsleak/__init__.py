@@ -2,7 +2,8 @@
 
 __version__ = "0.5.11"
 
-from .scanner import scan_content, ScanResult
+from .scanner import scan_content, ScanResult, Scanner, BatchResult
+from .decoder import Decoder
 from .fetcher import get_content
 
-__all__ = ["scan_content", "ScanResult", "get_content", "__version__"]
+__all__ = ["scan_content", "ScanResult", "Scanner", "BatchResult", "Decoder", "get_content", "__version__"]
@@ -1,7 +1,9 @@
 import json
+import sqlite3
 import hashlib
 from typing import Set, Dict, List, Any, Optional
 import os
+from .store import StoreReader, StoreError, is_store
 
 class BaselineManager:
     def __init__(self, baseline_path: Optional[str]):
@@ -11,6 +13,17 @@ class BaselineManager:
             self._load_baseline()
 
     def _load_baseline(self):
+        if is_store(self.baseline_path):
+            # A findings store (--store) is a baseline of everything it recorded
+            try:
+                reader = StoreReader(self.baseline_path)
+                try:
+                    self.signatures = reader.signatures()
+                finally:
+                    reader.close()
+            except (StoreError, sqlite3.DatabaseError):
+                pass
+            return
         try:
             with open(self.baseline_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
@@ -42,6 +55,8 @@ class BaselineManager:
         return hashlib.sha256(key.encode('utf-8')).hexdigest()
 
     def should_ignore(self, match: Dict[str, Any], file_path: str) -> bool:
+        if not self.signatures:
+            return False
         sig = self.generate_signature(match, file_path)
         return sig in self.signatures
 
@@ -0,0 +1,162 @@
+"""
+Checkpoint journal for resumable scans.
+
+Completed per-file results are appended to a JSON lines file as the scan goes,
+before any config or baseline filtering, so a resumed run replays them through
+the same reporting path and ends with the same report, stats and exit code as
+an uninterrupted one. The journal holds unmasked secret values and is created
+readable by its owner only.
+"""
+import json
+import os
+import time
+from typing import Any, Dict, Iterator, Set, Tuple
+from .scanner import SecretMatch, Location
+from .endpoints import EndpointIndex
+from .directory import FileResult
+
+JOURNAL_VERSION = 3
+
+class CheckpointError(Exception):
+    """Raised when a checkpoint cannot be read or belongs to a different scan."""
+    pass
+
+def result_key(res: Dict[str, Any]) -> str:
+    """
+    Identifies a scanned item: the blob for history results, the body digest
+    for HAR results (several entries may share a URL), else the path.
+    """
+    if res.get("blob"):
+        return res["blob"]
+    if res.get("mime_type") is not None:
+        return res["content_hash"]
+    return res["file"]
+
+def _encode(res: Dict[str, Any]) -> Dict[str, Any]:
+    record = {"file": res["file"], "error": res.get("error")}
+    for key in ("commit", "blob", "content_hash", "mime_type"):
+        if res.get(key) is not None:
+            record[key] = res[key]
+    record["matches"] = [
+        [m.type, m.value, m.severity, m.confidence, m.line, m.column, m.index, m.byte_offset, m.context,
+         m.syntax, m.encoding]
+        for m in res.get("matches", [])
+    ]
+    index = res.get("endpoint_index")
+    if index is not None:
+        record["endpoints"] = [[t, v, c] for t, v, c in index]
+        record["endpoints_cap"] = index.max_endpoints
+        record["endpoints_dropped"] = index.dropped
+    return record
+
+def _decode(record: Dict[str, Any]) -> FileResult:
+    res = FileResult(file=record["file"], error=record.get("error"))
+    for key in ("commit", "blob", "content_hash", "mime_type"):
+        if key in record:
+            res[key] = record[key]
+    res["matches"] = [
+        SecretMatch(t, v, sev, conf, Location(line, column, index, byte_offset), context, syntax, encoding)
+        for t, v, sev, conf, line, column, index, byte_offset, context, syntax, encoding in record["matches"]
+    ]
+    if "endpoints" in record:
+        index = EndpointIndex(record.get("endpoints_cap"))
+        for endpoint_type, value, count in record["endpoints"]:
+            index.add(endpoint_type, value, count)
+        index.dropped = record.get("endpoints_dropped", 0)
+        index.total += index.dropped
+        res["endpoint_index"] = index
+    return res
+
+class CheckpointJournal:
+    """
+    Append-only journal of completed results.
+
+    ``scan`` describes the scan (target and result-affecting options); resuming
+    a journal written for a different scan raises ``CheckpointError``. Writes
+    are flushed per record and fsynced at most every ``sync_interval`` seconds
+    or ``sync_every`` records, so a crash loses at most that window.
+    """
+
+    def __init__(self, path: str, scan: Dict[str, Any], resume: bool = False,
+                 sync_every: int = 256, sync_interval: float = 1.0):
+        self.path = path
+        # Compared with the journal header, so normalize tuples and the like the same way
+        self.scan = json.loads(json.dumps(scan))
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        # Keys of journaled results; the records themselves are re-read by replay()
+        self.completed: Set[str] = set()
+        self._resumed_size = 0
+        good_size = 0
+        if resume and os.path.exists(path):
+            good_size = self._resumed_size = self._load()
+        # Drops a record torn by the interruption (or the old journal without --resume)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT, 0o600)
+        os.ftruncate(fd, good_size)
+        self._file = os.fdopen(fd, "ab")
+        if not good_size:
+            self._write({"jsleak_checkpoint": JOURNAL_VERSION, "scan": self.scan})
+            self._sync()
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def _iter_records(self, f) -> Iterator[Tuple[Dict[str, Any], int]]:
+        for line in f:
+            if not line.endswith(b"\n"):
+                return
+            try:
+                record = json.loads(line)
+            except ValueError:
+                return
+            yield record, len(line)
+
+    def _load(self) -> int:
+        with open(self.path, "rb") as f:
+            header_line = f.readline()
+            try:
+                header = json.loads(header_line)
+            except ValueError:
+                return 0
+            if header.get("jsleak_checkpoint") != JOURNAL_VERSION:
+                raise CheckpointError(f"{self.path} is not a jsleak checkpoint")
+            if header.get("scan") != self.scan:
+                raise CheckpointError(f"{self.path} was written for a different scan, remove it or drop --resume")
+            good_size = len(header_line)
+            for record, size in self._iter_records(f):
+                self.completed.add(result_key(record))
+                good_size += size
+        return good_size
+
+    def replay(self) -> Iterator[FileResult]:
+        """Yields the results journaled before this run, in the order they were completed."""
+        if not self._resumed_size:
+            return
+        with open(self.path, "rb") as f:
+            remaining = self._resumed_size - len(f.readline())
+            for record, size in self._iter_records(f):
+                if remaining <= 0:
+                    break
+                remaining -= size
+                yield _decode(record)
+
+    def _write(self, record: Dict[str, Any]):
+        self._file.write(json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n")
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def append(self, res: Dict[str, Any]):
+        self._write(_encode(res))
+        self._file.flush()
+        self._pending += 1
+        now = time.monotonic()
+        if self._pending >= self.sync_every or now - self._last_sync >= self.sync_interval:
+            os.fsync(self._file.fileno())
+            self._pending = 0
+            self._last_sync = now
+
+    def close(self):
+        if not self._file.closed:
+            self._sync()
+            self._file.close()
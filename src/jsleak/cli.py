@@ -2,19 +2,394 @@ import argparse
 import sys
 import json
 import os
+import sqlite3
 import time
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from .fetcher import get_content, FetcherError
-from .scanner import scan_content
+from .scanner import Scanner
+from .decoder import Decoder
+from .rules import RuleSet, load_rules, RuleError
+from .engines import ENGINES, AUTO, RE, available_engines, benchmark_rules, compile_rules, is_installed
+from .filetypes import BUILTIN_FILE_TYPES, ALL, resolve_file_types, FileTypeError
 from .pattern_utils import get_severity, get_default_confidence
-from .directory import scan_directory
+from .directory import scan_directory, scan_file, select_files, discover_files, is_scannable, FileResult
 from .ignorer import Ignorer
 from .config import load_config
 from .version import __version__
-from .reporter import Reporter, Colors
+from .reporter import Reporter, Colors, SEVERITY_RANK
 from .baseline_manager import BaselineManager
+from .merge import merge_reports, MergeError
+from .endpoints import EndpointIndex
+from .watcher import WatchSession, create_watcher
+from .history import scan_history
+from .har import scan_har, HarError, DEFAULT_MIME_TYPES
+from .git import GitError
+from .store import FindingsStore, StoreReader, StoreError, fingerprint
+from .checkpoint import CheckpointJournal, CheckpointError
+from .pipeline import READ_AHEAD_WORKERS
+from .schedule import Coverage, Deadline, prioritize, scan_plan
+from .metrics import Metrics, serve_metrics
+from .memory import MemoryBudget
+from . import trace
+
+# Scan stopped at --max-time before covering every file
+EXIT_INCOMPLETE = 4
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parses ``INDEX/COUNT`` (1-based index) for ``--shard``."""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid shard '{value}', expected INDEX/COUNT")
+    if count < 1 or not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"invalid shard '{value}', INDEX must be between 1 and COUNT")
+    return index, count
+
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+def parse_size(value: str) -> int:
+    """Parses a byte size for ``--max-memory``: a number with an optional K, M or G (KiB, MiB, GiB) suffix."""
+    text = value.strip().upper()
+    for suffix in ("IB", "B"):
+        if text.endswith(suffix) and text[:-len(suffix)][-1:] in ("K", "M", "G"):
+            text = text[:-len(suffix)]
+            break
+    unit = text[-1:] if text[-1:] in SIZE_UNITS else ""
+    try:
+        size = int(float(text[:len(text) - len(unit)]) * SIZE_UNITS[unit])
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size '{value}', expected e.g. 512M or 2G")
+    if size <= 0:
+        raise argparse.ArgumentTypeError(f"invalid size '{value}', must be positive")
+    return size
+
+def parse_file_types(value: str) -> List[str]:
+    """Parses the comma-separated names of ``--file-types``."""
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    if not names:
+        raise argparse.ArgumentTypeError("expected comma-separated file type names")
+    return names
+
+def severity_exit_code(secrets_by_severity: Dict[str, int], fail_sev: Optional[str]) -> int:
+    """
+    0 -> no secrets
+    1 -> secrets found below fail threshold (or no threshold set)
+    2 -> secrets found meeting or exceeding fail threshold
+    """
+    if not any(secrets_by_severity.values()):
+        return 0
+    if fail_sev:
+        threshold_val = SEVERITY_RANK.get(fail_sev, 100)
+        for sev, count in secrets_by_severity.items():
+            if count and SEVERITY_RANK.get(sev, 0) >= threshold_val:
+                return 2
+    return 1
+
+def filter_matches(matches: List[Any], file_path: str, config, baseline_mgr: BaselineManager) -> List[Any]:
+    """
+    Drops findings excluded by config or present in the baseline.
+    """
+    filtered_matches = []
+    for m in matches:
+         # Config Excludes
+         if m["type"] in config.exclude_secrets:
+             continue
+         
+         # Baseline Check
+         if baseline_mgr.should_ignore(m, file_path):
+             continue
+
+         filtered_matches.append(m)
+    return filtered_matches
+
+def config_rules(paths: Optional[List[str]], config) -> RuleSet:
+    """Loads the ``--rules`` packs plus the config's rule packs and inline rules. Raises ``RuleError``."""
+    return load_rules(list(paths or []) + config.rule_packs, config.rules)
+
+def merge_main(argv: List[str]):
+    parser = argparse.ArgumentParser(
+        prog="jsleak merge",
+        description="Merge per-shard jsleak JSON or SARIF reports into one report."
+    )
+    parser.add_argument("reports", nargs="+", help="Shard report files (all JSON or all SARIF).")
+    parser.add_argument(
+        "--config",
+        help="Path to configuration file (default: .jsleak.yml)",
+        default=".jsleak.yml"
+    )
+    parser.add_argument(
+        "--fail-on-severity",
+        choices=["LOW", "MEDIUM", "HIGH", "CRITICAL"],
+        help="Override config failure threshold."
+    )
+    parser.add_argument(
+        "--stats-only",
+        action="store_true",
+        help="Show only the unified statistics."
+    )
+    args = parser.parse_args(argv)
+    config = load_config(args.config)
+
+    try:
+        stats = merge_reports(args.reports, None if args.stats_only else sys.stdout)
+    except (MergeError, OSError) as e:
+        print(Colors.colorize(f"ERROR: {e}", Colors.RED), file=sys.stderr)
+        sys.exit(3)
+
+    if args.stats_only:
+        Reporter("stats").report([], stats)
+
+    fail_sev = args.fail_on_severity if args.fail_on_severity else config.fail_on_severity
+    sys.exit(severity_exit_code(stats["secrets_by_severity"], fail_sev))
+
+def query_main(argv: List[str]):
+    parser = argparse.ArgumentParser(
+        prog="jsleak query",
+        description="Query a findings store written with --store."
+    )
+    parser.add_argument("store", help="Path to the SQLite store.")
+    queries = parser.add_subparsers(dest="query", required=True)
+    queries.add_parser("runs", help="List recorded runs.")
+    new_parser = queries.add_parser("new", help="Findings of a run that no earlier run had.")
+    new_parser.add_argument("--since", required=True, help="Run id, or ISO date/time (runs started before it).")
+    new_parser.add_argument("--run", type=int, help="Run to report (default: latest).")
+    fp_parser = queries.add_parser("fingerprint", help="Every occurrence of a secret, oldest run first.")
+    fp_parser.add_argument("fingerprint", nargs="?", help="Finding fingerprint (SHA-256 of 'type:value').")
+    fp_parser.add_argument("--type", help="Secret type, with --value, to compute the fingerprint.")
+    fp_parser.add_argument("--value", help="Secret value, with --type, to compute the fingerprint.")
+    host_parser = queries.add_parser("host", help="Endpoints on a host across all recorded targets.")
+    host_parser.add_argument("host", help="Host (and port), e.g. api.example.com")
+    args = parser.parse_args(argv)
+
+    try:
+        reader = StoreReader(args.store)
+        try:
+            if args.query == "runs":
+                rows = reader.runs()
+            elif args.query == "new":
+                rows = reader.new_since(reader.resolve_run(args.since), args.run)
+            elif args.query == "fingerprint":
+                if args.fingerprint:
+                    value = args.fingerprint
+                elif args.type and args.value:
+                    value = fingerprint(args.type, args.value)
+                else:
+                    parser.error("fingerprint needs a FINGERPRINT or --type and --value")
+                rows = reader.by_fingerprint(value)
+            else:
+                rows = reader.by_host(args.host)
+        finally:
+            reader.close()
+    except (StoreError, sqlite3.DatabaseError) as e:
+        print(Colors.colorize(f"ERROR: {e}", Colors.RED), file=sys.stderr)
+        sys.exit(3)
+
+    print(json.dumps(rows, indent=2))
+    sys.exit(0)
+
+def bench_main(argv: List[str]):
+    parser = argparse.ArgumentParser(
+        prog="jsleak bench",
+        description="Time every rule on each installed regex engine and check that all engines find the same matches."
+    )
+    parser.add_argument("paths", nargs="+", help="Files or directories (scanned recursively, minified bundles included).")
+    parser.add_argument(
+        "--engine",
+        action="append",
+        choices=ENGINES,
+        help="Engine to benchmark (repeatable, default: every installed engine)."
+    )
+    parser.add_argument(
+        "--rules",
+        action="append",
+        metavar="PATH",
+        help="Also benchmark the rules of a rule pack file or directory (repeatable)."
+    )
+    parser.add_argument("--repeat", type=int, default=3, metavar="N", help="Runs per rule; the best is reported (default: 3).")
+    parser.add_argument("--format", choices=["text", "json"], default="text", help="Output format (default: text).")
+    args = parser.parse_args(argv)
+
+    files = []
+    for path in args.paths:
+        files.extend(discover_files(path, True, True) if os.path.isdir(path) else [path])
+    try:
+        rules = load_rules(args.rules or [])
+        contents = [get_content(path) for path in files]
+    except (RuleError, FetcherError) as e:
+        print(Colors.colorize(f"ERROR: {e}", Colors.RED), file=sys.stderr)
+        sys.exit(3)
+    for engine in args.engine or []:
+        if not is_installed(engine):
+            print(f"WARNING: regex engine '{engine}' is not installed, skipping it", file=sys.stderr)
+
+    timings = benchmark_rules(contents, args.engine, args.repeat, rules)
+    if args.format == "json":
+        print(json.dumps({
+            "files": len(files),
+            "bytes": sum(len(c) for c in contents),
+            "engines": {e: {"fallbacks": list(compile_rules(e, rules=rules).fallbacks)} for e in available_engines()
+                        if not args.engine or e in args.engine},
+            "rules": [t._asdict() for t in timings]
+        }, indent=2))
+    else:
+        print(f"{len(files)} files, {sum(len(c) for c in contents)} characters")
+        print(f"{'RULE':<24} {'ENGINE':<7} {'MS':>10} {'MATCHES':>8}  SAME AS re")
+        for t in timings:
+            fallback = " (runs on re)" if t.rule in compile_rules(t.engine, rules=rules).fallbacks else ""
+            print(f"{t.rule:<24} {t.engine:<7} {t.seconds * 1000:>10.2f} {t.matches:>8}  "
+                  f"{'yes' if t.identical else 'NO'}{fallback}")
+    sys.exit(0 if all(t.identical for t in timings) else 1)
+
+def watch_main(argv: List[str]):
+    parser = argparse.ArgumentParser(
+        prog="jsleak watch",
+        description="Scan a tree once, then rescan changed files and report new or resolved findings."
+    )
+    parser.add_argument("target", help="File or directory to watch.")
+    parser.add_argument("--recursive", "-r", action="store_true", help="Watch directories recursively.")
+    parser.add_argument("--include-minified", action="store_true", help="Also scan minified bundles (*.min.js).")
+    parser.add_argument(
+        "--config",
+        help="Path to configuration file (default: .jsleak.yml)",
+        default=".jsleak.yml"
+    )
+    parser.add_argument("--baseline", help="Path to baseline JSON file to ignore known findings.")
+    parser.add_argument(
+        "--rules",
+        action="append",
+        metavar="PATH",
+        help="Load a rule pack file, or every *.yml/*.yaml pack in a directory (repeatable)."
+    )
+    parser.add_argument(
+        "--file-types",
+        type=parse_file_types,
+        metavar="NAMES",
+        help="Comma-separated file types to watch (default: js, or file_types in the config)."
+    )
+    parser.add_argument("--poll", action="store_true", help="Poll file stats instead of using inotify.")
+    parser.add_argument("--interval", type=float, default=1.0, help="Polling interval in seconds (default: 1.0).")
+    parser.add_argument("--debounce", type=float, default=0.3, help="Quiet period that ends a burst of changes (default: 0.3).")
+    parser.add_argument("--show-secrets", action="store_true", help="Show full secret values (overrides masking).")
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        metavar="PORT",
+        help="Serve OpenMetrics scan metrics at http://127.0.0.1:PORT/metrics."
+    )
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.target):
+        print(Colors.colorize(f"ERROR: Path not found: {args.target}", Colors.RED), file=sys.stderr)
+        sys.exit(3)
+
+    ignore_path = ".jsleakignore"
+    state = {}
+
+    def load():
+        state["config"] = load_config(args.config)
+        try:
+            rules = config_rules(args.rules, state["config"])
+            state["file_types"] = resolve_file_types(args.file_types, state["config"].file_types, rules)
+            state["rules"] = rules
+        except (RuleError, FileTypeError) as e:
+            print(Colors.colorize(f"ERROR: {e}", Colors.RED), file=sys.stderr)
+            if "ignorer" not in state:
+                sys.exit(3)
+            # A broken edit keeps the rules and file types that were loaded before
+        state["ignorer"] = Ignorer(ignore_path)
+        state["baseline"] = BaselineManager(args.baseline if args.baseline else state["config"].baseline_path)
+        state["reporter"] = Reporter(
+            "text",
+            show_secrets=args.show_secrets,
+            redact_strategy=state["config"].redact_secrets,
+            no_color=bool(os.getenv("NO_COLOR") or os.getenv("CI"))
+        )
+
+    load()
+    root = os.path.abspath(args.target)
+    root_is_dir = os.path.isdir(args.target)
+
+    def in_scope(path: str) -> bool:
+        full = os.path.abspath(path)
+        if not root_is_dir:
+            return full == root
+        if not is_scannable(os.path.basename(full), args.include_minified, state["file_types"]):
+            return False
+        parent = os.path.dirname(full)
+        return parent == root or (args.recursive and parent.startswith(root + os.sep))
+
+    def list_files():
+        return [f for f in discover_files(args.target, args.recursive, args.include_minified, state["file_types"])
+                if not state["ignorer"].should_ignore_file(f)]
+
+    metrics = Metrics() if args.metrics_port is not None else None
+
+    def scan(path):
+        if not in_scope(path) or not os.path.isfile(path) or state["ignorer"].should_ignore_file(path):
+            return None
+        res = scan_file(path, state["ignorer"], file_types=state["file_types"], rules=state["rules"])
+        report_start = time.perf_counter()
+        if res["error"]:
+            print(Colors.colorize(f"[ERROR] {path}: {res['error']}", Colors.RED), file=sys.stderr)
+            matches = []
+        else:
+            matches = filter_matches(res["matches"], path, state["config"], state["baseline"])
+        if metrics is not None:
+            metrics.observe_result(res, time.perf_counter() - report_start, len(matches))
+        return matches
+
+    def on_diff(path, new_matches, resolved):
+        reporter = state["reporter"]
+        for m in new_matches:
+            line = f"[+] {path}:{m.line}:{m.column} {m.type} [{m.severity}] {reporter.mask_secret(m.value)}"
+            print(Colors.colorize(line, Colors.RED, reporter.no_color))
+        for secret_type, value in resolved:
+            line = f"[-] {path} {secret_type} {reporter.mask_secret(value)}"
+            print(Colors.colorize(line, Colors.GREEN, reporter.no_color))
+        sys.stdout.flush()
+
+    control_files = [ignore_path, args.config] + [p for p in (args.baseline or state["config"].baseline_path,) if p]
+    session = WatchSession(scan, list_files, on_diff, reload=load, control_files=control_files)
+    server = None
+    if metrics is not None:
+        try:
+            server = serve_metrics(metrics, args.metrics_port)
+        except OSError as e:
+            print(Colors.colorize(f"ERROR: Cannot serve metrics on port {args.metrics_port}: {e}", Colors.RED), file=sys.stderr)
+            sys.exit(3)
+    session.initial_scan()
+    watcher = create_watcher(
+        args.target, args.recursive, control_files,
+        backend="poll" if args.poll else "auto",
+        interval=args.interval,
+        include=lambda name: is_scannable(name, args.include_minified, state["file_types"])
+    )
+    print(Colors.colorize(
+        f"Watching {args.target} ({len(session.findings)} files, {session.finding_count} findings) - Ctrl+C to stop",
+        Colors.BLUE, state["reporter"].no_color
+    ))
+    sys.stdout.flush()
+    try:
+        session.run(watcher, args.debounce)
+    except KeyboardInterrupt:
+        sys.exit(130)
+    finally:
+        watcher.close()
+        if server is not None:
+            server.shutdown()
+
+def main(argv: Optional[List[str]] = None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] == "merge":
+        return merge_main(argv[1:])
+    if argv and argv[0] == "watch":
+        return watch_main(argv[1:])
+    if argv and argv[0] == "query":
+        return query_main(argv[1:])
+    if argv and argv[0] == "bench":
+        return bench_main(argv[1:])
 
-def main():
     parser = argparse.ArgumentParser(
         description="jsleak: A professional scanner for exposing secrets and endpoints in JavaScript files.",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -25,6 +400,14 @@ Examples:
   jsleak https://example.com/app.js --show-secrets
   jsleak ./src --stats-only
   jsleak ./src --baseline baseline.json
+  jsleak ./src -r --shard 1/4 --format json > shard1.json
+  jsleak merge shard1.json shard2.json shard3.json shard4.json
+  jsleak watch ./src -r
+  jsleak . --git-history --git-ref main --jobs 4
+  jsleak session.har --har --har-mime html
+  jsleak ./src -r --store findings.db
+  jsleak query findings.db new --since 2026-01-01
+  jsleak bench ./dist --format json
 """
     )
 
@@ -47,11 +430,127 @@ Examples:
         action="store_true",
         help="Recursively scan directories."
     )
+    scan_group.add_argument(
+        "--include-minified",
+        action="store_true",
+        help="Also scan minified bundles (*.min.js), reporting context snippets and byte offsets."
+    )
+    scan_group.add_argument(
+        "--shard",
+        type=parse_shard,
+        metavar="INDEX/COUNT",
+        help="Only scan files assigned to this shard (1-based) by path hash."
+    )
+    scan_group.add_argument(
+        "--git-tracked",
+        action="store_true",
+        help="List files from the git index instead of walking directories (respects .gitignore)."
+    )
+    scan_group.add_argument(
+        "--git-untracked",
+        action="store_true",
+        help="Also scan untracked files that are not ignored (implies --git-tracked)."
+    )
+    scan_group.add_argument(
+        "--git-history",
+        action="store_true",
+        help="Scan every JS blob in the git history of the target repository instead of the working tree."
+    )
+    scan_group.add_argument(
+        "--git-ref",
+        action="append",
+        metavar="REF",
+        help="Ref whose history --git-history scans (repeatable, default: HEAD)."
+    )
+    scan_group.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Worker processes for --git-history and --har scans (default: 1)."
+    )
+    scan_group.add_argument(
+        "--read-ahead",
+        type=int,
+        default=READ_AHEAD_WORKERS,
+        metavar="N",
+        help=f"Threads reading the next files while one is scanned, 0 to read sequentially (default: {READ_AHEAD_WORKERS})."
+    )
+    scan_group.add_argument(
+        "--max-memory",
+        type=parse_size,
+        metavar="SIZE",
+        help="Keep the scan within SIZE of memory (e.g. 512M, 2G): limits files in flight and workers, "
+             "scans larger files in chunks."
+    )
+    scan_group.add_argument(
+        "--file-types",
+        type=parse_file_types,
+        metavar="NAMES",
+        help=f"Comma-separated file types to scan, each with its own extractor and rules: "
+             f"{', '.join(BUILTIN_FILE_TYPES)} or {ALL} (default: js, or file_types in the config)."
+    )
+    scan_group.add_argument(
+        "--har",
+        action="store_true",
+        help="Treat the target as a HAR file and scan its response bodies, streamed entry by entry."
+    )
+    scan_group.add_argument(
+        "--har-mime",
+        action="append",
+        metavar="TYPE",
+        help="Scan HAR response bodies whose MIME type contains TYPE (repeatable, "
+             f"default: {', '.join(DEFAULT_MIME_TYPES)})."
+    )
+    scan_group.add_argument(
+        "--lexer",
+        action="store_true",
+        help="Lex files as JavaScript and run literal-only rules on strings, templates, regexes and comments only."
+    )
+    scan_group.add_argument(
+        "--decode",
+        action="store_true",
+        help="Decode \\x/\\u escapes, hex and base64 runs (within per-file budgets) and rescan them for secrets."
+    )
+    scan_group.add_argument(
+        "--engine",
+        choices=ENGINES + (AUTO,),
+        default=RE,
+        help="Regex engine for the rules: re (default), regex or re2 if installed, "
+             "auto for re2 when available; falls back to re."
+    )
+    scan_group.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="Stop at the first finding meeting the failure threshold (any finding if none is set)."
+    )
+    scan_group.add_argument(
+        "--max-time",
+        type=float,
+        metavar="SECONDS",
+        help="Stop scanning after SECONDS, scanning the files most likely to hold secrets first (exit 4 if incomplete)."
+    )
+    scan_group.add_argument(
+        "--checkpoint",
+        metavar="FILE",
+        help="Journal completed files (with unmasked results) to FILE so an interrupted scan can be resumed."
+    )
+    scan_group.add_argument(
+        "--resume",
+        action="store_true",
+        help="With --checkpoint, reuse the journaled results and only scan the remaining files."
+    )
     scan_group.add_argument(
         "--config",
         help="Path to configuration file (default: .jsleak.yml)",
         default=".jsleak.yml"
     )
+    scan_group.add_argument(
+        "--rules",
+        action="append",
+        metavar="PATH",
+        help="Load a rule pack file, or every *.yml/*.yaml pack in a directory (repeatable)."
+    )
     scan_group.add_argument(
         "--baseline",
         help="Path to baseline JSON file to ignore known findings."
@@ -79,6 +578,60 @@ Examples:
         action="store_true",
         help="Suppress endpoint output."
     )
+    output_group.add_argument(
+        "--compact",
+        action="store_true",
+        help="Write JSON/SARIF without indentation."
+    )
+    output_group.add_argument(
+        "--group-secrets",
+        action="store_true",
+        help="Report each unique secret once with all its occurrences (SARIF: relatedLocations)."
+    )
+    output_group.add_argument(
+        "--summary-only",
+        action="store_true",
+        help="Text output: print only errors and the scan summary."
+    )
+    output_group.add_argument(
+        "--top-per-file",
+        type=int,
+        metavar="N",
+        help="Text output: show the N most severe findings of each file."
+    )
+    output_group.add_argument(
+        "--max-endpoints-per-file",
+        type=int,
+        metavar="N",
+        help="Keep at most N unique endpoints per file."
+    )
+    output_group.add_argument(
+        "--max-endpoints",
+        type=int,
+        metavar="N",
+        default=50000,
+        help="Keep at most N unique endpoints in the cross-file report (default: 50000)."
+    )
+    output_group.add_argument(
+        "--endpoints-report",
+        metavar="FILE",
+        help="Write unique endpoints across all files, grouped by host with counts, as JSON."
+    )
+    output_group.add_argument(
+        "--store",
+        metavar="FILE",
+        help="Record files, findings, endpoints and run metadata in a SQLite store (see 'jsleak query')."
+    )
+    output_group.add_argument(
+        "--metrics-file",
+        metavar="FILE",
+        help="Write per-file latency histograms, throughput, outcomes and peak RSS as an OpenMetrics textfile."
+    )
+    output_group.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="Write a Chrome trace-event timeline of scan phases (chrome://tracing, ui.perfetto.dev)."
+    )
     output_group.add_argument(
         "--verbose",
         action="store_true",
@@ -111,7 +664,7 @@ Examples:
         help="Redaction strategy (overrides config)."
     )
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     # Version Command
     if args.version:
@@ -123,9 +676,32 @@ Examples:
     if not args.target:
         parser.print_help()
         sys.exit(0)
+    if args.resume and not args.checkpoint:
+        parser.error("--resume requires --checkpoint")
+    if args.top_per_file is not None and args.top_per_file < 1:
+        parser.error("--top-per-file must be at least 1")
+    if args.engine != AUTO and not is_installed(args.engine):
+        print(f"WARNING: regex engine '{args.engine}' is not installed, using re", file=sys.stderr)
     
     # Load Config
     config = load_config(args.config)
+    try:
+        rules = config_rules(args.rules, config)
+        file_types = resolve_file_types(args.file_types, config.file_types, rules)
+    except (RuleError, FileTypeError) as e:
+        print(Colors.colorize(f"ERROR: {e}", Colors.RED), file=sys.stderr)
+        sys.exit(3)
+    if args.file_types and (args.git_history or args.har):
+        print("WARNING: --file-types applies to directory scans, --git-history and --har scan JavaScript only",
+              file=sys.stderr)
+
+    # Determine failure threshold
+    # CLI Flag > Config > Default (None)
+    fail_sev = args.fail_on_severity if args.fail_on_severity else config.fail_on_severity
+    # --fail-fast stops at a finding meeting the threshold (any finding without one)
+    # and then exits with 2, the run's findings being incomplete
+    blocking_exit_code = 2 if fail_sev else 1
+    stopped_early = False
 
     # Determine Format
     format_type = args.format if args.format else "text"
@@ -154,7 +730,11 @@ Examples:
         format_type=format_type, 
         show_secrets=(redact_strategy == "none"),
         redact_strategy=redact_strategy,
-        no_color=bool(os.getenv("NO_COLOR") or os.getenv("CI")) # Explicit no_color arg logic if needed
+        no_color=bool(os.getenv("NO_COLOR") or os.getenv("CI")), # Explicit no_color arg logic if needed
+        compact=args.compact,
+        group_secrets=args.group_secrets,
+        summary_only=args.summary_only,
+        top_per_file=args.top_per_file
     )
 
     # Banner (Text mode only)
@@ -172,7 +752,15 @@ Examples:
 
     # Scan
     is_url = args.target.startswith("http://") or args.target.startswith("https://")
-    results = [] 
+    # Results are reported as they arrive, nothing is kept per file or finding
+    result_counts = {"results": 0, "errors": 0}
+
+    def emit(res):
+        result_counts["results"] += 1
+        if res.get("error"):
+            result_counts["errors"] += 1
+        with trace.span("report", "report"):
+            reporter.add(res)
     
     stats = {
         "files_scanned": 0,
@@ -180,24 +768,41 @@ Examples:
         "endpoints_found": 0,
         "secrets_by_severity": {}
     }
+    global_endpoints = EndpointIndex(args.max_endpoints) if args.endpoints_report else None
+    metrics = Metrics() if args.metrics_file else None
+    coverage = None
+    store = None
+    if args.store:
+        try:
+            store = FindingsStore(args.store)
+        except StoreError as e:
+            print(Colors.colorize(f"ERROR: {e}", Colors.RED), file=sys.stderr)
+            sys.exit(3)
+        store.start_run(args.target)
+    if args.trace:
+        trace.start(args.trace)
+    memory = MemoryBudget(args.max_memory) if args.max_memory else None
+    jobs = args.jobs
+    if memory is not None:
+        if memory.exceeded_at_start:
+            print(f"WARNING: jsleak uses {memory.baseline // 2**20} MiB before scanning, --max-memory leaves "
+                  f"too little; scanning with {memory.available // 2**20} MiB of working memory", file=sys.stderr)
+        jobs = memory.workers(args.jobs)
+        if jobs < args.jobs:
+            print(f"WARNING: --max-memory allows {jobs} of {args.jobs} worker processes", file=sys.stderr)
 
-    def process_result(res):
+    def process_result(res, cached: bool = False) -> bool:
+        """
+        Records and emits a result; True if it holds a finding that blocks under --fail-fast.
+        ``cached`` results were replayed from a checkpoint instead of scanned.
+        """
+        report_start = time.perf_counter() if metrics is not None else 0.0
         stats["files_scanned"] += 1
         
         # Filter Matches using Baseline and Config
-        matches = res.get("matches", [])
-        filtered_matches = []
-        for m in matches:
-             # Config Excludes
-             if m["type"] in config.exclude_secrets:
-                 continue
-             
-             # Baseline Check
-             if baseline_mgr.should_ignore(m, res["file"]):
-                 continue
-
-             filtered_matches.append(m)
-             
+        with trace.span("filter", "filter"):
+            filtered_matches = filter_matches(res.get("matches", []), res["file"], config, baseline_mgr)
+        for m in filtered_matches:
              # Stats
              stats["secrets_found"] += 1
              sev = m["severity"]
@@ -206,14 +811,23 @@ Examples:
         res["matches"] = filtered_matches
         
         # Endpoints
-        eps = res.get("endpoints", {})
-        count_eps = sum(len(v) for v in eps.values())
-        stats["endpoints_found"] += count_eps
+        endpoint_index = res.get("endpoint_index")
+        if endpoint_index is not None:
+            stats["endpoints_found"] += endpoint_index.unique
+            if global_endpoints is not None:
+                global_endpoints.merge(endpoint_index)
+        else:
+            eps = res.get("endpoints", {})
+            stats["endpoints_found"] += sum(len(v) for v in eps.values())
         
+        if store is not None:
+            store.add_result(res, baseline_mgr.generate_signature)
+
         if args.hide_endpoints:
+            res.pop("endpoint_index", None)
             res["endpoints"] = {}
             
-        results.append(res)
+        emit(res)
         
         if args.verbose:
              if res.get("error"):
@@ -221,30 +835,34 @@ Examples:
              else:
                  print(f"DEBUG: Scanned {res['file']} - Found {len(filtered_matches)} secrets", file=sys.stderr)
 
+        if metrics is not None:
+            metrics.observe_result(res, time.perf_counter() - report_start, len(filtered_matches), cached)
+
+        return bool(filtered_matches) and severity_exit_code(
+            {m["severity"]: 1 for m in filtered_matches}, fail_sev
+        ) == blocking_exit_code
+
     try:
         if is_url:
             try:
                 content = get_content(args.target)
-                scan_res = scan_content(content)
-                
-                # Convert matches to dicts
-                matches = []
-                for m in scan_res.matches:
-                     if not ignorer.should_ignore_secret(m.type):
-                         matches.append(m.to_dict())
-
-                res = {
-                    "file": args.target,
-                    "matches": matches,
-                    "endpoints": scan_res.endpoints,
-                    "error": None
-                }
+                scanner = Scanner(lexer=args.lexer, decoder=Decoder() if args.decode else None, engine=args.engine,
+                                  rules=rules)
+                view = scanner.literal_view(content)
+                matches = [m for m in scanner.scan_secrets(content, view) if not ignorer.should_ignore_secret(m.type)]
+
+                res = FileResult(
+                    file=args.target,
+                    matches=matches,
+                    endpoint_index=scanner.scan_endpoint_index(content, EndpointIndex(args.max_endpoints_per_file), view),
+                    error=None
+                )
                 process_result(res)
                 
             except Exception as e:
                 err_msg = str(e)
                 if format_type == "json" or format_type == "sarif":
-                   results.append({"file": args.target, "error": err_msg, "matches": [], "endpoints": {}})
+                   emit({"file": args.target, "error": err_msg, "matches": [], "endpoints": {}})
                 else:
                     print(Colors.colorize(f"ERROR: {err_msg}", Colors.RED), file=sys.stderr)
                     sys.exit(3) # Critical error for single target
@@ -252,63 +870,186 @@ Examples:
             if not os.path.exists(args.target):
                  err_msg = f"Path not found: {args.target}"
                  if format_type == "json":
-                    results.append({"file": args.target, "error": err_msg, "matches": [], "endpoints": {}})
-                    print(json.dumps(results, indent=2))
+                    print(json.dumps([{"file": args.target, "error": err_msg, "matches": [], "endpoints": {}}], indent=2))
                  else:
                     print(Colors.colorize(f"ERROR: {err_msg}", Colors.RED), file=sys.stderr)
                  sys.exit(3)
 
-            for res in scan_directory(args.target, args.recursive, ignorer):
-                 process_result(res)
+            journal = None
+            if args.checkpoint:
+                scan_desc = {
+                    "target": os.path.abspath(args.target),
+                    "recursive": args.recursive,
+                    "include_minified": args.include_minified,
+                    "shard": args.shard,
+                    "git_tracked": args.git_tracked or args.git_untracked,
+                    "git_untracked": args.git_untracked,
+                    "git_history": args.git_history,
+                    "git_ref": args.git_ref if args.git_history else None,
+                    "har": args.har,
+                    "har_mime": args.har_mime if args.har else None,
+                    "max_endpoints_per_file": args.max_endpoints_per_file,
+                    "lexer": args.lexer,
+                    "decode": args.decode,
+                    "file_types": file_types
+                }
+                try:
+                    journal = CheckpointJournal(args.checkpoint, scan_desc, resume=args.resume)
+                except (CheckpointError, OSError) as e:
+                    print(Colors.colorize(f"ERROR: {e}", Colors.RED), file=sys.stderr)
+                    sys.exit(3)
+            skip = journal.completed if journal else None
+
+            # The time budget covers discovery, ranking and scanning, not startup
+            deadline = Deadline(args.max_time)
+            streamed = args.git_history or args.har
+            if args.max_time is not None and streamed:
+                # Blobs and HAR bodies are streamed, so only the scanned side of coverage is known
+                coverage = Coverage()
+            if args.har:
+                scan_results = scan_har(
+                    args.target, ignorer,
+                    mime_types=args.har_mime or DEFAULT_MIME_TYPES,
+                    max_endpoints_per_file=args.max_endpoints_per_file,
+                    jobs=jobs,
+                    skip=skip,
+                    lexer=args.lexer,
+                    decode=args.decode,
+                    engine=args.engine,
+                    rules=rules
+                )
+            elif args.git_history:
+                scan_results = scan_history(
+                    args.target, args.git_ref or ["HEAD"], ignorer,
+                    include_minified=args.include_minified,
+                    shard=args.shard,
+                    max_endpoints_per_file=args.max_endpoints_per_file,
+                    jobs=jobs,
+                    skip=skip,
+                    lexer=args.lexer,
+                    decode=args.decode,
+                    engine=args.engine,
+                    rules=rules
+                )
+            elif args.max_time is not None:
+                files = select_files(
+                    args.target, args.recursive, ignorer,
+                    include_minified=args.include_minified,
+                    shard=args.shard,
+                    git_tracked=args.git_tracked or args.git_untracked,
+                    include_untracked=args.git_untracked,
+                    skip=skip,
+                    file_types=file_types
+                )
+                prior = set()
+                if args.store and os.path.exists(args.store):
+                    try:
+                        reader = StoreReader(args.store)
+                        prior = reader.paths_with_findings()
+                        reader.close()
+                    except (StoreError, sqlite3.DatabaseError):
+                        pass
+                plan = prioritize(files, prior, deadline=deadline)
+                coverage = Coverage(len(plan), sum(size for _, size in plan))
+                scan_results = scan_plan(
+                    plan, deadline, coverage, ignorer,
+                    max_endpoints_per_file=args.max_endpoints_per_file,
+                    hash_content=store is not None,
+                    lexer=args.lexer,
+                    decode=args.decode,
+                    engine=args.engine,
+                    read_ahead_workers=args.read_ahead,
+                    file_types=file_types,
+                    memory=memory,
+                    rules=rules
+                )
+            else:
+                scan_results = scan_directory(
+                    args.target, args.recursive, ignorer,
+                    include_minified=args.include_minified,
+                    shard=args.shard,
+                    max_endpoints_per_file=args.max_endpoints_per_file,
+                    git_tracked=args.git_tracked or args.git_untracked,
+                    include_untracked=args.git_untracked,
+                    hash_content=store is not None,
+                    skip=skip,
+                    lexer=args.lexer,
+                    decode=args.decode,
+                    engine=args.engine,
+                    read_ahead_workers=args.read_ahead,
+                    file_types=file_types,
+                    memory=memory,
+                    rules=rules
+                )
+            try:
+                blocked = False
+                if journal:
+                    for res in journal.replay():
+                        if process_result(res, cached=True) and args.fail_fast:
+                            blocked = stopped_early = True
+                            break
+                for res in ([] if blocked else scan_results):
+                    if journal:
+                        journal.append(res)
+                    if process_result(res) and args.fail_fast:
+                        stopped_early = True
+                        break
+                    if streamed and coverage is not None:
+                        coverage.add(0)
+                        if deadline.expired():
+                            coverage.timed_out = True
+                            break
+            except (GitError, HarError) as e:
+                print(Colors.colorize(f"ERROR: {e}", Colors.RED), file=sys.stderr)
+                sys.exit(3)
+            finally:
+                # Stops git and cancels queued worker batches when the loop ended early
+                scan_results.close()
+                if journal:
+                    journal.close()
+
+        if coverage is not None:
+            stats["coverage"] = coverage.to_dict()
+            if metrics is not None:
+                metrics.add_skipped(stats["coverage"]["files_skipped"] or 0)
+            if coverage.timed_out and format_type in ("json", "sarif"):
+                print(f"WARNING: --max-time reached, scanned {coverage.files_scanned} files, "
+                      f"skipped {stats['coverage']['files_skipped']}", file=sys.stderr)
+
+        if memory is not None:
+            stats["memory"] = memory.to_dict()
+
+        if store is not None:
+            try:
+                store.finish_run(stats)
+            except StoreError as e:
+                print(Colors.colorize(f"ERROR: {e}", Colors.RED), file=sys.stderr)
+                sys.exit(3)
+
+        if global_endpoints is not None:
+            with open(args.endpoints_report, "w", encoding="utf-8") as f:
+                json.dump(global_endpoints.summary(), f, indent=2)
 
         # Report
-        reporter.report(results, stats)
+        with trace.span("report", "report"):
+            reporter.finish(stats)
+
+        if metrics is not None:
+            metrics.write_textfile(args.metrics_file)
 
         # Exit code logic
         # 0 -> no secrets above threshold
         # 1 -> secrets found below fail threshold
         # 2 -> secrets found meeting or exceeding fail threshold
+        has_errors = result_counts["errors"] > 0
+        exit_code = 2 if stopped_early else severity_exit_code(stats["secrets_by_severity"], fail_sev)
         
-        has_secrets = any(r.get("matches") for r in results)
-        has_errors = any(r.get("error") for r in results)
-        
-        exit_code = 0
-        
-        # Determine failure threshold
-        # CLI Flag > Config > Default (None)
-        fail_sev = args.fail_on_severity if args.fail_on_severity else config.fail_on_severity
-        
-        if has_secrets:
-            if fail_sev:
-                severity_map = {"LOW": 1, "MEDIUM": 2, "HIGH": 3, "CRITICAL": 4}
-                threshold_val = severity_map.get(fail_sev, 100)
-                
-                should_fail = False
-                for r in results:
-                    for m in r.get("matches", []):
-                        sev_val = severity_map.get(m["severity"], 0)
-                        if sev_val >= threshold_val:
-                            should_fail = True
-                            break
-                    if should_fail:
-                        break
-                
-                if should_fail:
-                    exit_code = 2 # Exceeds threshold
-                else:
-                    exit_code = 1 # Found, but below threshold
-            else:
-                # No threshold defined. 
-                # "0 -> no secrets above threshold" implies if no threshold, are there secrets "above" it? 
-                # If no threshold is set, technically no secrets are "above" the threshold (infinity). 
-                # So maybe 1? 
-                # User spec: "1 -> secrets below fail threshold". If threshold is None/Infinity, all secrets are below.
-                # So 1 is correct for finding secrets without a fail block.
-                exit_code = 1
-        
-        if has_errors and len(results) == 1: 
+        if has_errors and result_counts["results"] == 1: 
             # If single file scan failed and it was the only target
             exit_code = 3
+        elif stats.get("coverage") and not stats["coverage"]["complete"] and exit_code != 2:
+            # A failing finding is reported as such, otherwise incomplete wins over clean
+            exit_code = EXIT_INCOMPLETE
             
         sys.exit(exit_code)
 
@@ -317,6 +1058,11 @@ Examples:
     except Exception as e:
         print(f"CRITICAL ERROR: {e}", file=sys.stderr)
         sys.exit(3)
+    finally:
+        # Also when the scan raised or exited early, so the writer thread and WAL are released
+        if store is not None:
+            store.close()
+        trace.stop()
 
 if __name__ == "__main__":
     main()
@@ -9,6 +9,9 @@ class Config(NamedTuple):
     fail_on_severity: Optional[str] # Trigger non-zero exit code if this severity or higher is found
     baseline_path: Optional[str] # Path to baseline JSON file
     redact_secrets: str # "partial" (default), "full", "none" (show-secrets)
+    rules: list = [] # Inline rule pack entries
+    rule_packs: list = [] # Rule pack files or directories, relative to the config file
+    file_types: Any = None # Enabled file types: a list of names, or names mapped to handler settings
 
 DEFAULT_CONFIG = Config(
     exclude_paths=[],
@@ -33,7 +36,10 @@ def load_config(path: str = ".jsleak.yml") -> Config:
             confidence_threshold=data.get("confidence_threshold", "LOW"),
             fail_on_severity=data.get("fail_on_severity"),
             baseline_path=data.get("baseline_path"),
-            redact_secrets=data.get("redact_secrets", "partial")
+            redact_secrets=data.get("redact_secrets", "partial"),
+            rules=data.get("rules") or [],
+            rule_packs=[os.path.join(os.path.dirname(path), p) for p in data.get("rule_packs") or []],
+            file_types=data.get("file_types")
         )
     except Exception:
         return DEFAULT_CONFIG
@@ -0,0 +1,86 @@
+"""
+Cross-file correlation of secret findings.
+
+A key copied into hundreds of files is one secret, not hundreds. The
+correlator groups findings by type and value as results stream in and keeps
+each secret once, identified by its value fingerprint (the store's
+``fingerprint``), with its occurrences packed into an integer array of
+``(source, line, column)`` triples. File paths (and history commits) are
+interned as sources, so memory grows with unique secrets and files, not with
+per-finding records.
+"""
+from array import array
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from .store import fingerprint
+
+class Occurrence(NamedTuple):
+    file: str
+    line: int
+    column: int
+    commit: Optional[str] = None
+
+class SecretGroup:
+    """One secret and every place it was found, in scan order."""
+    __slots__ = ("type", "value", "severity", "confidence", "fingerprint", "_positions", "_sources")
+
+    def __init__(self, type: str, value: str, severity: str, confidence: str, sources: List[Tuple[str, Optional[str]]]):
+        self.type = type
+        self.value = value
+        self.severity = severity
+        self.confidence = confidence
+        self.fingerprint = fingerprint(type, value)
+        # Flat (source, line, column) triples
+        self._positions = array("q")
+        self._sources = sources
+
+    def add(self, source: int, line: int, column: int):
+        self._positions.extend((source, line, column))
+
+    @property
+    def count(self) -> int:
+        return len(self._positions) // 3
+
+    @property
+    def file_count(self) -> int:
+        return len(set(self._positions[0::3]))
+
+    def occurrences(self) -> Iterator[Occurrence]:
+        positions = self._positions
+        for i in range(0, len(positions), 3):
+            file, commit = self._sources[positions[i]]
+            yield Occurrence(file, positions[i + 1], positions[i + 2], commit)
+
+class SecretCorrelator:
+    """Collects ``SecretGroup`` records, in first-seen order, from per-file results."""
+
+    def __init__(self):
+        self._groups: Dict[Tuple[str, str], SecretGroup] = {}
+        self._sources: List[Tuple[str, Optional[str]]] = []
+        self._source_ids: Dict[Tuple[str, Optional[str]], int] = {}
+        self.occurrence_count = 0
+
+    def add_result(self, res: Dict[str, Any]):
+        """Adds the findings of a scan result (its ``matches``, after filtering)."""
+        matches = res.get("matches")
+        if not matches:
+            return
+        source = (res["file"], res.get("commit"))
+        source_id = self._source_ids.get(source)
+        if source_id is None:
+            source_id = self._source_ids[source] = len(self._sources)
+            self._sources.append(source)
+        for m in matches:
+            key = (m["type"], m["value"])
+            group = self._groups.get(key)
+            if group is None:
+                group = self._groups[key] = SecretGroup(
+                    m["type"], m["value"], m["severity"], m["confidence"], self._sources
+                )
+            group.add(source_id, m.get("line") or 0, m.get("column") or 0)
+            self.occurrence_count += 1
+
+    def groups(self) -> List[SecretGroup]:
+        return list(self._groups.values())
+
+    def __len__(self) -> int:
+        return len(self._groups)
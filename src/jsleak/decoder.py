@@ -0,0 +1,150 @@
+"""
+Decoding stage for encoded secrets.
+
+Bundlers and obfuscators emit strings as ``\\x41\\x4b...`` or ``\\u0041``
+escapes, hex or base64, which the secret patterns never see. ``Decoder`` finds
+candidate encoded runs, decodes each distinct run once, and decodes the
+result again up to ``max_depth`` levels. Only runs that decode to text are
+kept, so binary payloads such as base64 images are dropped after a few
+characters. Every file gets its own byte and time budget; once either is
+spent the rest of the file is not decoded.
+"""
+import base64
+import binascii
+import re
+import time
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+# Escape runs start with an escape so the search fails fast elsewhere; plain
+# characters between escapes ("AK\x49A") are kept, and leading ones are added back.
+_ESCAPE = r"\\x[0-9a-fA-F]{2}|\\u[0-9a-fA-F]{4}|\\u\{[0-9a-fA-F]{1,6}\}"
+_ESCAPE_RUN_RE = re.compile(rf"(?:{_ESCAPE})(?:{_ESCAPE}|[\w+/=.\-])*")
+_ESCAPE_RE = re.compile(r"\\x([0-9a-fA-F]{2})|\\u([0-9a-fA-F]{4})|\\u\{([0-9a-fA-F]{1,6})\}")
+# Hex and base64 runs must start a string (optionally after an auth scheme). Anchoring on
+# quotes keeps the search fast; a free-standing run would be tried at every position of
+# every identifier.
+_ENCODED_RUN_RE = re.compile(r"[\"'`](?:Basic |Bearer )?([A-Za-z0-9+/_\-]{20,}={0,2})(?![A-Za-z0-9+/_\-])")
+_HEX_CHARS = frozenset("0123456789abcdefABCDEF")
+_PLAIN_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_+/=.-")
+# First character of every 4-character group when base64 encodes printable ASCII
+# (top six bits of 0x20-0x7e), which rejects identifiers and binary data cheaply
+_BASE64_TEXT_LEADS = frozenset("IJKLMNOPQRSTUVWXYZabcdef")
+
+ESCAPE = "escape"
+HEX = "hex"
+BASE64 = "base64"
+
+class DecodedRun(NamedTuple):
+    """
+    Text decoded from ``text[start:end]`` of the scanned content. For runs
+    found inside decoded text, ``start``/``end`` are those of the outermost
+    run and ``encoding`` lists every layer, outermost first ("base64>escape").
+    """
+    start: int
+    end: int
+    text: str
+    encoding: str
+
+def _is_text(value: str) -> bool:
+    printable = sum(1 for c in value if c.isprintable() or c in "\t\r\n")
+    return printable >= 0.95 * len(value)
+
+def _decode_escapes(run: str) -> Optional[str]:
+    def replace(m):
+        code = int(m.group(1) or m.group(2) or m.group(3), 16)
+        return chr(code) if code <= 0x10FFFF else ""
+    return _ESCAPE_RE.sub(replace, run)
+
+def _decode_hex(run: str) -> Optional[str]:
+    try:
+        return bytes.fromhex(run).decode("utf-8")
+    except ValueError:
+        return None
+
+def _decode_base64(run: str) -> Optional[str]:
+    body = run.rstrip("=")
+    if len(body) % 4 == 1 or not all(c in _BASE64_TEXT_LEADS for c in body[::4]):
+        return None
+    padded = body + "=" * (-len(body) % 4)
+    try:
+        if "-" in body or "_" in body:
+            data = base64.urlsafe_b64decode(padded)
+        else:
+            data = base64.b64decode(padded, validate=True)
+        return data.decode("utf-8")
+    except (binascii.Error, ValueError):
+        return None
+
+_DECODERS = ((ESCAPE, _decode_escapes), (HEX, _decode_hex), (BASE64, _decode_base64))
+
+class Decoder:
+    """
+    Finds and decodes encoded runs in a file's content.
+
+    Args:
+        max_depth: Decoding layers followed (base64 of an escaped string is 2).
+        max_bytes: Encoded characters decoded per file, over all layers.
+        max_seconds: Wall-clock time per file for decoding and rescanning what was decoded.
+        max_run: Longer runs (inlined images, fonts) are not decoded at all.
+        min_length: Shortest decoded text worth rescanning.
+    """
+
+    def __init__(self, max_depth: int = 2, max_bytes: int = 1024 * 1024, max_seconds: float = 0.1,
+                 max_run: int = 64 * 1024, min_length: int = 8):
+        self.max_depth = max_depth
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.max_run = max_run
+        self.min_length = min_length
+
+    def _candidates(self, text: str) -> List[Tuple[int, int, str]]:
+        found = []
+        for m in _ESCAPE_RUN_RE.finditer(text):
+            start = m.start()
+            # Plain characters in front of the first escape belong to the run
+            floor = max(0, start - 256)
+            while start > floor and text[start - 1] in _PLAIN_CHARS:
+                start -= 1
+            found.append((start, m.end(), ESCAPE))
+        for m in _ENCODED_RUN_RE.finditer(text):
+            run = m.group(1)
+            is_hex = len(run) >= 24 and len(run) % 2 == 0 and all(c in _HEX_CHARS for c in run)
+            found.append((m.start(1), m.end(1), HEX if is_hex else BASE64))
+        found.sort()
+        return found
+
+    def decode_runs(self, text: str) -> Iterator[DecodedRun]:
+        """Yields the decoded runs of ``text`` at every depth, within this file's budget."""
+        deadline = time.monotonic() + self.max_seconds
+        budget = [self.max_bytes]
+        # Each distinct encoded run is decoded once per file
+        memo: Dict[Tuple[str, str], Optional[str]] = {}
+        yield from self._decode(text, 1, deadline, budget, memo)
+
+    def _decode(self, text: str, depth: int, deadline: float, budget: List[int],
+                memo: Dict[Tuple[str, str], Optional[str]]) -> Iterator[DecodedRun]:
+        decoders = dict(_DECODERS)
+        for start, end, encoding in self._candidates(text):
+            if end - start > self.max_run:
+                continue
+            run = text[start:end]
+            key = (encoding, run)
+            if key in memo:
+                decoded = memo[key]
+            else:
+                if budget[0] < end - start or time.monotonic() >= deadline:
+                    budget[0] = 0
+                    return
+                budget[0] -= end - start
+                decoded = decoders[encoding](run)
+                if decoded is not None and (len(decoded) < self.min_length or not _is_text(decoded)):
+                    decoded = None
+                memo[key] = decoded
+            if decoded is None:
+                continue
+            yield DecodedRun(start, end, decoded, encoding)
+            if depth < self.max_depth:
+                for inner in self._decode(decoded, depth + 1, deadline, budget, memo):
+                    yield DecodedRun(start, end, inner.text, f"{encoding}>{inner.encoding}")
+            if not budget[0]:
+                return
@@ -1,16 +1,89 @@
 import os
-from typing import List, Dict, Generator, Any
-from .scanner import scan_content, ScanResult
+import hashlib
+import time
+from contextlib import closing
+from typing import List, Dict, Generator, Any, NamedTuple, Optional, Set, Tuple
+from .scanner import Scanner, BatchResult, legacy_secrets
+from .decoder import Decoder
+from .engines import RE
+from .filetypes import FileType, SCRIPT, file_type_for
+from .rules import RuleSet
+from .endpoints import EndpointIndex
 from .ignorer import Ignorer
-from .fetcher import get_content, FetcherError
+from .fetcher import decode_text, FetcherError
+from .memory import MemoryBudget
+from .pipeline import FileRead, READ_AHEAD_BYTES, READ_AHEAD_WORKERS, read_ahead, read_file
+from .git import list_git_files
+from . import trace
 
-def scan_directory(
-    path: str, 
-    recursive: bool = False, 
-    ignorer: Ignorer = None
-) -> Generator[Dict[str, Any], None, None]:
+# Characters kept on each side of a hit in minified bundles, where the line itself is useless
+MINIFIED_CONTEXT_SIZE = 40
+
+class FileResult(dict):
+    """
+    Per-file result of ``scan_directory``.
+
+    ``matches`` holds ``SecretMatch`` records as produced by the scanner; the
+    legacy ``secrets`` dict is only built if a caller asks for it. Endpoints
+    live in ``endpoint_index``; the legacy ``endpoints`` dict is rebuilt from it
+    on each access rather than stored next to it.
+    """
+    _lazy_keys = ("secrets", "endpoints")
+
+    def __missing__(self, key: str) -> Any:
+        if key == "secrets":
+            value = legacy_secrets(self.get("matches", []))
+            self[key] = value
+            return value
+        if key == "endpoints":
+            index = dict.get(self, "endpoint_index")
+            return index.to_legacy() if index is not None else {}
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self._lazy_keys or key in self:
+            return self[key]
+        return default
+
+def is_minified(file_path: str) -> bool:
+    return file_path.lower().endswith(".min.js")
+
+def in_shard(file_path: str, root: str, shard: Tuple[int, int]) -> bool:
+    """
+    Deterministically assigns a file to one of ``count`` shards (1-based ``index``).
+
+    The hash is taken over the path relative to the scan root with forward
+    slashes, so every CI machine agrees regardless of checkout location or OS.
+    """
+    index, count = shard
+    if os.path.isdir(root):
+        rel_path = os.path.relpath(file_path, root)
+    else:
+        rel_path = os.path.basename(file_path)
+    key = rel_path.replace("\\", "/").encode("utf-8")
+    digest = hashlib.sha1(key).digest()
+    return int.from_bytes(digest[:8], "big") % count == index - 1
+
+def is_scannable(
+    file_name: str,
+    include_minified: bool = False,
+    file_types: Optional[Tuple[FileType, ...]] = None
+) -> bool:
     """
-    Scans a directory for JavaScript files.
+    True for files of one of ``file_types`` (default: JavaScript), minified bundles only if requested.
+    """
+    if file_type_for(file_name, file_types) is None:
+        return False
+    return include_minified or not is_minified(file_name)
+
+def discover_files(
+    path: str,
+    recursive: bool = False,
+    include_minified: bool = False,
+    file_types: Optional[Tuple[FileType, ...]] = None
+) -> List[str]:
+    """
+    Lists the files ``scan_directory`` would consider, in deterministic (sorted walk) order.
     """
     files_to_scan = []
     
@@ -22,9 +95,7 @@ def scan_directory(
             dirs.sort()
             
             for file in files:
-                if not (file.lower().endswith(".js") or file.lower().endswith(".mjs")):
-                    continue
-                if file.lower().endswith(".min.js"):
+                if not is_scannable(file, include_minified, file_types):
                     continue
                 full_path = os.path.join(root, file)
                 files_to_scan.append(full_path)
@@ -32,48 +103,281 @@ def scan_directory(
             if not recursive:
                 break
 
-    for file_path in files_to_scan:
-        if ignorer and ignorer.should_ignore_file(file_path):
+    return files_to_scan
+
+def discover_git_files(
+    path: str,
+    recursive: bool = False,
+    include_minified: bool = False,
+    include_untracked: bool = False,
+    file_types: Optional[Tuple[FileType, ...]] = None
+) -> List[str]:
+    """
+    Lists scannable files from the git index instead of walking the tree.
+
+    Build outputs, ``node_modules`` and anything else ``.gitignore`` excludes
+    never show up, and ``.git`` itself is not listed. Tracked files deleted
+    from the working tree are skipped.
+    """
+    if os.path.isfile(path):
+        return [path]
+    files_to_scan = []
+    for rel_path in list_git_files(path, include_untracked):
+        if not recursive and "/" in rel_path:
             continue
-            
+        if not is_scannable(rel_path.rsplit("/", 1)[-1], include_minified, file_types):
+            continue
+        full_path = os.path.join(path, *rel_path.split("/"))
+        if os.path.isfile(full_path):
+            files_to_scan.append(full_path)
+    return files_to_scan
+
+class _ScannerKey(NamedTuple):
+    minified: bool
+    lexer: bool
+    decode: bool
+    engine: str
+    file_type: Optional[FileType]
+    rules_key: Optional[str] # ``RuleSet.key`` of the rule packs, None without packs
+
+# Shared scanners, one per distinct configuration
+_scanners: Dict[_ScannerKey, Scanner] = {}
+
+def _file_scanner(
+    file_path: str,
+    lexer: bool = False,
+    decode: bool = False,
+    engine: str = RE,
+    file_types: Optional[Tuple[FileType, ...]] = None,
+    rules: Optional[RuleSet] = None
+) -> Scanner:
+    """
+    The shared scanner for a file: minified bundles get context snippets, and
+    the file's type picks its extractor and rules (a file of no enabled type,
+    named directly as the target, is scanned whole with every rule).
+    """
+    file_type = file_type_for(os.path.basename(file_path), file_types)
+    key = _ScannerKey(is_minified(file_path), lexer, decode, engine, file_type, rules.key if rules else None)
+    scanner = _scanners.get(key)
+    if scanner is None:
+        scanner = _scanners[key] = Scanner(
+            context_size=MINIFIED_CONTEXT_SIZE if key.minified else 0,
+            lexer=lexer,
+            decoder=Decoder() if decode else None,
+            engine=engine,
+            file_type=file_type,
+            rules=rules
+        )
+    return scanner
+
+def _builds_view(scanner: Scanner) -> bool:
+    return scanner.lexer or (scanner.file_type is not None and scanner.file_type.extractor != SCRIPT)
+
+def read_ahead_limits(
+    memory: Optional[MemoryBudget],
+    lexer: bool = False,
+    file_types: Optional[Tuple[FileType, ...]] = None
+) -> Dict[str, Any]:
+    """``read_ahead`` byte limits under ``memory``: files it cannot scan whole are left unread."""
+    if memory is None:
+        return {"max_bytes": READ_AHEAD_BYTES}
+    views = lexer or any(t.extractor != SCRIPT for t in file_types or ())
+    return {"max_bytes": memory.read_ahead_bytes, "max_file_bytes": memory.max_file_bytes(views)}
+
+def _read_chunks(file_path: str, size: int, encoding: str) -> Generator[str, None, None]:
+    # Text mode gives decode_text's universal newlines, also across chunk edges
+    with open(file_path, "r", encoding=encoding, newline=None) as f:
+        while True:
+            chunk = f.read(size)
+            if not chunk:
+                return
+            yield chunk
+
+def _scan_chunked(file_path: str, scanner: Scanner, ignorer: Optional[Ignorer],
+                  max_endpoints_per_file: Optional[int], memory: MemoryBudget) -> FileResult:
+    started = time.perf_counter()
+    size = memory.chunk_chars(_builds_view(scanner))
+    # Decoded as UTF-8, or as latin-1 like decode_text if the file turns out not to be UTF-8
+    for encoding in ("utf-8", "latin-1"):
+        endpoint_index = EndpointIndex(max_endpoints_per_file)
         try:
-            content = get_content(file_path)
-            result = scan_content(content)
-            
-            # Convert matches to dicts for yielding
-            matches = [m.to_dict() for m in result.matches]
+            matches = scanner.scan_chunks(_read_chunks(file_path, size, encoding), endpoint_index)
+            break
+        except UnicodeDecodeError:
+            continue
+        except OSError as e:
+            raise FetcherError(f"Error reading file {file_path}: {e}")
+    memory.chunked_files += 1
+    if ignorer and matches:
+        matches = [m for m in matches if not ignorer.should_ignore_secret(m.type)]
+    # Reading and decoding are interleaved with scanning, all of it counts as scan time
+    return FileResult(file=file_path, matches=matches, endpoint_index=endpoint_index, error=None,
+                      size=os.path.getsize(file_path), timings=(0.0, 0.0, time.perf_counter() - started))
+
+def batch_file_result(result: BatchResult, ignorer: Optional[Ignorer],
+                      max_endpoints_per_file: Optional[int], **fields: Any) -> FileResult:
+    """
+    Builds the ``FileResult`` of one ``Scanner.scan_many`` item, as for
+    history blobs and HAR bodies. ``fields`` identify the item (``file`` and
+    the like).
+    """
+    if result.error:
+        return FileResult(matches=[], secrets={}, endpoints={}, error=result.error, **fields)
+    matches = result.matches
+    if ignorer and matches:
+        matches = [m for m in matches if not ignorer.should_ignore_secret(m.type)]
+    endpoint_index = EndpointIndex(max_endpoints_per_file)
+    for e in result.endpoint_matches:
+        endpoint_index.add(e.type, e.value)
+    return FileResult(matches=matches, endpoint_index=endpoint_index, error=None, **fields)
+
+def scan_file(
+    file_path: str,
+    ignorer: Ignorer = None,
+    max_endpoints_per_file: Optional[int] = None,
+    hash_content: bool = False,
+    lexer: bool = False,
+    decode: bool = False,
+    engine: str = RE,
+    read: Optional[FileRead] = None,
+    file_types: Optional[Tuple[FileType, ...]] = None,
+    memory: Optional[MemoryBudget] = None,
+    rules: Optional[RuleSet] = None
+) -> FileResult:
+    """
+    Scans one file. Errors are reported in the result's ``error`` instead of raised.
+    With ``hash_content`` the result's ``content_hash`` is the SHA-256 of the decoded content.
+    With ``lexer`` literal-only patterns run on the file's JavaScript literals and comments.
+    With ``decode`` escaped, hex and base64 runs are decoded and rescanned for secrets.
+    ``engine`` selects the regex backend of the rules.
+    Successful results carry ``size`` (bytes read) and ``timings``, the seconds
+    spent reading, decoding and scanning. ``read`` is the file as already read
+    by the read-ahead pipeline; without it the file is read here. The file's
+    type among ``file_types`` selects its extractor and rule subset. Under a
+    ``memory`` budget a file too large to scan whole is scanned in chunks
+    (``hash_content`` is not computed for it). ``rules`` are rule packs run
+    next to the built-in rules.
+    """
+    with trace.span("scan_file", "file", {"file": file_path} if trace.active() else None):
+        try:
+            if read is None or (read.data is None and read.error is None):
+                if memory is not None:
+                    scanner = _file_scanner(file_path, lexer, decode, engine, file_types, rules)
+                    if os.path.isfile(file_path) and \
+                            os.path.getsize(file_path) > memory.max_file_bytes(_builds_view(scanner)):
+                        return _scan_chunked(file_path, scanner, ignorer, max_endpoints_per_file, memory)
+                read = read_file(file_path)
+            if read.error is not None:
+                raise read.error
+            data = read.data
+            started = time.perf_counter()
+            with trace.span("decode"):
+                content = decode_text(data)
+            decoded = time.perf_counter()
+            scanner = _file_scanner(file_path, lexer, decode, engine, file_types, rules)
+            view = scanner.literal_view(content)
+            matches = scanner.scan_secrets(content, view)
+            endpoint_index = scanner.scan_endpoint_index(content, EndpointIndex(max_endpoints_per_file), view)
 
             # Filter secrets based on ignorer
             if ignorer and matches:
-                filtered_matches = []
-                for m in matches:
-                    if not ignorer.should_ignore_secret(m["type"]):
-                        filtered_matches.append(m)
-                matches = filtered_matches
-            
-            # Reconstruct legacy secrets dict from filtered matches
-            filtered_secrets = {}
-            for m in matches:
-                t = m["type"]
-                if t not in filtered_secrets:
-                    filtered_secrets[t] = []
-                filtered_secrets[t].append(m["value"])
-            for k in filtered_secrets:
-                 filtered_secrets[k].sort()
-
-            yield {
-                "file": file_path,
-                "matches": matches,
-                "secrets": filtered_secrets,
-                "endpoints": result.endpoints,
-                "error": None
-            }
-            
+                matches = [m for m in matches if not ignorer.should_ignore_secret(m.type)]
+
+            res = FileResult(
+                file=file_path,
+                matches=matches,
+                endpoint_index=endpoint_index,
+                error=None,
+                size=len(data),
+                timings=(read.seconds, decoded - started, time.perf_counter() - decoded)
+            )
+            if hash_content:
+                res["content_hash"] = hashlib.sha256(content.encode("utf-8", "surrogateescape")).hexdigest()
+            return res
+
         except Exception as e:
-            yield {
-                "file": file_path,
-                "matches": [],
-                "secrets": {},
-                "endpoints": {},
-                "error": str(e)
-            }
+            return FileResult(
+                file=file_path,
+                matches=[],
+                secrets={},
+                endpoints={},
+                error=str(e)
+            )
+
+def select_files(
+    path: str,
+    recursive: bool = False,
+    ignorer: Ignorer = None,
+    include_minified: bool = False,
+    shard: Optional[Tuple[int, int]] = None,
+    git_tracked: bool = False,
+    include_untracked: bool = False,
+    skip: Optional[Set[str]] = None,
+    file_types: Optional[Tuple[FileType, ...]] = None
+) -> List[str]:
+    """
+    Lists the files ``scan_directory`` scans, after ignore rules, sharding and ``skip``.
+    """
+    with trace.span("discover", "io"):
+        if git_tracked:
+            files = discover_git_files(path, recursive, include_minified, include_untracked, file_types)
+        else:
+            files = discover_files(path, recursive, include_minified, file_types)
+        selected = []
+        for file_path in files:
+            if ignorer and ignorer.should_ignore_file(file_path):
+                continue
+            if shard and not in_shard(file_path, path, shard):
+                continue
+            if skip and file_path in skip:
+                continue
+            selected.append(file_path)
+    return selected
+
+def scan_directory(
+    path: str, 
+    recursive: bool = False, 
+    ignorer: Ignorer = None,
+    include_minified: bool = False,
+    shard: Optional[Tuple[int, int]] = None,
+    max_endpoints_per_file: Optional[int] = None,
+    git_tracked: bool = False,
+    include_untracked: bool = False,
+    hash_content: bool = False,
+    skip: Optional[Set[str]] = None,
+    lexer: bool = False,
+    decode: bool = False,
+    engine: str = RE,
+    read_ahead_workers: int = READ_AHEAD_WORKERS,
+    file_types: Optional[Tuple[FileType, ...]] = None,
+    memory: Optional[MemoryBudget] = None,
+    rules: Optional[RuleSet] = None
+) -> Generator[Dict[str, Any], None, None]:
+    """
+    Scans a directory for JavaScript files, or the files of ``file_types``
+    (see ``filetypes``), each with its type's extractor and rules.
+
+    Minified bundles (``*.min.js``) are skipped unless ``include_minified`` is set,
+    in which case their findings carry a bounded context snippet.
+    With ``shard=(index, count)`` only the files assigned to that shard are scanned.
+    Endpoints are deduplicated per file into an ``EndpointIndex`` capped at
+    ``max_endpoints_per_file`` unique entries.
+    With ``git_tracked`` files are listed from the git index (plus untracked,
+    non-ignored files if ``include_untracked``) instead of walking the tree.
+    Paths in ``skip`` (already scanned by an interrupted run) are not scanned.
+    With ``lexer`` literal-only patterns run on JavaScript literals and comments only.
+    With ``decode`` encoded runs are decoded and rescanned for secrets.
+    ``engine`` selects the regex backend of the rules.
+    ``read_ahead_workers`` threads read the next files while one is scanned
+    (0 reads each file when it is scanned); results keep the file order.
+    With a ``memory`` budget fewer bytes are read ahead and files too large
+    to scan whole are scanned in chunks. ``rules`` (a loaded ``RuleSet``)
+    are run next to the built-in rules.
+    """
+    files = select_files(path, recursive, ignorer, include_minified, shard,
+                         git_tracked, include_untracked, skip, file_types)
+    limits = read_ahead_limits(memory, lexer, file_types)
+    with closing(read_ahead(files, read_ahead_workers, **limits)) as reads:
+        for read in reads:
+            yield scan_file(read.path, ignorer, max_endpoints_per_file, hash_content, lexer, decode, engine, read,
+                            file_types, memory, rules)
@@ -0,0 +1,208 @@
+"""
+Deduplicating endpoint index.
+
+Endpoints are normalized and stored in a trie keyed by origin (scheme, host
+and port) and path segments. Each distinct endpoint is kept once with an
+occurrence count, so memory grows with unique endpoints rather than with
+every URL literal in a bundle. Normalization is only the deduplication key:
+an endpoint is reported as it was first seen.
+"""
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+_URL_RE = re.compile(r"^(?:([A-Za-z][A-Za-z0-9+.\-]*)://([^/?#]*))?([^?#]*)(.*)$", re.DOTALL)
+_SUFFIX_RE = re.compile(r"[?#]")
+_DEFAULT_PORTS = {"http": "80", "https": "443", "ws": "80", "wss": "443"}
+
+def normalize_endpoint(value: str) -> Tuple[str, Tuple[str, ...], str]:
+    """
+    Splits an endpoint into ``(origin, path segments, suffix)``.
+
+    The scheme and host are lowercased, default ports dropped and empty path
+    segments (trailing or doubled slashes) ignored. ``suffix`` is the query
+    and fragment, kept verbatim. Relative paths have an empty origin.
+    """
+    scheme, netloc, path, suffix = _URL_RE.match(value).groups()
+    origin = ""
+    if scheme is not None:
+        scheme = scheme.lower()
+        netloc = netloc.lower()
+        host, sep, port = netloc.rpartition(":")
+        if sep and port == _DEFAULT_PORTS.get(scheme):
+            netloc = host
+        origin = f"{scheme}://{netloc}"
+    segments = tuple([s for s in path.split("/") if s])
+    return origin, segments, suffix
+
+def _split_suffix(leaf: str) -> Tuple[str, str]:
+    # Path segments never contain '?' or '#', so the suffix starts at the first of them
+    match = _SUFFIX_RE.search(leaf)
+    if match is None:
+        return leaf, ""
+    return leaf[:match.start()], leaf[match.start():]
+
+def _join(origin: str, segments: Tuple[str, ...], suffix: str) -> str:
+    path = "/" + "/".join(segments) if segments else ""
+    if not origin and not path:
+        path = "/"
+    return origin + path + suffix
+
+class _Node:
+    __slots__ = ("children", "leaves")
+
+    def __init__(self):
+        # Path segments that have further segments below them
+        self.children: Optional[Dict[str, "_Node"]] = None
+        # Endpoints ending below this node: type code + last segment + suffix -> occurrences,
+        # or [occurrences, value as first seen] if that differs from the normalized value.
+        # Leaves are plain string keys rather than nodes, most URLs are unique in their last segment.
+        self.leaves: Optional[Dict[str, Any]] = None
+
+class EndpointIndex:
+    """
+    Counts endpoint occurrences, grouped by origin and path prefix.
+
+    Args:
+        max_endpoints: Maximum number of unique endpoints kept. Once reached,
+            occurrences of already known endpoints are still counted, new ones
+            are only tallied in ``dropped``.
+    """
+
+    def __init__(self, max_endpoints: Optional[int] = None):
+        self.max_endpoints = max_endpoints
+        self._origins: Dict[str, _Node] = {}
+        self._type_codes: Dict[str, str] = {}
+        self._types: List[str] = []
+        self.unique = 0
+        self.total = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return self.unique
+
+    def add(self, endpoint_type: str, value: str, count: int = 1) -> bool:
+        """Records ``count`` occurrences of an endpoint. Returns False if it was dropped by the cap."""
+        origin, segments, suffix = normalize_endpoint(value)
+        return self._add(origin, segments, endpoint_type, suffix, count, value)
+
+    def _type_code(self, endpoint_type: str) -> str:
+        code = self._type_codes.get(endpoint_type)
+        if code is None:
+            code = self._type_codes[endpoint_type] = chr(len(self._types))
+            self._types.append(endpoint_type)
+        return code
+
+    def _add(self, origin: str, segments: Tuple[str, ...], endpoint_type: str, suffix: str, count: int,
+             value: str) -> bool:
+        self.total += count
+        full = self.max_endpoints is not None and self.unique >= self.max_endpoints
+        node = self._origins.get(origin)
+        if node is None:
+            if full:
+                self.dropped += count
+                return False
+            node = self._origins[origin] = _Node()
+        for segment in segments[:-1]:
+            children = node.children
+            child = children.get(segment) if children is not None else None
+            if child is None:
+                if full:
+                    self.dropped += count
+                    return False
+                if children is None:
+                    children = node.children = {}
+                child = children[segment] = _Node()
+            node = child
+        key = self._type_code(endpoint_type) + (segments[-1] if segments else "") + suffix
+        leaves = node.leaves
+        if leaves is not None and key in leaves:
+            entry = leaves[key]
+            if type(entry) is int:
+                leaves[key] = entry + count
+            else:
+                entry[0] += count
+            return True
+        if full:
+            self.dropped += count
+            return False
+        if leaves is None:
+            leaves = node.leaves = {}
+        leaves[key] = count if value == _join(origin, segments, suffix) else [count, value]
+        self.unique += 1
+        return True
+
+    def merge(self, other: "EndpointIndex"):
+        """Adds all endpoints and counts of ``other`` (subject to this index's cap)."""
+        for origin, segments, endpoint_type, suffix, count, value in other._entries():
+            self._add(origin, segments, endpoint_type, suffix, count, value)
+        self.dropped += other.dropped
+        self.total += other.dropped
+
+    def _entries(self) -> Iterator[Tuple[str, Tuple[str, ...], str, str, int, str]]:
+        # Ordered by the normalized key; the value is the endpoint as first seen
+        for origin in sorted(self._origins):
+            stack = [(self._origins[origin], ())]
+            while stack:
+                node, segments = stack.pop()
+                if node.leaves:
+                    for key in sorted(node.leaves):
+                        entry = node.leaves[key]
+                        last, suffix = _split_suffix(key[1:])
+                        leaf_segments = segments + (last,) if last else segments
+                        if type(entry) is int:
+                            count, value = entry, _join(origin, leaf_segments, suffix)
+                        else:
+                            count, value = entry
+                        yield origin, leaf_segments, self._types[ord(key[0])], suffix, count, value
+                if node.children:
+                    for segment in sorted(node.children, reverse=True):
+                        stack.append((node.children[segment], segments + (segment,)))
+
+    def __iter__(self) -> Iterator[Tuple[str, str, int]]:
+        """Yields ``(endpoint type, value, occurrences)``."""
+        for _, _, endpoint_type, _, count, value in self._entries():
+            yield endpoint_type, value, count
+
+    def by_origin(self) -> Iterator[Tuple[str, str, str, int]]:
+        """Yields ``(normalized origin, endpoint type, value, occurrences)``; origin is empty for relative paths."""
+        for origin, _, endpoint_type, _, count, value in self._entries():
+            yield origin, endpoint_type, value, count
+
+    def to_legacy(self) -> Dict[str, List[str]]:
+        """Returns the legacy ``{type: sorted unique values}`` dict."""
+        endpoints: Dict[str, List[str]] = {}
+        for endpoint_type, value, _ in self:
+            endpoints.setdefault(endpoint_type, []).append(value)
+        for values in endpoints.values():
+            values.sort()
+        return endpoints
+
+    def summary(self, prefix_depth: int = 1) -> Dict[str, Any]:
+        """
+        Returns a JSON-ready report grouped by origin.
+
+        Each origin lists its occurrence count, path prefixes (first
+        ``prefix_depth`` segments) with counts, and its endpoints, most
+        frequent first.
+        """
+        hosts: Dict[str, Dict[str, Any]] = {}
+        for origin, segments, endpoint_type, _, count, value in self._entries():
+            host = hosts.get(origin)
+            if host is None:
+                host = hosts[origin] = {"count": 0, "prefixes": {}, "endpoints": []}
+            host["count"] += count
+            prefix = "/" + "/".join(segments[:prefix_depth])
+            host["prefixes"][prefix] = host["prefixes"].get(prefix, 0) + count
+            host["endpoints"].append({
+                "type": endpoint_type,
+                "value": value,
+                "count": count
+            })
+        for host in hosts.values():
+            host["endpoints"].sort(key=lambda e: (-e["count"], e["value"]))
+        return {
+            "unique_endpoints": self.unique,
+            "total_occurrences": self.total,
+            "dropped_occurrences": self.dropped,
+            "hosts": {origin or "(relative)": hosts[origin] for origin in sorted(hosts, key=lambda o: (-hosts[o]["count"], o))}
+        }
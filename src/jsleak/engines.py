@@ -0,0 +1,217 @@
+"""
+Regex engine backends for the secret and endpoint rules.
+
+Rules are written once, as stdlib ``re`` patterns in ``patterns.py``.
+``compile_rules(engine)`` recompiles their sources for another backend: the
+``regex`` module (atomic groups, possessive quantifiers) or ``re2``
+(linear-time matching, no backtracking blowups). Both are optional; a backend
+that is not installed resolves to ``re``, and a rule a backend cannot compile
+(``re2`` has no lookarounds or backreferences) keeps its ``re`` pattern.
+``benchmark_rules`` times every rule on each backend and checks that each one
+finds exactly what ``re`` finds. A rule subset (for a file type) is selected
+from the compiled rules once and cached like them. Rule packs (a
+``rules.RuleSet``) are compiled next to the built-in rules, cached per set.
+"""
+import re
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Pattern, Set, Tuple
+from .patterns import SECRETS_PATTERNS, ENDPOINT_PATTERNS, PatternConfig
+from .rules import RuleSet
+
+try:
+    import regex
+except ImportError:
+    regex = None
+
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+RE = "re"
+REGEX = "regex"
+RE2 = "re2"
+AUTO = "auto"
+ENGINES = (RE, REGEX, RE2)
+
+# Flags that change matching and can be written inline for backends without a flags argument
+_INLINE_FLAGS = ((re.IGNORECASE, "i"), (re.MULTILINE, "m"), (re.DOTALL, "s"))
+
+class EngineError(Exception):
+    """Raised for an unknown regex engine name."""
+    pass
+
+def _compile_regex(pattern: Pattern):
+    # VERSION0 keeps re-compatible semantics
+    return regex.compile(pattern.pattern, pattern.flags | regex.VERSION0)
+
+def _compile_re2(pattern: Pattern):
+    inline = "".join(c for flag, c in _INLINE_FLAGS if pattern.flags & flag)
+    return re2.compile(f"(?{inline}){pattern.pattern}" if inline else pattern.pattern)
+
+_COMPILERS = {
+    RE: lambda pattern: pattern,
+    REGEX: _compile_regex,
+    RE2: _compile_re2,
+}
+
+def is_installed(engine: str) -> bool:
+    return engine == RE or (engine == REGEX and regex is not None) or (engine == RE2 and re2 is not None)
+
+def available_engines() -> List[str]:
+    """Installed backends, ``re`` first."""
+    return [engine for engine in ENGINES if is_installed(engine)]
+
+def resolve_engine(engine: str) -> str:
+    """
+    The backend actually used for ``engine``: ``auto`` prefers ``re2`` (no
+    backtracking) when installed, and a backend that is not installed falls back to ``re``.
+    """
+    if engine == AUTO:
+        return RE2 if is_installed(RE2) else RE
+    if engine not in _COMPILERS:
+        raise EngineError(f"Unknown regex engine: {engine} (choose from {', '.join(ENGINES + (AUTO,))})")
+    return engine if is_installed(engine) else RE
+
+class CompiledRules(NamedTuple):
+    secrets: Dict[str, PatternConfig]
+    endpoints: Dict[str, Pattern]
+    # Rules the backend could not compile, which run on re instead
+    fallbacks: Tuple[str, ...]
+    # Finds every rule keyword (``PatternConfig.keywords``) in one pass; None if no rule has any
+    keyword_pattern: Optional[Pattern] = None
+
+    def present_keywords(self, lowered: str) -> Set[str]:
+        """The rule keywords that occur in ``lowered`` (lower-cased content)."""
+        found = set(self.keyword_pattern.findall(lowered))
+        # The longest keyword at each position is matched; shorter keywords it starts with occur too
+        keywords = {k for config in self.secrets.values() for k in config.keywords}
+        return {m[:i] for m in found for i in range(1, len(m) + 1) if m[:i] in keywords}
+
+# By engine, or by (engine, only, exclude) for rule subsets
+_compiled: Dict[object, CompiledRules] = {}
+
+def _keyword_pattern(keywords: Iterable[str]) -> Optional[Pattern]:
+    # A trie of the keywords as one regex: a single pass over the content instead of one
+    # substring search per keyword, and much faster in re than a flat alternation
+    trie: Dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for c in keyword:
+            node = node.setdefault(c, {})
+        node[""] = {}
+    if not trie:
+        return None
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(c) + build(child) for c, child in sorted(node.items()) if c]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            # Shorter keyword ends here; the group makes the rest optional
+            body = f"(?:{body})?" if len(branches) == 1 else body + "?"
+        return body
+
+    # Lookahead so keywords overlapping an earlier match are still found
+    return re.compile(f"(?=({build(trie)}))")
+
+def compile_rules(
+    engine: str,
+    only: Optional[Tuple[str, ...]] = None,
+    exclude: Tuple[str, ...] = (),
+    rules: Optional[RuleSet] = None
+) -> CompiledRules:
+    """
+    Every secret and endpoint rule compiled for ``engine``, with the pack
+    rules of ``rules`` next to the built-in ones; cached per engine and rule
+    set. With ``only`` (rule ids) or ``exclude`` just that subset of the rules.
+    """
+    rules_key = rules.key if rules else None
+    if only is not None or exclude:
+        key = (engine, rules_key, only, exclude)
+        compiled = _compiled.get(key)
+        if compiled is None:
+            compiled = _compiled[key] = _select(compile_rules(engine, rules=rules), only, exclude)
+        return compiled
+    compiled = _compiled.get((engine, rules_key))
+    if compiled is not None:
+        return compiled
+    compiler = _COMPILERS[resolve_engine(engine)]
+    fallbacks = []
+
+    def compile_one(name: str, pattern: Pattern):
+        try:
+            return compiler(pattern)
+        except Exception:
+            fallbacks.append(name)
+            return pattern
+
+    secrets = {name: config._replace(pattern=compile_one(name, config.pattern))
+               for name, config in {**SECRETS_PATTERNS, **(rules or {})}.items()}
+    endpoints = {name: compile_one(name, pattern) for name, pattern in ENDPOINT_PATTERNS.items()}
+    keyword_pattern = _keyword_pattern({k for config in secrets.values() for k in config.keywords})
+    compiled = CompiledRules(secrets, endpoints, tuple(fallbacks), keyword_pattern)
+    _compiled[(engine, rules_key)] = compiled
+    return compiled
+
+def _select(rules: CompiledRules, only: Optional[Tuple[str, ...]], exclude: Tuple[str, ...]) -> CompiledRules:
+    def keep(name: str) -> bool:
+        return (only is None or name in only) and name not in exclude
+
+    secrets = {name: config for name, config in rules.secrets.items() if keep(name)}
+    return CompiledRules(
+        secrets,
+        {name: pattern for name, pattern in rules.endpoints.items() if keep(name)},
+        tuple(name for name in rules.fallbacks if keep(name)),
+        _keyword_pattern({k for config in secrets.values() for k in config.keywords})
+    )
+
+class RuleTiming(NamedTuple):
+    rule: str
+    engine: str
+    seconds: float
+    matches: int
+    # Same match spans and groups as re on every input
+    identical: bool
+
+def _rule_patterns(engine: str, rules: Optional[RuleSet] = None) -> Dict[str, Pattern]:
+    compiled = compile_rules(engine, rules=rules)
+    patterns = {name: config.pattern for name, config in compiled.secrets.items()}
+    patterns.update(compiled.endpoints)
+    return patterns
+
+def _find_all(pattern, contents: List[str]) -> List[List[tuple]]:
+    return [[(m.start(), m.end(), m.groups()) for m in pattern.finditer(content)] for content in contents]
+
+def benchmark_rules(
+    contents: Iterable[str],
+    engines: Optional[Iterable[str]] = None,
+    repeat: int = 3,
+    rules: Optional[RuleSet] = None
+) -> List[RuleTiming]:
+    """
+    Times every rule (plus the pack rules of ``rules``) over ``contents`` on
+    each installed engine (best of ``repeat`` runs) and compares its matches
+    with ``re``'s.
+    """
+    contents = list(contents)
+    engines = [e for e in (engines or ENGINES) if is_installed(e)]
+    reference = {name: _find_all(pattern, contents) for name, pattern in _rule_patterns(RE, rules).items()}
+    timings = []
+    for engine in engines:
+        for name, pattern in _rule_patterns(engine, rules).items():
+            best = None
+            for _ in range(max(1, repeat)):
+                started = time.perf_counter()
+                found = _find_all(pattern, contents)
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            timings.append(RuleTiming(
+                rule=name,
+                engine=engine,
+                seconds=best,
+                matches=sum(len(f) for f in found),
+                identical=found == reference[name]
+            ))
+    return timings
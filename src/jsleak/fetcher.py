@@ -2,6 +2,7 @@ import urllib.request
 import urllib.error
 import os
 from typing import Union
+from . import trace
 
 class FetcherError(Exception):
     """Base exception for fetching errors."""
@@ -20,28 +21,53 @@ def get_content(source: str) -> str:
     Raises:
         FetcherError: If the content cannot be retrieved or decoded.
     """
-    if source.startswith("http://") or source.startswith("https://"):
-        return _fetch_url(source)
-    else:
-        return _read_file(source)
+    with trace.span("fetch", "io", {"source": source} if trace.active() else None):
+        if source.startswith("http://") or source.startswith("https://"):
+            return _fetch_url(source)
+        else:
+            return _read_file(source)
 
-def _read_file(path: str) -> str:
+def decode_bytes(data: bytes) -> str:
+    """
+    Decodes raw content as UTF-8, falling back to latin-1 like local file reads.
+    """
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return data.decode("latin-1")
+
+def decode_text(data: bytes) -> str:
+    """
+    Decodes local file bytes like a text-mode read: UTF-8, falling back to
+    latin-1, with universal newlines.
+    """
+    text = decode_bytes(data)
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+def read_file_bytes(path: str) -> bytes:
+    """
+    Reads a local file's raw bytes; ``decode_text`` turns them into what
+    ``get_content`` returns, so callers can time the two steps separately.
+
+    Raises:
+        FetcherError: If the file does not exist or cannot be read.
+    """
     if not os.path.exists(path):
         raise FetcherError(f"File not found: {path}")
     if not os.path.isfile(path):
         raise FetcherError(f"Path is not a file: {path}")
-    
+
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return f.read()
-    except UnicodeDecodeError:
-        # Fallback for non-utf8 files, though scanning binary might not be useful
-        # We try latin-1 as a safe fallback
-        with open(path, "r", encoding="latin-1") as f:
+        with open(path, "rb") as f:
             return f.read()
     except OSError as e:
         raise FetcherError(f"Error reading file {path}: {e}")
 
+def _read_file(path: str) -> str:
+    return decode_text(read_file_bytes(path))
+
 def _fetch_url(url: str) -> str:
     req = urllib.request.Request(
         url, 
@@ -0,0 +1,216 @@
+"""
+File-type handlers for directory scans.
+
+A file type maps file names (globs) to an extractor and a rule subset.
+Extractors return the ``(start, end, kind)`` spans of a file worth scanning:
+inline ``<script>`` bodies of HTML, the values of ``.env``/config
+``key=value`` lines, the string values of JSON. The spans become a
+``LiteralView``, so rules run over the extracted text only and findings keep
+their offsets in the original file, exactly like the ``--lexer`` pre-pass.
+JavaScript and TypeScript files are scanned whole. Each type runs only its
+``rules`` (all if None) minus its ``exclude_rules``, so a format does not pay
+for rules that cannot match it.
+
+Only ``js`` is enabled by default; ``--file-types`` and ``file_types`` in
+``.jsleak.yml`` enable the others, adjust them or add new types.
+"""
+import fnmatch
+import re
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Pattern, Tuple
+from .lexer import Span, STRING, js_spans
+from .patterns import SECRETS_PATTERNS, ENDPOINT_PATTERNS
+
+# Extractors
+SCRIPT = "script"
+HTML = "html"
+KEY_VALUE = "keyvalue"
+JSON = "json"
+
+# Span kinds (reported as a finding's syntax) of extracted code and config values
+INLINE_SCRIPT = "script"
+VALUE = "value"
+
+ALL = "all"
+DEFAULT_FILE_TYPES = ("js",)
+FILE_TYPE_KEYS = ("files", "extractor", "rules", "exclude_rules")
+
+# Longest quoted multi-line value (a PEM key in .env) a key/value line may have
+_MAX_QUOTED_VALUE = 8192
+
+class FileTypeError(Exception):
+    """Raised for an unknown file type or an invalid file type setting."""
+    pass
+
+class FileType(NamedTuple):
+    name: str
+    files: Tuple[str, ...] # Case-insensitive globs matched against the file name
+    extractor: str = SCRIPT
+    rules: Optional[Tuple[str, ...]] = None # Rule ids run on these files; None for every rule
+    exclude_rules: Tuple[str, ...] = ()
+
+BUILTIN_FILE_TYPES: Dict[str, FileType] = {
+    "js": FileType("js", ("*.js", "*.mjs")),
+    # Opt-in, so default scans keep to the files they always covered
+    "cjs": FileType("cjs", ("*.cjs",)),
+    "jsx": FileType("jsx", ("*.jsx",)),
+    "ts": FileType("ts", ("*.ts", "*.tsx", "*.mts", "*.cts")),
+    "html": FileType("html", ("*.html", "*.htm"), HTML),
+    "env": FileType("env", (".env", ".env.*", "*.env"), KEY_VALUE),
+    # Both rules match an unquoted key in front of ":" or "=", which JSON never has
+    "json": FileType("json", ("*.json",), JSON, exclude_rules=("AWS Secret Key", "Generic API Key")),
+    "config": FileType(
+        "config", ("*.yml", "*.yaml", "*.toml", "*.ini", "*.cfg", "*.conf", "*.properties"), KEY_VALUE
+    ),
+}
+
+_SCRIPT_OPEN_RE = re.compile(r"<script\b[^>]*>", re.IGNORECASE)
+_SCRIPT_CLOSE_RE = re.compile(r"</script\s*>", re.IGNORECASE)
+# "key = value" / "key: value" lines; the value is a quoted string (double quotes may
+# span lines) or the rest of the line up to a " #" comment
+_KEY_VALUE_RE = re.compile(
+    r"^[ \t]*(?:export[ \t]+)?[\"']?[A-Za-z_][\w.\-]*[\"']?[ \t]*[=:][ \t]*"
+    r"(\"(?:[^\"\\]|\\[\s\S]){0,%d}\"|'[^'\n]*'|[^\n]*?)(?:[ \t]+#[^\n]*)?[ \t]*\r?$" % _MAX_QUOTED_VALUE,
+    re.MULTILINE
+)
+# A string and the ":" that makes it an object key; always matches from an opening
+# quote, so unterminated strings cost no backtracking
+_JSON_STRING_RE = re.compile(r'"(?:[^"\\\n]+|\\.)*"?(\s*:)?')
+
+def html_spans(content: str, lexer: bool = False) -> List[Span]:
+    """
+    The bodies of ``<script>`` elements. With ``lexer`` each body is lexed as
+    JavaScript and its literal and comment spans are returned instead.
+    """
+    spans: List[Span] = []
+    pos = 0
+    while True:
+        opening = _SCRIPT_OPEN_RE.search(content, pos)
+        if opening is None:
+            break
+        start = opening.end()
+        closing = _SCRIPT_CLOSE_RE.search(content, start)
+        end = len(content) if closing is None else closing.start()
+        if end > start:
+            if lexer:
+                spans.extend((start + s, start + e, kind) for s, e, kind in js_spans(content[start:end]))
+            else:
+                spans.append((start, end, INLINE_SCRIPT))
+        if closing is None:
+            break
+        pos = closing.end()
+    return spans
+
+def key_value_spans(content: str, lexer: bool = False) -> List[Span]:
+    """The values (with their quotes) of ``key=value`` and ``key: value`` lines."""
+    return [(m.start(1), m.end(1), VALUE) for m in _KEY_VALUE_RE.finditer(content) if m.end(1) > m.start(1)]
+
+def json_spans(content: str, lexer: bool = False) -> List[Span]:
+    """The string values (with their quotes) of a JSON document; object keys are skipped."""
+    return [(m.start(), m.end(), STRING) for m in _JSON_STRING_RE.finditer(content) if m.group(1) is None]
+
+EXTRACTORS: Dict[str, Optional[Callable[[str, bool], List[Span]]]] = {
+    SCRIPT: None,
+    HTML: html_spans,
+    KEY_VALUE: key_value_spans,
+    JSON: json_spans,
+}
+
+def extract_spans(extractor: str, content: str, lexer: bool = False) -> Optional[List[Span]]:
+    """The spans ``extractor`` keeps of ``content``; None if the whole file is scanned."""
+    function = EXTRACTORS[extractor]
+    return None if function is None else function(content, lexer)
+
+def _string_tuple(value: Any, where: str, key: str) -> Tuple[str, ...]:
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list) or not all(isinstance(v, str) and v for v in value):
+        raise FileTypeError(f"{where}: {key} must be a list of non-empty strings")
+    return tuple(value)
+
+def _configure(name: str, settings: Any, base: Optional[FileType]) -> FileType:
+    where = f"file type {name}"
+    if settings is None:
+        settings = {}
+    if not isinstance(settings, dict):
+        raise FileTypeError(f"{where}: settings must be a mapping")
+    unknown = sorted(set(settings) - set(FILE_TYPE_KEYS))
+    if unknown:
+        raise FileTypeError(f"{where}: unknown keys {', '.join(unknown)}")
+    if base is None:
+        if "files" not in settings:
+            raise FileTypeError(f"{where}: a new file type needs 'files'")
+        base = FileType(name, ())
+    file_type = base
+    if "files" in settings:
+        file_type = file_type._replace(files=tuple(g.lower() for g in _string_tuple(settings["files"], where, "files")))
+    if "extractor" in settings:
+        if settings["extractor"] not in EXTRACTORS:
+            raise FileTypeError(f"{where}: extractor must be one of {', '.join(EXTRACTORS)}")
+        file_type = file_type._replace(extractor=settings["extractor"])
+    if "rules" in settings:
+        rules = settings["rules"]
+        file_type = file_type._replace(rules=None if rules is None else _string_tuple(rules, where, "rules"))
+    if "exclude_rules" in settings:
+        file_type = file_type._replace(exclude_rules=_string_tuple(settings["exclude_rules"], where, "exclude_rules"))
+    return file_type
+
+def resolve_file_types(
+    names: Optional[Iterable[str]] = None,
+    configured: Any = None,
+    rules: Optional[Iterable[str]] = None
+) -> Tuple[FileType, ...]:
+    """
+    The enabled file types, in matching order (the first type whose globs match a file wins).
+
+    ``configured`` is ``file_types`` from ``.jsleak.yml``: a list of type
+    names, or a mapping of names to settings (``files``, ``extractor``,
+    ``rules``, ``exclude_rules``) that adjust a built-in type or define a new
+    one. ``names`` (from ``--file-types``, ``all`` for every known type)
+    overrides which types are enabled; otherwise the configured ones are, or
+    ``DEFAULT_FILE_TYPES``. Rule ids must name built-in rules or the pack
+    rules in ``rules`` (a loaded ``RuleSet``). Raises ``FileTypeError``.
+    """
+    known = dict(BUILTIN_FILE_TYPES)
+    enabled: List[str] = list(DEFAULT_FILE_TYPES)
+    if isinstance(configured, dict):
+        for name, settings in configured.items():
+            known[name] = _configure(str(name), settings, known.get(name))
+        enabled = [str(name) for name in configured]
+    elif isinstance(configured, list):
+        enabled = [str(name) for name in configured]
+    elif configured is not None:
+        raise FileTypeError("file_types must be a list of names or a mapping of names to settings")
+
+    if names is not None:
+        enabled = []
+        for name in names:
+            enabled.extend(known if name == ALL else [name])
+    rule_ids = set(SECRETS_PATTERNS) | set(ENDPOINT_PATTERNS) | set(rules or ())
+    file_types = []
+    for name in dict.fromkeys(enabled):
+        if name not in known:
+            raise FileTypeError(f"Unknown file type: {name} (choose from {', '.join(list(known) + [ALL])})")
+        file_type = known[name]
+        unknown = sorted((set(file_type.rules or ()) | set(file_type.exclude_rules)) - rule_ids)
+        if unknown:
+            raise FileTypeError(f"file type {name}: unknown rules {', '.join(unknown)}")
+        file_types.append(file_type)
+    return tuple(file_types)
+
+_globs: Dict[Tuple[str, ...], Pattern] = {}
+
+def _glob_pattern(files: Tuple[str, ...]) -> Pattern:
+    pattern = _globs.get(files)
+    if pattern is None:
+        pattern = _globs[files] = re.compile("|".join(fnmatch.translate(g) for g in files) or r"(?!)")
+    return pattern
+
+def file_type_for(file_name: str, file_types: Optional[Iterable[FileType]] = None) -> Optional[FileType]:
+    """The first of ``file_types`` (default: ``DEFAULT_FILE_TYPES``) matching ``file_name``, or None."""
+    lower = file_name.lower()
+    for file_type in (_DEFAULTS if file_types is None else file_types):
+        if _glob_pattern(file_type.files).match(lower):
+            return file_type
+    return None
+
+_DEFAULTS = tuple(BUILTIN_FILE_TYPES[name] for name in DEFAULT_FILE_TYPES)
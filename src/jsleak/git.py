@@ -0,0 +1,34 @@
+"""
+Helpers for running the local ``git`` executable.
+"""
+import os
+import subprocess
+from typing import List
+
+class GitError(Exception):
+    """Raised when a git command fails or its output cannot be parsed."""
+    pass
+
+def popen_git(repo: str, *args: str, **kwargs) -> subprocess.Popen:
+    """Starts ``git -C repo args...``, raising GitError if git cannot be run."""
+    try:
+        return subprocess.Popen(["git", "-C", repo, *args], **kwargs)
+    except OSError as e:
+        raise GitError(f"Cannot run git: {e}")
+
+def list_git_files(path: str, include_untracked: bool = False) -> List[str]:
+    """
+    Lists the files git tracks under the directory ``path``, relative to it.
+
+    With ``include_untracked`` files that are untracked but not ignored by
+    ``.gitignore`` are listed too. The index is read in one ``git ls-files`` call.
+    """
+    args = ["ls-files", "-z", "--cached"]
+    if include_untracked:
+        args += ["--others", "--exclude-standard"]
+    proc = popen_git(path, *args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    out, err = proc.communicate()
+    if proc.returncode:
+        raise GitError(err.decode("utf-8", "replace").strip() or f"git ls-files exited with status {proc.returncode}")
+    # Unmerged entries are listed once per stage, and untracked files come first
+    return sorted(set(os.fsdecode(p) for p in out.split(b"\0") if p))
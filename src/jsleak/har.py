@@ -0,0 +1,131 @@
+"""
+HAR (HTTP Archive) scanning.
+
+Browser session captures run to hundreds of megabytes, so the archive is
+never loaded as a whole: ``iter_har_entries`` walks the top-level JSON
+structure and decodes ``log.entries`` one entry at a time from a bounded
+buffer. Response bodies are filtered by MIME type, base64 bodies are decoded
+as they are read, and identical bodies are scanned once (by SHA-256).
+Findings are reported against the request URL, with line and column inside
+the response body.
+"""
+import base64
+import binascii
+import hashlib
+from typing import Any, Dict, IO, Iterable, Iterator, NamedTuple, Optional, Set, Tuple, Union
+from .scanner import Scanner
+from .decoder import Decoder
+from .engines import RE
+from .directory import FileResult, batch_file_result
+from .ignorer import Ignorer
+from .rules import RuleSet
+from .jsonstream import JsonStreamReader
+
+# Substrings of the response MIME type scanned by default: scripts and JSON/XHR payloads
+DEFAULT_MIME_TYPES = ("javascript", "ecmascript", "json")
+
+class HarError(Exception):
+    """Raised when a HAR file cannot be read or is not valid HAR JSON."""
+    pass
+
+class HarBody(NamedTuple):
+    url: str
+    entry: int
+    mime_type: str
+    digest: str
+
+class _HarReader(JsonStreamReader):
+    error_class = HarError
+
+def iter_har_entries(stream: IO[str], chunk_size: int = 1024 * 1024) -> Iterator[Dict[str, Any]]:
+    """Yields the objects of ``log.entries`` in order, decoding one at a time."""
+    reader = _HarReader(stream, getattr(stream, "name", "HAR file"))
+    reader.CHUNK_SIZE = chunk_size
+    found = False
+    for key in reader.iter_object():
+        if key != "log":
+            reader.value()
+            continue
+        for log_key in reader.iter_object():
+            if log_key != "entries":
+                reader.value()
+                continue
+            found = True
+            for _ in reader.iter_array():
+                entry = reader.value()
+                if isinstance(entry, dict):
+                    yield entry
+    if not found:
+        raise HarError("Not a HAR file: no log.entries")
+
+def _body(entry: Dict[str, Any]) -> Tuple[str, Optional[Union[str, bytes]]]:
+    content = (entry.get("response") or {}).get("content") or {}
+    mime_type = (content.get("mimeType") or "").split(";", 1)[0].strip().lower()
+    text = content.get("text")
+    if not isinstance(text, str) or not text:
+        return mime_type, None
+    if content.get("encoding") == "base64":
+        try:
+            return mime_type, base64.b64decode(text)
+        except (binascii.Error, ValueError):
+            return mime_type, None
+    return mime_type, text
+
+def iter_har_bodies(
+    path: str,
+    mime_types: Iterable[str] = DEFAULT_MIME_TYPES,
+    skip: Optional[Set[str]] = None
+) -> Iterator[Tuple[HarBody, Union[str, bytes]]]:
+    """
+    Yields ``(HarBody, body)`` for each response body of ``path`` whose MIME
+    type contains one of ``mime_types``, first occurrence only. Base64 bodies
+    are yielded as bytes. Bodies whose SHA-256 is in ``skip`` (scanned by an
+    earlier run) are not yielded again.
+    """
+    mime_types = tuple(t.lower() for t in mime_types)
+    seen: Set[str] = set(skip or ())
+    try:
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            for i, entry in enumerate(iter_har_entries(f)):
+                url = (entry.get("request") or {}).get("url") or f"entry #{i}"
+                mime_type, body = _body(entry)
+                if body is None or not any(t in mime_type for t in mime_types):
+                    continue
+                data = body.encode("utf-8", "surrogatepass") if isinstance(body, str) else body
+                digest = hashlib.sha256(data).hexdigest()
+                if digest in seen:
+                    continue
+                seen.add(digest)
+                yield HarBody(url, i, mime_type, digest), body
+    except (OSError, UnicodeDecodeError) as e:
+        raise HarError(f"Cannot read HAR file {path}: {e}") from e
+
+def scan_har(
+    path: str,
+    ignorer: Ignorer = None,
+    mime_types: Iterable[str] = DEFAULT_MIME_TYPES,
+    max_endpoints_per_file: Optional[int] = None,
+    jobs: int = 1,
+    skip: Optional[Set[str]] = None,
+    lexer: bool = False,
+    decode: bool = False,
+    engine: str = RE,
+    rules: Optional[RuleSet] = None
+) -> Iterator[FileResult]:
+    """
+    Scans the response bodies of a HAR file.
+
+    Results carry the request URL as ``file``, the body's ``content_hash``
+    and ``mime_type``; locations are within the body. With ``jobs`` > 1 bodies
+    are scanned by a process pool while the next entries are parsed. Body
+    digests in ``skip`` are not scanned. ``lexer``, ``decode``, ``engine`` and
+    ``rules`` configure the scanner as for ``scan_history``. Raises ``HarError``
+    while iterating if the file cannot be parsed.
+    """
+    bodies = iter_har_bodies(path, mime_types, skip)
+    scanner = Scanner(lexer=lexer, decoder=Decoder() if decode else None, engine=engine, rules=rules)
+    backend = "process" if jobs > 1 else "serial"
+    for result in scanner.scan_many(bodies, backend=backend, max_workers=jobs):
+        item = result.id
+        yield batch_file_result(result, ignorer, max_endpoints_per_file,
+                                file=item.url, content_hash=item.digest, mime_type=item.mime_type)
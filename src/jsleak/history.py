@@ -0,0 +1,239 @@
+"""
+Git history scanning.
+
+Every JavaScript blob reachable from the given refs is read through one
+long-lived ``git cat-file --batch`` process, so no revision is ever checked
+out. Blobs are deduplicated by SHA: each is scanned once and its findings are
+attributed to the first commit (oldest first) and path that introduced it.
+"""
+import os
+import queue
+import subprocess
+import tempfile
+import threading
+from typing import Callable, IO, Iterable, Iterator, NamedTuple, Optional, Set, Tuple
+from .git import GitError, popen_git
+from .scanner import Scanner
+from .decoder import Decoder
+from .engines import RE
+from .directory import FileResult, batch_file_result, in_shard, is_scannable
+from .ignorer import Ignorer
+from .rules import RuleSet
+
+_NULL_SHA = "0" * 40
+# Regular and executable files; symlinks (120000) and submodules (160000) have no JS content
+_FILE_MODES = ("100644", "100755")
+
+class HistoryBlob(NamedTuple):
+    blob: str
+    commit: str
+    path: str
+
+def _iter_nul_tokens(stream: IO[bytes], chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    rest = b""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        parts = (rest + chunk).split(b"\0")
+        rest = parts.pop()
+        yield from parts
+    if rest:
+        yield rest
+
+def iter_history_blobs(
+    repo: str,
+    refs: Iterable[str] = ("HEAD",),
+    include: Optional[Callable[[str], bool]] = None,
+    on_start: Optional[Callable[[subprocess.Popen], None]] = None
+) -> Iterator[HistoryBlob]:
+    """
+    Yields each unique blob added or modified in the history of ``refs``, oldest commit first.
+
+    Paths are relative to the repository root with forward slashes and limited to
+    ``repo`` when it is a subdirectory. ``include`` filters on those paths.
+    ``on_start`` is called with the ``git log`` process, so a consumer reading
+    on another thread can kill it to stop early.
+    """
+    refs = list(refs)
+    for ref in refs:
+        if ref.startswith("-"):
+            raise GitError(f"Invalid ref '{ref}'")
+
+    # Stderr goes to a file: a pipe nobody reads until stdout ends could fill up and block git
+    errors = tempfile.TemporaryFile()
+    try:
+        # -m reports blobs introduced by merge resolutions; --reverse puts the oldest commit first
+        proc = popen_git(
+            repo, "log", "--reverse", "--topo-order", "-m", "--raw", "--no-abbrev", "--no-renames",
+            "-z", "--format=%x01%H", *refs, "--", ".",
+            stdout=subprocess.PIPE, stderr=errors
+        )
+    except GitError:
+        errors.close()
+        raise
+    if on_start is not None:
+        on_start(proc)
+    seen = set()
+    commit = None
+    pending = None
+    completed = False
+    try:
+        for token in _iter_nul_tokens(proc.stdout):
+            if pending is not None:
+                # The path token following a raw diff line
+                path = os.fsdecode(token)
+                if pending and pending not in seen and (include is None or include(path)):
+                    seen.add(pending)
+                    yield HistoryBlob(pending, commit, path)
+                pending = None
+                continue
+            token = token.lstrip(b"\n")
+            if token.startswith(b"\x01"):
+                commit = token[1:].decode("ascii")
+            elif token.startswith(b":"):
+                fields = token[1:].decode("ascii").split(" ")
+                if len(fields) != 5 or commit is None:
+                    raise GitError(f"Unexpected git log output: {token[:80]!r}")
+                _, new_mode, _, new_sha, _ = fields
+                # Deleted files and non-file entries still need their path token consumed
+                pending = new_sha if new_mode in _FILE_MODES and new_sha != _NULL_SHA else False
+            elif token:
+                raise GitError(f"Unexpected git log output: {token[:80]!r}")
+        completed = True
+    finally:
+        proc.stdout.close()
+        status = proc.wait()
+        errors.seek(0)
+        stderr = errors.read().decode("utf-8", "replace").strip()
+        errors.close()
+        # A consumer that stops early makes git exit on a broken pipe, that is not an error
+        if status and completed:
+            raise GitError(stderr or f"git log exited with status {status}")
+
+def iter_blob_contents(
+    repo: str,
+    blobs: Iterable[HistoryBlob],
+    cancel: Optional[Callable[[], None]] = None
+) -> Iterator[Tuple[HistoryBlob, bytes]]:
+    """
+    Streams the content of ``blobs`` through a single ``git cat-file --batch`` process.
+
+    Requests are written from a background thread while contents are read here,
+    so git never waits for a round trip; pipe buffers bound what is in flight.
+    When the consumer stops early the writer is told to stop, ``cancel`` is
+    called to unblock it while it waits on ``blobs`` (e.g. by killing the
+    ``git log`` producing them) and ``cat-file`` is killed before the writer
+    is joined.
+    """
+    proc = popen_git(repo, "cat-file", "--batch", "--buffer",
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    requested: "queue.Queue" = queue.Queue()
+    writer_error = []
+    stop = threading.Event()
+
+    def write_requests():
+        try:
+            for item in blobs:
+                if stop.is_set():
+                    break
+                requested.put(item)
+                proc.stdin.write(item.blob.encode("ascii") + b"\n")
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        except Exception as e:
+            # Errors of a cancelled producer are expected
+            if not stop.is_set():
+                writer_error.append(e)
+            try:
+                proc.stdin.close()
+            except OSError:
+                pass
+        finally:
+            requested.put(None)
+
+    writer = threading.Thread(target=write_requests, name="jsleak-cat-file", daemon=True)
+    writer.start()
+    try:
+        while True:
+            item = requested.get()
+            if item is None:
+                break
+            header = proc.stdout.readline()
+            if not header:
+                raise GitError("git cat-file exited early")
+            parts = header.split()
+            if len(parts) == 2 and parts[1] == b"missing":
+                continue
+            if len(parts) != 3:
+                raise GitError(f"Unexpected git cat-file output: {header[:80]!r}")
+            size = int(parts[2])
+            content = proc.stdout.read(size)
+            proc.stdout.read(1) # trailing newline
+            yield item, content
+        if writer_error:
+            raise GitError(str(writer_error[0]))
+    finally:
+        stop.set()
+        if writer.is_alive():
+            if cancel is not None:
+                cancel()
+            if proc.poll() is None:
+                proc.kill()
+        writer.join()
+        if proc.poll() is None:
+            proc.kill()
+        proc.stdout.close()
+        proc.wait()
+
+def scan_history(
+    repo: str,
+    refs: Iterable[str] = ("HEAD",),
+    ignorer: Ignorer = None,
+    include_minified: bool = False,
+    shard: Optional[Tuple[int, int]] = None,
+    max_endpoints_per_file: Optional[int] = None,
+    jobs: int = 1,
+    skip: Optional[Set[str]] = None,
+    lexer: bool = False,
+    decode: bool = False,
+    engine: str = RE,
+    rules: Optional[RuleSet] = None
+) -> Iterator[FileResult]:
+    """
+    Scans every unique JavaScript blob in the history of ``refs``.
+
+    Results carry the repository-relative ``file`` plus the ``commit`` and
+    ``blob`` that introduced the content. With ``jobs`` > 1 blobs are scanned by
+    a process pool while the next ones are read from git. Blob SHAs in ``skip``
+    are not scanned. ``lexer`` enables the scanner's JavaScript lexer pre-pass,
+    ``decode`` its decoding stage and ``engine`` selects its regex backend;
+    ``rules`` are rule packs it runs next to the built-in rules.
+
+    Only JavaScript is scanned, with every rule: ``file_types`` routing and
+    the ``--max-memory`` chunked scan apply to directory scans only (a blob
+    arrives whole from git).
+    """
+    def include(path: str) -> bool:
+        if not is_scannable(path.rsplit("/", 1)[-1], include_minified):
+            return False
+        if ignorer and ignorer.should_ignore_file(path):
+            return False
+        return not shard or in_shard(path, ".", shard)
+
+    log = []
+    def kill_log():
+        if log and log[0].poll() is None:
+            log[0].kill()
+
+    blobs = iter_history_blobs(repo, refs, include, on_start=log.append)
+    if skip:
+        blobs = (b for b in blobs if b.blob not in skip)
+    contents = iter_blob_contents(repo, blobs, cancel=kill_log)
+    scanner = Scanner(lexer=lexer, decoder=Decoder() if decode else None, engine=engine, rules=rules)
+    backend = "process" if jobs > 1 else "serial"
+    for result in scanner.scan_many(contents, backend=backend, max_workers=jobs):
+        item = result.id
+        yield batch_file_result(result, ignorer, max_endpoints_per_file,
+                                file=item.path, commit=item.commit, blob=item.blob)
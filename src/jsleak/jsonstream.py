@@ -0,0 +1,108 @@
+"""
+Incremental JSON reading for inputs too large to load: shard reports for
+``merge`` and HAR captures. Only the current value (plus one read chunk) is
+held in memory.
+"""
+import json
+from typing import IO, Any, Iterator, Optional, Type
+
+class JsonStreamReader:
+    """
+    Minimal pull parser over a text stream.
+
+    Containers that may be large (a top-level JSON list, SARIF ``results``,
+    HAR ``log.entries``) are walked with ``iter_array``/``iter_object``;
+    everything else is decoded as a whole value with
+    ``json.JSONDecoder.raw_decode``. Errors are raised as ``error_class``,
+    prefixed with the stream's ``name``.
+    """
+    CHUNK_SIZE = 64 * 1024
+    error_class: Type[Exception] = ValueError
+
+    def __init__(self, stream: IO[str], name: str = "<stream>"):
+        self.stream = stream
+        self.name = name
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self, size: Optional[int] = None) -> bool:
+        if self.eof:
+            return False
+        data = self.stream.read(size or self.CHUNK_SIZE)
+        if not data:
+            self.eof = True
+            return False
+        # Drop the consumed prefix so the buffer stays bounded
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        self.buf += data
+        return True
+
+    def _error(self, message: str) -> Exception:
+        return self.error_class(f"{self.name}: {message}")
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise self._error(f"expected '{char}', found '{found or 'EOF'}'")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        size = self.CHUNK_SIZE
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buf, self.pos)
+                # A value ending exactly at the buffer edge may be truncated (e.g. a number)
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError as e:
+                if self.eof:
+                    raise self._error(f"invalid JSON: {e}")
+            self._fill(size)
+            size *= 2
+
+    def iter_array(self) -> Iterator[None]:
+        """Yields once per element; the caller must consume the element before resuming."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield
+            char = self.peek()
+            self.pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise self._error(f"expected ',' or ']', found '{char or 'EOF'}'")
+
+    def iter_object(self) -> Iterator[str]:
+        """Yields each key; the caller must consume the value before resuming."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            char = self.peek()
+            self.pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise self._error(f"expected ',' or '}}', found '{char or 'EOF'}'")
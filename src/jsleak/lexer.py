@@ -0,0 +1,181 @@
+"""
+Single-pass JavaScript/TypeScript lexer for the ``--lexer`` pre-pass.
+
+Splits source into string, template-literal, regex-literal and comment spans
+so literal-only rules can skip identifiers and code structure. The lexer only
+looks for the characters that open a literal or comment and jumps over each
+token with one regex match, so it stays linear on minified bundles. It does not
+validate syntax: an unterminated string ends at the line break, and an
+unterminated template or comment at the end of the file.
+"""
+import re
+from bisect import bisect_right
+from typing import List, Optional, Tuple
+
+STRING = "string"
+TEMPLATE = "template"
+REGEX = "regex"
+COMMENT = "comment"
+# Syntax of positions outside any span
+CODE = "code"
+
+Span = Tuple[int, int, str]
+
+# Characters that may open a token, plus braces while inside a template ${...}
+_CODE_RE = re.compile(r"[\"'`/]")
+_NESTED_CODE_RE = re.compile(r"[\"'`/{}]")
+_TEMPLATE_CHUNK_RE = re.compile(r"\\[\s\S]|`|\$\{")
+_STRING_RES = {
+    '"': re.compile(r'"(?:[^"\\\n]+|\\[\s\S])*"?'),
+    "'": re.compile(r"'(?:[^'\\\n]+|\\[\s\S])*'?"),
+}
+_REGEX_RE = re.compile(r"/(?![*/])(?:[^/\\\[\n]+|\\.|\[(?:[^\]\\\n]+|\\.)*\])+/[A-Za-z]*")
+# A "/" after one of these words starts a regex literal, not a division
+_KEYWORD_TAIL_RE = re.compile(
+    r"(?<![\w$])(?:return|typeof|instanceof|in|of|new|delete|void|throw|case|do|else|yield|await)$"
+)
+_WHITESPACE = " \t\r\n\u00a0\ufeff"
+
+def _regex_allowed(content: str, pos: int) -> bool:
+    # Decides regex versus division from the previous significant character
+    i = pos - 1
+    while i >= 0 and content[i] in _WHITESPACE:
+        i -= 1
+    if i < 0:
+        return True
+    prev = content[i]
+    if prev in ")]}\"'`" or prev.isdigit():
+        return False
+    if prev in "+-" and i > 0 and content[i - 1] == prev:
+        # Postfix a++ / b
+        return False
+    if prev.isalpha() or prev in "_$":
+        return _KEYWORD_TAIL_RE.search(content, max(0, i - 10), i + 1) is not None
+    return True
+
+def js_spans(content: str) -> List[Span]:
+    """
+    Returns the ``(start, end, kind)`` literal and comment spans of ``content``,
+    in order and non-overlapping. Delimiters are part of the span. A template
+    literal is one span including its ``${...}`` expressions.
+    """
+    spans: List[Span] = []
+    n = len(content)
+    pos = 0
+    # Brace depth of each open ${...} expression, innermost last
+    depths: List[int] = []
+    in_template = False
+    template_start = 0
+
+    while pos < n:
+        if in_template:
+            m = _TEMPLATE_CHUNK_RE.search(content, pos)
+            if m is None:
+                pos = n
+                break
+            token = m.group()
+            pos = m.end()
+            if token == "`":
+                in_template = False
+                if not depths:
+                    spans.append((template_start, pos, TEMPLATE))
+            elif token == "${":
+                depths.append(0)
+                in_template = False
+            continue
+
+        m = (_NESTED_CODE_RE if depths else _CODE_RE).search(content, pos)
+        if m is None:
+            break
+        start = m.start()
+        char = m.group()
+        kind = None
+        end = start + 1
+
+        if char == "{":
+            depths[-1] += 1
+        elif char == "}":
+            if depths[-1]:
+                depths[-1] -= 1
+            else:
+                depths.pop()
+                in_template = True
+        elif char == "`":
+            if not depths:
+                template_start = start
+            in_template = True
+        elif char in _STRING_RES:
+            end = _STRING_RES[char].match(content, start).end()
+            kind = STRING
+        else:
+            following = content[start + 1:start + 2]
+            if following == "/":
+                newline = content.find("\n", start)
+                end = n if newline < 0 else newline
+                kind = COMMENT
+            elif following == "*":
+                close = content.find("*/", start + 2)
+                end = n if close < 0 else close + 2
+                kind = COMMENT
+            elif _regex_allowed(content, start):
+                regex = _REGEX_RE.match(content, start)
+                if regex is not None:
+                    end = regex.end()
+                    kind = REGEX
+
+        # Literals inside a template expression belong to the template's span
+        if kind is not None and not depths:
+            spans.append((start, end, kind))
+        pos = end
+
+    if in_template or depths:
+        spans.append((template_start, n, TEMPLATE))
+    return spans
+
+class LiteralView:
+    """
+    The literal and comment spans of a source, joined by newlines into ``text``.
+
+    Literal-only patterns run over ``text``; ``position`` maps an offset in
+    ``text`` back to the source, and ``kind_at`` gives the syntax of a source offset.
+    With ``prefix`` each span is extended backwards by up to that many characters
+    of code (overlapping ranges are merged), for patterns that match a key name
+    in front of a literal.
+    """
+    __slots__ = ("spans", "text", "_span_starts", "_range_starts", "_text_starts", "_widened")
+
+    def __init__(self, content: str, spans: Optional[List[Span]] = None, prefix: int = 0):
+        self.spans = js_spans(content) if spans is None else spans
+        self._span_starts = [start for start, _, _ in self.spans]
+        ranges: List[List[int]] = []
+        for start, end, _ in self.spans:
+            start = max(0, start - prefix)
+            if ranges and start <= ranges[-1][1]:
+                ranges[-1][1] = end
+            else:
+                ranges.append([start, end])
+        self.text = "\n".join(content[start:end] for start, end in ranges)
+        self._range_starts = [start for start, _ in ranges]
+        self._text_starts = []
+        offset = 0
+        for start, end in ranges:
+            self._text_starts.append(offset)
+            offset += end - start + 1
+        self._widened = {}
+
+    def widened(self, content: str, prefix: int) -> "LiteralView":
+        """The view of the same spans with ``prefix`` characters of leading code, built once."""
+        view = self._widened.get(prefix)
+        if view is None:
+            view = self._widened[prefix] = LiteralView(content, self.spans, prefix)
+        return view
+
+    def position(self, text_index: int) -> int:
+        i = bisect_right(self._text_starts, text_index) - 1
+        return self._range_starts[i] + text_index - self._text_starts[i]
+
+    def kind_at(self, index: int) -> str:
+        i = bisect_right(self._span_starts, index) - 1
+        if i >= 0 and index < self.spans[i][1]:
+            return self.spans[i][2]
+        return CODE
@@ -0,0 +1,74 @@
+"""
+Memory budget for ``--max-memory``.
+
+A scan's memory is dominated by the files in flight: the raw bytes of files
+read ahead, and the file being scanned, which costs a few times its size
+(bytes, decoded text, match buffers) and about ten times with a lexer or
+extractor view. ``MemoryBudget`` splits what the limit leaves above the
+process's resident size at startup between the two. Files too large for the
+scan share are not read whole but scanned in overlapping chunks (see
+``Scanner.scan_chunks``), and process pools get only as many workers as the
+budget holds. Results are streamed to the reporter, so they do not grow with
+the scan. The peak resident size is reported with the budget in the stats.
+"""
+import os
+from typing import Any, Dict, Optional
+from .metrics import peak_rss_bytes
+
+# Peak bytes per byte of a file while it is scanned whole, measured on JavaScript
+SCAN_COST = 3
+VIEW_COST = 10 # With a lexer or extractor ``LiteralView``
+# Resident size of each process pool worker before it holds any content
+WORKER_COST = 48 * 1024 * 1024
+# Floors for limits below what the process already uses
+MIN_AVAILABLE = 16 * 1024 * 1024
+MIN_CHUNK = 1024 * 1024
+
+def current_rss_bytes() -> Optional[int]:
+    """Resident set size of this process now (Linux), else the peak so far, or None."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return peak_rss_bytes()
+
+class MemoryBudget:
+    """
+    Splits ``limit`` bytes of resident memory between the file being scanned
+    (half), files read ahead (a quarter) and results and reporting (the rest).
+    ``baseline`` is what the process uses before scanning (default: measured now).
+    """
+
+    def __init__(self, limit: int, baseline: Optional[int] = None):
+        self.limit = limit
+        if baseline is None:
+            baseline = current_rss_bytes() or 0
+        self.baseline = baseline
+        self.available = max(limit - self.baseline, MIN_AVAILABLE)
+        self.read_ahead_bytes = self.available // 4
+        self.chunked_files = 0
+
+    @property
+    def exceeded_at_start(self) -> bool:
+        """True if the process already used the whole limit before scanning."""
+        return self.limit - self.baseline < MIN_AVAILABLE
+
+    def max_file_bytes(self, views: bool = False) -> int:
+        """Largest file scanned whole; ``views`` if a lexer or extractor view is built."""
+        return self.available // 2 // (VIEW_COST if views else SCAN_COST)
+
+    def chunk_chars(self, views: bool = False) -> int:
+        """Characters read per chunk of a file scanned in chunks."""
+        return max(self.max_file_bytes(views), MIN_CHUNK)
+
+    def workers(self, requested: int) -> int:
+        """Process pool workers the budget holds, at most ``requested`` and at least 1."""
+        return max(1, min(requested, self.available // 2 // WORKER_COST))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "limit_bytes": self.limit,
+            "baseline_bytes": self.baseline,
+            "peak_rss_bytes": peak_rss_bytes(),
+            "chunked_files": self.chunked_files,
+        }
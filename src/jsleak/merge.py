@@ -0,0 +1,218 @@
+"""
+Streaming merge of per-shard JSON and SARIF reports.
+
+Shard outputs are parsed element by element (``jsonstream``), so merging hundreds of large
+reports keeps only one finding (plus the deduplicated rule table) in memory.
+"""
+import json
+from typing import IO, Any, Dict, Iterator, List, Optional
+from .jsonstream import JsonStreamReader
+from .sarif import SarifWriter
+
+# Top-level keys of a --group-secrets JSON report
+GROUPED_KEYS = ("secrets", "files")
+
+class MergeError(Exception):
+    """Raised when a shard report cannot be parsed or merged."""
+    pass
+
+class _StreamReader(JsonStreamReader):
+    error_class = MergeError
+
+def detect_format(path: str) -> str:
+    """
+    Returns "json" for a jsleak JSON list report, "grouped" for a
+    ``--group-secrets`` JSON report, "sarif" for a SARIF document.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        reader = _StreamReader(f, path)
+        first = reader.peek()
+        if first == "[":
+            return "json"
+        if first == "{":
+            # A grouped report starts with "secrets", SARIF with "$schema"/"version"
+            return "grouped" if next(reader.iter_object(), None) in GROUPED_KEYS else "sarif"
+    raise MergeError(f"{path}: not a jsleak JSON or SARIF report")
+
+def iter_json_report(path: str) -> Iterator[Dict[str, Any]]:
+    """Yields per-file items of a report written by ``Reporter`` in JSON format."""
+    with open(path, "r", encoding="utf-8") as f:
+        reader = _StreamReader(f, path)
+        for _ in reader.iter_array():
+            yield reader.value()
+
+def iter_sarif_report(path: str, rules: Dict[str, Dict[str, Any]], stats: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Yields SARIF results of every run in a report written by ``SarifWriter`` or ``generate_sarif``.
+
+    Rules are collected into ``rules`` (first definition of an id wins) and
+    ``properties.stats`` of each run is summed into ``stats``.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        reader = _StreamReader(f, path)
+        for key in reader.iter_object():
+            if key != "runs":
+                reader.value()
+                continue
+            for _ in reader.iter_array():
+                for run_key in reader.iter_object():
+                    if run_key == "results":
+                        for _ in reader.iter_array():
+                            yield reader.value()
+                    elif run_key == "tool":
+                        tool = reader.value()
+                        for rule in tool.get("driver", {}).get("rules", []):
+                            rules.setdefault(rule["id"], rule)
+                    elif run_key == "properties":
+                        run_stats = reader.value().get("stats", {})
+                        for name in ("files_scanned", "endpoints_found"):
+                            stats[name] += run_stats.get(name, 0)
+                    else:
+                        reader.value()
+
+def iter_grouped_report(path: str, section: str) -> Iterator[Dict[str, Any]]:
+    """Yields the items of the ``secrets`` or ``files`` list of a ``--group-secrets`` JSON report."""
+    with open(path, "r", encoding="utf-8") as f:
+        reader = _StreamReader(f, path)
+        for key in reader.iter_object():
+            if key != section:
+                reader.value()
+                continue
+            for _ in reader.iter_array():
+                yield reader.value()
+
+def _new_stats() -> Dict[str, Any]:
+    return {
+        "files_scanned": 0,
+        "secrets_found": 0,
+        "endpoints_found": 0,
+        "secrets_by_severity": {}
+    }
+
+def _count_secret(stats: Dict[str, Any], severity: str):
+    stats["secrets_found"] += 1
+    stats["secrets_by_severity"][severity] = stats["secrets_by_severity"].get(severity, 0) + 1
+
+def _write_list_item(out: IO[str], item: Any, first: bool):
+    # Same bytes as json.dumps(whole_list, indent=2), one element at a time
+    out.write("\n" if first else ",\n")
+    out.write("  " + json.dumps(item, indent=2).replace("\n", "\n  "))
+
+def merge_json(paths: List[str], out: Optional[IO[str]]) -> Dict[str, Any]:
+    stats = _new_stats()
+    seen_files = set()
+    first = True
+    if out:
+        out.write("[")
+    for path in paths:
+        for item in iter_json_report(path):
+            # Shards are disjoint, but a rerun shard must not double count
+            # (history scans report one item per blob, so a path may repeat)
+            key = (item.get("file"), item.get("blob"))
+            if key in seen_files:
+                continue
+            seen_files.add(key)
+            stats["files_scanned"] += 1
+            for findings in item.get("secrets", {}).values():
+                for finding in findings:
+                    _count_secret(stats, finding.get("severity", "LOW"))
+            stats["endpoints_found"] += sum(len(v) for v in item.get("endpoints", {}).values())
+            if out:
+                _write_list_item(out, item, first)
+            first = False
+    if out:
+        out.write("]\n" if first else "\n]\n")
+    return stats
+
+def merge_sarif(paths: List[str], out: Optional[IO[str]]) -> Dict[str, Any]:
+    stats = _new_stats()
+    rules: Dict[str, Dict[str, Any]] = {}
+    # Rules are only complete after the last shard, so they go after the results
+    writer = SarifWriter(out) if out else None
+    for path in paths:
+        for result in iter_sarif_report(path, rules, stats):
+            properties = result.get("properties", {})
+            # A --group-secrets result stands for all its occurrences
+            for _ in range(properties.get("occurrences", 1)):
+                _count_secret(stats, properties.get("severity", "LOW"))
+            if writer:
+                writer.write_result(result)
+    if writer:
+        for rule in rules.values():
+            writer.add_rule(rule)
+        writer.close(stats)
+        out.write("\n")
+    return stats
+
+def merge_grouped(paths: List[str], out: Optional[IO[str]]) -> Dict[str, Any]:
+    """
+    Merges ``--group-secrets`` JSON reports: secrets with the same fingerprint
+    become one, with the union of their occurrences. Only the secrets are held
+    in memory; ``files`` items are streamed. ``files_scanned`` counts the files
+    the reports mention (findings, errors or endpoints), the only ones they list.
+    """
+    stats = _new_stats()
+    groups: Dict[str, Dict[str, Any]] = {}
+    seen_occurrences: Dict[str, set] = {}
+    scanned = set()
+    for path in paths:
+        for secret in iter_grouped_report(path, "secrets"):
+            fingerprint = secret["fingerprint"]
+            group = groups.get(fingerprint)
+            if group is None:
+                group = groups[fingerprint] = dict(secret, occurrences=[])
+                seen_occurrences[fingerprint] = set()
+            seen = seen_occurrences[fingerprint]
+            for o in secret.get("occurrences", []):
+                key = (o["file"], o["line"], o["column"], o.get("commit"))
+                if key not in seen:
+                    seen.add(key)
+                    group["occurrences"].append(o)
+    for group in groups.values():
+        occurrences = group["occurrences"]
+        sources = {(o["file"], o.get("commit")) for o in occurrences}
+        group["occurrence_count"] = len(occurrences)
+        group["file_count"] = len(sources)
+        scanned.update(sources)
+        for _ in occurrences:
+            _count_secret(stats, group.get("severity", "LOW"))
+
+    if out:
+        out.write('{\n  "secrets": [')
+        for i, group in enumerate(groups.values()):
+            out.write(("," if i else "") + "\n    " + json.dumps(group, indent=2).replace("\n", "\n    "))
+        out.write(("\n  " if groups else "") + '],\n  "files": [')
+    seen_files = set()
+    for path in paths:
+        for item in iter_grouped_report(path, "files"):
+            key = (item.get("file"), item.get("blob"))
+            if key in seen_files:
+                continue
+            scanned.add((item.get("file"), item.get("commit")))
+            stats["endpoints_found"] += sum(len(v) for v in item.get("endpoints", {}).values())
+            if out:
+                out.write(("," if seen_files else "") + "\n    " + json.dumps(item, indent=2).replace("\n", "\n    "))
+            seen_files.add(key)
+    if out:
+        out.write(("\n  " if seen_files else "") + "]\n}\n")
+    stats["files_scanned"] = len(scanned)
+    return stats
+
+def merge_reports(paths: List[str], out: Optional[IO[str]] = None) -> Dict[str, Any]:
+    """
+    Merges shard reports of one kind (all JSON, all grouped JSON or all SARIF) into ``out``.
+
+    Returns unified stats in the shape used by ``cli.main``. Pass ``out=None``
+    to only compute stats.
+    """
+    if not paths:
+        raise MergeError("no reports to merge")
+    kinds = {detect_format(p) for p in paths}
+    if len(kinds) > 1:
+        raise MergeError(f"cannot merge different report kinds together ({', '.join(sorted(kinds))})")
+    kind = kinds.pop()
+    if kind == "json":
+        return merge_json(paths, out)
+    if kind == "grouped":
+        return merge_grouped(paths, out)
+    return merge_sarif(paths, out)
@@ -0,0 +1,172 @@
+"""
+OpenMetrics instrumentation for ``--metrics-file`` and ``jsleak watch --metrics-port``.
+
+Scans record per-file latency histograms by phase (read, decode, scan, report),
+bytes scanned, files by outcome and peak RSS. ``Metrics.render`` produces the
+OpenMetrics text format, which the Prometheus node_exporter textfile collector
+and a Prometheus scrape both accept. Nothing is recorded unless a ``Metrics``
+object is created, so disabled metrics cost nothing.
+"""
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+
+PHASES = ("read", "decode", "scan", "report")
+OUTCOMES = ("scanned", "skipped", "errored", "cached")
+# Seconds; per-file phases range from microseconds (small reads) to seconds (large bundles)
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+class Histogram:
+    """A fixed-bucket histogram; bucket counts are made cumulative when rendered."""
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process, or None where it cannot be read."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+class Metrics:
+    """Scan metrics. Methods are thread-safe so a metrics server can render while a scan records."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.phases: Dict[str, Histogram] = {phase: Histogram() for phase in PHASES}
+        self.files: Dict[str, int] = dict.fromkeys(OUTCOMES, 0)
+        self.bytes_scanned = 0
+        self.scan_seconds = 0.0
+        self.secrets_found = 0
+        self._lock = threading.Lock()
+
+    def observe_result(self, res: Dict, report_seconds: float, findings: int = 0, cached: bool = False):
+        """
+        Records one result: its ``timings`` (read, decode, scan seconds) and
+        ``size`` as set by ``scan_file``, the time spent reporting it, the
+        number of findings reported and its outcome.
+        """
+        with self._lock:
+            self.phases["report"].observe(report_seconds)
+            if res.get("error"):
+                self.files["errored"] += 1
+                return
+            self.files["cached" if cached else "scanned"] += 1
+            self.secrets_found += findings
+            if cached:
+                return
+            timings = res.get("timings")
+            if timings is not None:
+                for phase, seconds in zip(PHASES, timings):
+                    self.phases[phase].observe(seconds)
+                self.scan_seconds += sum(timings)
+            self.bytes_scanned += res.get("size", 0)
+
+    def add_skipped(self, count: int):
+        with self._lock:
+            self.files["skipped"] += count
+
+    def render(self) -> str:
+        """The metrics in OpenMetrics text format, ending with ``# EOF``."""
+        with self._lock:
+            lines: List[str] = []
+
+            def family(name: str, metric_type: str, help_text: str, unit: str = ""):
+                lines.append(f"# TYPE {name} {metric_type}")
+                if unit:
+                    lines.append(f"# UNIT {name} {unit}")
+                lines.append(f"# HELP {name} {help_text}")
+
+            family("jsleak_file_phase_seconds", "histogram", "Per-file latency by phase.", "seconds")
+            for phase, hist in self.phases.items():
+                cumulative = 0
+                for bound, count in zip(hist.buckets + (float("inf"),), hist.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'jsleak_file_phase_seconds_bucket{{phase="{phase}",le="{le}"}} {cumulative}')
+                lines.append(f'jsleak_file_phase_seconds_count{{phase="{phase}"}} {hist.count}')
+                lines.append(f'jsleak_file_phase_seconds_sum{{phase="{phase}"}} {_format_value(hist.sum)}')
+
+            family("jsleak_files", "counter", "Files by outcome.")
+            for outcome, count in self.files.items():
+                lines.append(f'jsleak_files_total{{outcome="{outcome}"}} {count}')
+
+            family("jsleak_scanned_bytes", "counter", "Bytes read from scanned files.", "bytes")
+            lines.append(f"jsleak_scanned_bytes_total {self.bytes_scanned}")
+
+            family("jsleak_throughput_bytes_per_second", "gauge",
+                   "Bytes scanned per second spent reading, decoding and scanning.")
+            throughput = self.bytes_scanned / self.scan_seconds if self.scan_seconds else 0.0
+            lines.append(f"jsleak_throughput_bytes_per_second {_format_value(throughput)}")
+
+            family("jsleak_secrets", "counter", "Secrets reported after baseline and config filtering.")
+            lines.append(f"jsleak_secrets_total {self.secrets_found}")
+
+            family("jsleak_uptime_seconds", "gauge", "Seconds since metrics collection started.", "seconds")
+            lines.append(f"jsleak_uptime_seconds {_format_value(time.monotonic() - self.started)}")
+
+            peak = peak_rss_bytes()
+            if peak is not None:
+                family("jsleak_peak_rss_bytes", "gauge", "Peak resident set size of the process.", "bytes")
+                lines.append(f"jsleak_peak_rss_bytes {peak}")
+
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str):
+        """Writes the metrics atomically, so a collector never reads a partial file."""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+def serve_metrics(metrics: Metrics, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Serves ``GET /metrics`` from a daemon thread; ``shutdown()`` the returned server to stop.
+    Binds to localhost unless another ``host`` is given.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="jsleak-metrics", daemon=True).start()
+    return server
@@ -1,11 +1,16 @@
-from .patterns import SECRETS_PATTERNS, SEVERITY_LOW, CONFIDENCE_LOW
+from typing import Dict, Optional
+from .patterns import PatternConfig, SECRETS_PATTERNS, SEVERITY_LOW, CONFIDENCE_LOW
 
-def get_severity(secret_type: str) -> str:
-    if secret_type in SECRETS_PATTERNS:
-        return SECRETS_PATTERNS[secret_type].severity
+# Pack rules (a ``rules.RuleSet``) are checked first: they replace the built-in rule with their id
+
+def get_severity(secret_type: str, rules: Optional[Dict[str, PatternConfig]] = None) -> str:
+    for patterns in (rules or {}, SECRETS_PATTERNS):
+        if secret_type in patterns:
+            return patterns[secret_type].severity
     return SEVERITY_LOW
 
-def get_default_confidence(secret_type: str) -> str:
-    if secret_type in SECRETS_PATTERNS:
-        return SECRETS_PATTERNS[secret_type].confidence
+def get_default_confidence(secret_type: str, rules: Optional[Dict[str, PatternConfig]] = None) -> str:
+    for patterns in (rules or {}, SECRETS_PATTERNS):
+        if secret_type in patterns:
+            return patterns[secret_type].confidence
     return CONFIDENCE_LOW
@@ -1,10 +1,13 @@
 import re
-from typing import Dict, Pattern, NamedTuple, Optional
+from typing import Dict, Pattern, NamedTuple, Optional, Tuple
 
 class PatternConfig(NamedTuple):
     pattern: Pattern
     severity: str
     confidence: str # HIGH, MEDIUM, LOW (Default confidence for this pattern)
+    literal: bool = True # Matches within one literal or comment; False if it also matches the key in front
+    entropy: Optional[float] = None # Values with this Shannon entropy (bits per char) or less are dropped
+    keywords: Tuple[str, ...] = () # Lowercase; the pattern only runs on content containing one of them
 
 # Severity Levels
 SEVERITY_CRITICAL = "CRITICAL"
@@ -27,12 +30,14 @@ SECRETS_PATTERNS: Dict[str, PatternConfig] = {
     "AWS Secret Key": PatternConfig(
         re.compile(r"(?i)aws_?(?:secret)?_?(?:access)?_?key(?:_id)?\s*[:=]\s*[\"\']([A-Za-z0-9/+=]{40})[\"\']"),
         SEVERITY_HIGH,
-        CONFIDENCE_HIGH
+        CONFIDENCE_HIGH,
+        False # Matches the key name and assignment in front of the literal
     ),
     "Generic API Key": PatternConfig(
         re.compile(r"(?i)(?:api_?key|access_?token|auth_?token|client_?secret)\s*[:=]\s*[\"\']([a-zA-Z0-9_\-]{16,64})[\"\']"),
         SEVERITY_MEDIUM,
-        CONFIDENCE_LOW # Generic requires context validation to bump to MEDIUM/HIGH
+        CONFIDENCE_LOW, # Generic requires context validation to bump to MEDIUM/HIGH
+        False # Matches the key name and assignment in front of the literal
     ),
     "JWT Token": PatternConfig(
         re.compile(r"eyJ[a-zA-Z0-9_-]{10,}\.eyJ[a-zA-Z0-9_-]{10,}\.[a-zA-Z0-9_-]{10,}"),
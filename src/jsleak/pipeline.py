@@ -0,0 +1,102 @@
+"""
+Read-ahead stage for directory scans.
+
+File reads release the GIL, so a few reader threads can fetch the next files
+while the main thread scans the current one; on network filesystems and cold
+caches this keeps the CPU busy instead of alternating between waiting and
+scanning. Reads are queued in input order and handed out in that order, so
+results stay deterministic. The queue is bounded in bytes (by file size
+before reading) and in number of files; a file larger than the byte budget
+is still read, but only once nothing else is queued. Files above
+``max_file_bytes`` are not read at all, for the caller to stream.
+"""
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Iterable, Iterator, NamedTuple, Optional, Tuple
+from .fetcher import read_file_bytes
+from . import trace
+
+# Reader threads and bytes queued ahead of the scanner by default
+READ_AHEAD_WORKERS = 4
+READ_AHEAD_BYTES = 64 * 1024 * 1024
+
+class FileRead(NamedTuple):
+    path: str
+    data: Optional[bytes] # None (without error) for a file left unread
+    error: Optional[Exception]
+    seconds: float
+
+def read_file(path: str) -> FileRead:
+    """Reads ``path``, capturing the error instead of raising."""
+    started = time.perf_counter()
+    try:
+        with trace.span("read", "io", {"file": path} if trace.active() else None):
+            data = read_file_bytes(path)
+    except Exception as e:
+        return FileRead(path, None, e, time.perf_counter() - started)
+    return FileRead(path, data, None, time.perf_counter() - started)
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+def read_ahead(
+    paths: Iterable[str],
+    workers: int = READ_AHEAD_WORKERS,
+    max_bytes: int = READ_AHEAD_BYTES,
+    max_file_bytes: Optional[int] = None
+) -> Iterator[FileRead]:
+    """
+    Yields a ``FileRead`` per path, in order, reading up to ``workers`` files
+    ahead and keeping at most ``max_bytes`` of them queued. ``workers`` of 0
+    reads each file when it is needed. Files larger than ``max_file_bytes``
+    are yielded unread. Closing the iterator cancels queued reads.
+    """
+    if workers <= 0:
+        for path in paths:
+            if max_file_bytes is not None and _file_size(path) > max_file_bytes:
+                yield FileRead(path, None, None, 0.0)
+            else:
+                yield read_file(path)
+        return
+
+    paths = iter(paths)
+    max_pending = workers * 2
+    pending: Deque[Tuple[Future, int]] = deque()
+    queued_bytes = 0
+    held: Optional[Tuple[str, int]] = None
+    executor = ThreadPoolExecutor(workers, thread_name_prefix="jsleak-read")
+    try:
+        while True:
+            while len(pending) < max_pending:
+                if held is None:
+                    path = next(paths, None)
+                    if path is None:
+                        break
+                    held = (path, _file_size(path))
+                path, size = held
+                if max_file_bytes is not None and size > max_file_bytes:
+                    future: Future = Future()
+                    future.set_result(FileRead(path, None, None, 0.0))
+                    pending.append((future, 0))
+                    held = None
+                    continue
+                if pending and queued_bytes + size > max_bytes:
+                    break
+                pending.append((executor.submit(read_file, path), size))
+                queued_bytes += size
+                held = None
+            if not pending:
+                return
+            future, size = pending.popleft()
+            result = future.result()
+            queued_bytes -= size
+            yield result
+    finally:
+        for future, _ in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
@@ -1,9 +1,12 @@
 import json
 import time
 import sys
-from typing import List, Dict, Any, Optional
+from typing import IO, List, Dict, Any, Optional, Tuple
 from .version import __version__
-from .sarif import generate_sarif
+from .sarif import sarif_group_result, sarif_rule, SarifWriter
+from .correlate import SecretCorrelator
+
+SEVERITY_RANK = {"LOW": 1, "MEDIUM": 2, "HIGH": 3, "CRITICAL": 4}
 
 class Colors:
     RESET = "\033[0m"
@@ -15,30 +18,123 @@ class Colors:
     CYAN = "\033[96m"
     WHITE = "\033[97m"
     
+    # Last stream checked and whether it is a terminal, so isatty runs once per stream
+    _tty: Tuple[Any, bool] = (None, False)
+
+    @staticmethod
+    def enabled(stream: Optional[IO[str]] = None) -> bool:
+        """True if ``stream`` (default: stdout) is a terminal."""
+        stream = sys.stdout if stream is None else stream
+        if Colors._tty[0] is not stream:
+            Colors._tty = (stream, stream.isatty())
+        return Colors._tty[1]
+
     @staticmethod
     def colorize(text: str, color: str, no_color: bool = False) -> str:
-        if no_color or not sys.stdout.isatty():
+        if no_color or not Colors.enabled():
             return text
         return f"{color}{text}{Colors.RESET}"
 
 class Reporter:
-    def __init__(self, format_type: str, show_secrets: bool = False, redact_strategy: str = "partial", no_color: bool = False):
+    def __init__(self, format_type: str, show_secrets: bool = False, redact_strategy: str = "partial", no_color: bool = False, compact: bool = False,
+                 group_secrets: bool = False, summary_only: bool = False, top_per_file: Optional[int] = None):
         self.format_type = format_type
         self.show_secrets = show_secrets
         # redaction: "none" (show), "partial", "full"
         self.redact_strategy = "none" if show_secrets else redact_strategy
         self.no_color = no_color
+        # Non-indented JSON/SARIF
+        self.compact = compact
         self.start_time = time.time()
+        self._sarif_writer: Optional[SarifWriter] = None
+        # With group_secrets each secret is reported once with all its occurrences; only
+        # the errors and endpoints of the per-file results are kept
+        self.correlator = SecretCorrelator() if group_secrets and format_type != "stats" else None
+        self._files: List[Dict[str, Any]] = []
+        # Text display modes: only errors and the summary, or the most severe findings per file
+        self.summary_only = summary_only
+        self.top_per_file = top_per_file
+        # The terminal check is made once; colors are (prefix, suffix) pairs, empty without colors
+        colored = not no_color and Colors.enabled()
+        self._templates = {
+            color: (color, Colors.RESET) if colored else ("", "")
+            for color in (Colors.RED, Colors.GREEN, Colors.YELLOW, Colors.BLUE, Colors.MAGENTA, Colors.CYAN, Colors.WHITE)
+        }
+        self._writer: Optional[BufferedWriter] = None
+        self._json_items_written = 0
 
-    def report(self, results: List[Dict[str, Any]], stats: Dict[str, Any]):
+    def add(self, res: Dict[str, Any]):
+        """
+        Reports one result as it arrives: text and JSON are written file by
+        file, SARIF result by result, and nothing per result is kept for stats.
+        The report is completed by ``finish``.
+        """
+        if self.correlator is not None:
+            self.correlator.add_result(res)
+            endpoints = res.get("endpoints") or {}
+            if res.get("error") or endpoints:
+                item = {key: res[key] for key in ("file", "error", "commit", "blob", "mime_type") if res.get(key)}
+                item.update(matches=[], endpoints=endpoints)
+                if self.format_type == "text":
+                    self._render_file(item)
+                else:
+                    self._files.append(item)
+            return
+        if self.format_type == "text":
+            self._render_file(res)
+            return
+        if self.format_type == "json":
+            # The bytes of json.dumps of the whole list, one item at a time
+            [item] = self._json_items([res])
+            separator = ("," if self._json_items_written else "[") + self._json_newline(2)
+            sys.stdout.write(separator + self._json_dump(item, 2))
+            self._json_items_written += 1
+            return
+        if self.format_type == "stats":
+            return
+        if self._sarif_writer is None:
+            self._sarif_writer = SarifWriter(sys.stdout, compact=self.compact)
+        self._sarif_writer.write_file_result(res)
+
+    def finish(self, stats: Dict[str, Any]):
+        if self.format_type == "text":
+            self._render_summary(stats)
+            return
+        if self.correlator is not None:
+            self._report_grouped(stats)
+            return
         if self.format_type == "json":
-            self._print_json(results)
-        elif self.format_type == "sarif":
-            print(generate_sarif(results))
-        elif self.format_type == "stats":
+            sys.stdout.write(self._json_newline(0) + "]\n" if self._json_items_written else "[]\n")
+            sys.stdout.flush()
+            return
+        if self.format_type == "stats":
             self._print_stats(stats)
-        else: # text
-            self._print_text(results, stats)
+            return
+        if self._sarif_writer is None:
+            self._sarif_writer = SarifWriter(sys.stdout, compact=self.compact)
+        self._sarif_writer.close(stats)
+        sys.stdout.write("\n")
+        sys.stdout.flush()
+
+    def report(self, results: List[Dict[str, Any]], stats: Dict[str, Any]):
+        """Reports results already collected, through the same path as ``add`` and ``finish``."""
+        for res in results:
+            self.add(res)
+        self.finish(stats)
+
+    def _report_grouped(self, stats: Dict[str, Any]):
+        # Text renders its groups with the summary
+        if self.format_type == "json":
+            self._print_grouped_json()
+        else:
+            writer = SarifWriter(sys.stdout, compact=self.compact)
+            for group in self.correlator.groups():
+                writer.add_rule(sarif_rule({"type": group.type, "severity": group.severity,
+                                            "confidence": group.confidence}))
+                writer.write_result(sarif_group_result(group))
+            writer.close(stats)
+            sys.stdout.write("\n")
+            sys.stdout.flush()
 
     def mask_secret(self, value: str) -> str:
         if self.redact_strategy == "none":
@@ -52,7 +148,56 @@ class Reporter:
             return "*" * len(value)
         return value[:4] + "*" * (len(value) - 8) + value[-4:]
 
-    def _print_json(self, results: List[Dict]):
+    def mask_context(self, context: str, value: str) -> str:
+        # Context snippets contain the raw secret, apply the same redaction to it
+        if self.redact_strategy == "none":
+            return context
+        return context.replace(value, self.mask_secret(value))
+
+    def _group_json(self, group: Any) -> Dict[str, Any]:
+        occurrences = []
+        for o in group.occurrences():
+            occurrence = {"file": o.file, "line": o.line, "column": o.column}
+            if o.commit:
+                occurrence["commit"] = o.commit
+            occurrences.append(occurrence)
+        return {
+            "type": group.type,
+            "value": self.mask_secret(group.value),
+            "severity": group.severity,
+            "confidence": group.confidence,
+            "fingerprint": group.fingerprint,
+            "occurrence_count": group.count,
+            "file_count": group.file_count,
+            "occurrences": occurrences
+        }
+
+    def _print_grouped_json(self):
+        # Written one secret at a time, so only one occurrence list is expanded at once;
+        # the bytes match json.dumps of the whole {"secrets": [...], "files": [...]} object
+        files = self._json_items(self._files)
+        for item in files:
+            del item["secrets"]
+        newline, dump = self._json_newline, self._json_dump
+        key_sep = ":" if self.compact else ": "
+        out = sys.stdout
+        out.write("{" + newline(2) + '"secrets"' + key_sep + "[")
+        groups = self.correlator.groups()
+        for i, group in enumerate(groups):
+            out.write(("," if i else "") + newline(4) + dump(self._group_json(group), 4))
+        out.write((newline(2) if groups else "") + "],")
+        out.write(newline(2) + '"files"' + key_sep + dump(files, 2) + newline(0) + "}\n")
+
+    def _json_newline(self, level: int) -> str:
+        return "" if self.compact else "\n" + " " * level
+
+    def _json_dump(self, value: Any, level: int) -> str:
+        # A value as json.dumps writes it nested ``level`` spaces deep
+        if self.compact:
+            return json.dumps(value, separators=(",", ":"))
+        return json.dumps(value, indent=2).replace("\n", self._json_newline(level))
+
+    def _json_items(self, results: List[Dict]) -> List[Dict[str, Any]]:
         output = []
         for res in results:
             item = {
@@ -61,6 +206,11 @@ class Reporter:
                 "secrets": {},
                 "endpoints": res.get("endpoints", {})
             }
+            if res.get("commit"):
+                item["commit"] = res["commit"]
+                item["blob"] = res.get("blob")
+            if res.get("mime_type"):
+                item["mime_type"] = res["mime_type"]
             
             # Group rich matches
             matches = res.get("matches", [])
@@ -73,18 +223,26 @@ class Reporter:
                     val = m["value"]
                     val = self.mask_secret(val)
                         
-                    grouped[m["type"]].append({
+                    entry = {
                         "value": val,
                         "severity": m["severity"],
                         "confidence": m["confidence"],
                         "line": m.get("line"),
                         "column": m.get("column")
-                    })
+                    }
+                    if m.get("byte_offset") is not None:
+                        entry["byte_offset"] = m["byte_offset"]
+                    if m.get("context"):
+                        entry["context"] = self.mask_context(m["context"], m["value"])
+                    if m.get("syntax"):
+                        entry["syntax"] = m["syntax"]
+                    if m.get("encoding"):
+                        entry["encoding"] = m["encoding"]
+                    grouped[m["type"]].append(entry)
                 item["secrets"] = grouped
             
             output.append(item)
-            
-        print(json.dumps(output, indent=2))
+        return output
 
     def _print_stats(self, stats: Dict[str, Any]):
         duration = time.time() - self.start_time
@@ -92,68 +250,166 @@ class Reporter:
             "files_scanned": stats.get("files_scanned", 0),
             "secrets_found": stats.get("secrets_found", 0),
             "endpoints_found": stats.get("endpoints_found", 0),
-            "execution_time_seconds": round(duration, 3)
+            "execution_time_seconds": round(duration, 3),
+            **({"coverage": stats["coverage"]} if "coverage" in stats else {}),
+            **({"memory": stats["memory"]} if "memory" in stats else {})
         }, indent=2))
 
-    def _print_text(self, results: List[Dict], stats: Dict):
-        # Existing text formatting logic adapted
-        for res in results:
-            if res.get("error"):
-                 print(Colors.colorize(f"[ERROR] {res['file']}: {res['error']}", Colors.RED, self.no_color))
-                 continue
+    def _paint(self, text: str, color: str) -> str:
+        prefix, suffix = self._templates[color]
+        return prefix + text + suffix
 
-            matches = res.get("matches", [])
-            endpoints = res.get("endpoints", {})
+    @property
+    def _out(self) -> "BufferedWriter":
+        # Created on first output, for the stdout of that moment
+        if self._writer is None:
+            self._writer = BufferedWriter(sys.stdout)
+        return self._writer
 
-            if not matches and not endpoints:
-                continue
+    def _render_file(self, res: Dict[str, Any]):
+        """Renders one file's block of the text report."""
+        if res.get("error"):
+            self._out.write(self._paint(f"[ERROR] {res['file']}: {res['error']}", Colors.RED) + "\n")
+            return
+        if self.summary_only:
+            return
 
-            print()
-            print(Colors.colorize(f"[FILE] {res['file']}", Colors.CYAN, self.no_color))
-            
-            if matches:
-                print(Colors.colorize("  [!] Secrets:", Colors.YELLOW, self.no_color))
-                grouped = {}
-                for m in matches:
-                    if m["type"] not in grouped:
-                        grouped[m["type"]] = []
-                    grouped[m["type"]].append(m)
+        matches = res.get("matches", [])
+        endpoints = res.get("endpoints", {})
+        if not matches and not endpoints:
+            return
 
-                for secret_type, items in grouped.items():
-                    # Pick severity/confidence from first item (usually same for type)
-                    severity = items[0]["severity"]
-                    confidence = items[0]["confidence"]
-                    
-                    sev_color = Colors.RED if severity in ["HIGH", "CRITICAL"] else Colors.YELLOW
-                    header = f"    > {secret_type} [{severity} | {confidence}]:"
-                    print(Colors.colorize(header, sev_color, self.no_color))
-                    
-                    for item in items:
-                        val = item["value"]
-                        val = self.mask_secret(val)
-                        
-                        loc = f"{item.get('line', '?')}:{item.get('column', '?')}"
-                        print(f"      - {val} {Colors.colorize(f'({loc})', Colors.WHITE, self.no_color)}")
-            
-            if endpoints:
-                print(Colors.colorize("  [*] Endpoints:", Colors.BLUE, self.no_color))
-                for ep_type, values in endpoints.items():
-                    print(f"    > {ep_type}:")
-                    for v in values:
-                         # v is just string in legacy dict.
-                         # If we want context (is_auth), we need endpoint_matches.
-                         # But 'endpoints' dict is simple.
-                         # Let's print simply for now.
-                        print(f"      - {v}")
-
-        print()
-        print(Colors.colorize("="*40, Colors.BLUE, self.no_color))
-        print(Colors.colorize(" SCAN SUMMARY", Colors.BLUE, self.no_color))
-        print(Colors.colorize("="*40, Colors.BLUE, self.no_color))
-        print(f"Files Scanned: {stats.get('files_scanned', 0)}")
-        print(f"Secrets Found: {stats.get('secrets_found', 0)}")
-        
+        lines = [""]
+        file_label = res['file']
+        if res.get("commit"):
+            file_label += f" @ {res['commit'][:12]}"
+        lines.append(self._paint(f"[FILE] {file_label}", Colors.CYAN))
+
+        hidden = 0
+        if self.top_per_file is not None and len(matches) > self.top_per_file:
+            # Most severe first; the kept findings stay in file order
+            ranked = sorted(range(len(matches)), key=lambda i: -SEVERITY_RANK.get(matches[i]["severity"], 0))
+            hidden = len(matches) - self.top_per_file
+            matches = [matches[i] for i in sorted(ranked[:self.top_per_file])]
+
+        if matches:
+            lines.append(self._paint("  [!] Secrets:", Colors.YELLOW))
+            grouped: Dict[str, List[Any]] = {}
+            for m in matches:
+                grouped.setdefault(m["type"], []).append(m)
+
+            for secret_type, items in grouped.items():
+                # Pick severity/confidence from first item (usually same for type)
+                severity = items[0]["severity"]
+                confidence = items[0]["confidence"]
+                sev_color = Colors.RED if severity in ["HIGH", "CRITICAL"] else Colors.YELLOW
+                lines.append(self._paint(f"    > {secret_type} [{severity} | {confidence}]:", sev_color))
+
+                for item in items:
+                    loc = f"{item.get('line', '?')}:{item.get('column', '?')}"
+                    if item.get("syntax"):
+                        loc += f" in {item['syntax']}"
+                    if item.get("encoding"):
+                        loc += f", {item['encoding']}-encoded"
+                    lines.append(f"      - {self.mask_secret(item['value'])} {self._paint(f'({loc})', Colors.WHITE)}")
+                    if item.get("context"):
+                        snippet = self.mask_context(item["context"], item["value"]).replace("\n", " ")
+                        lines.append(f"        {snippet}")
+            if hidden:
+                lines.append(f"    ... {hidden} more finding{'s' if hidden != 1 else ''} in this file")
+
+        if endpoints:
+            lines.append(self._paint("  [*] Endpoints:", Colors.BLUE))
+            for ep_type, values in endpoints.items():
+                lines.append(f"    > {ep_type}:")
+                lines.extend(f"      - {v}" for v in values)
+
+        lines.append("")
+        self._out.write("\n".join(lines))
+
+    def _render_groups(self):
+        lines = [
+            "",
+            self._paint(f"[SECRETS] {len(self.correlator)} unique, {self.correlator.occurrence_count} occurrences",
+                        Colors.CYAN)
+        ]
+        for group in self.correlator.groups():
+            sev_color = Colors.RED if group.severity in ["HIGH", "CRITICAL"] else Colors.YELLOW
+            header = f"  > {group.type} [{group.severity} | {group.confidence}]: {self.mask_secret(group.value)}"
+            lines.append(self._paint(header, sev_color))
+            count, file_count = group.count, group.file_count
+            lines.append(f"    {count} occurrence{'s' if count != 1 else ''} in {file_count} file{'s' if file_count != 1 else ''}")
+            for o in group.occurrences():
+                loc = f"{o.file}:{o.line}:{o.column}"
+                if o.commit:
+                    loc += f" @ {o.commit[:12]}"
+                lines.append(f"      - {loc}")
+            self._out.write("\n".join(lines) + "\n")
+            lines = []
+
+    def _render_summary(self, stats: Dict):
+        if self.correlator is not None and len(self.correlator) and not self.summary_only:
+            self._render_groups()
+
+        rule = self._paint("="*40, Colors.BLUE)
+        lines = [
+            "",
+            rule,
+            self._paint(" SCAN SUMMARY", Colors.BLUE),
+            rule,
+            f"Files Scanned: {stats.get('files_scanned', 0)}",
+            f"Secrets Found: {stats.get('secrets_found', 0)}"
+        ]
         # Breakdown
         if stats.get("secrets_by_severity"):
             for sev, count in stats["secrets_by_severity"].items():
-                print(f"  {sev}: {count}")
+                lines.append(f"  {sev}: {count}")
+
+        coverage = stats.get("coverage")
+        if coverage and not coverage["complete"]:
+            skipped = coverage["files_skipped"]
+            line = f"INCOMPLETE: --max-time reached, {coverage['files_scanned']} files scanned"
+            if skipped is not None:
+                line += f", {skipped} skipped ({coverage['bytes_scanned']} of {coverage['bytes_scanned'] + coverage['bytes_skipped']} bytes)"
+            lines.append(self._paint(line, Colors.YELLOW))
+
+        memory = stats.get("memory")
+        if memory and memory["peak_rss_bytes"] is not None:
+            line = f"Peak Memory: {memory['peak_rss_bytes'] / 2**20:.1f} MiB of {memory['limit_bytes'] / 2**20:.1f} MiB"
+            if memory["chunked_files"]:
+                line += f" ({memory['chunked_files']} files scanned in chunks)"
+            over = memory["peak_rss_bytes"] > memory["limit_bytes"]
+            lines.append(self._paint(line, Colors.YELLOW) if over else line)
+        self._out.write("\n".join(lines) + "\n")
+        self._out.flush()
+
+class BufferedWriter:
+    """
+    Collects text report output and writes it in large chunks.
+
+    The stream is written (and flushed) once ``max_bytes`` characters are
+    buffered, or on a write at least ``interval`` seconds after the last
+    flush, so CI logs still show progress during a long scan.
+    """
+
+    def __init__(self, stream: IO[str], max_bytes: int = 64 * 1024, interval: float = 1.0):
+        self.stream = stream
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self._parts: List[str] = []
+        self._size = 0
+        self._last_flush = time.monotonic()
+
+    def write(self, text: str):
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= self.max_bytes or time.monotonic() - self._last_flush >= self.interval:
+            self.flush()
+
+    def flush(self):
+        if self._parts:
+            self.stream.write("".join(self._parts))
+            self._parts = []
+            self._size = 0
+        self.stream.flush()
+        self._last_flush = time.monotonic()
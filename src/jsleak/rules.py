@@ -0,0 +1,247 @@
+"""
+External rule packs.
+
+A rule pack is a YAML file with a ``rules`` list; packs are loaded from
+``--rules`` files or directories (every ``*.yml``/``*.yaml``, sorted) and from
+``rule_packs``/``rules`` in ``.jsleak.yml``. Each rule is validated and its
+regex compiled at load time; any error names the pack and rule and fails the
+load. The validated rules are cached as JSON under the user cache directory,
+keyed by the SHA-256 of the pack contents, so later runs with unchanged packs
+skip YAML parsing and validation. The loaded ``RuleSet`` is handed to each
+``Scanner`` (and ``pattern_utils``, ``resolve_file_types``) that should run
+it, next to the built-in rules; a pack rule with a built-in rule's id
+replaces it there. ``SECRETS_PATTERNS`` itself is never changed.
+"""
+import hashlib
+import json
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import yaml
+from .patterns import (
+    PatternConfig,
+    SEVERITY_CRITICAL, SEVERITY_HIGH, SEVERITY_MEDIUM, SEVERITY_LOW,
+    CONFIDENCE_HIGH, CONFIDENCE_MEDIUM, CONFIDENCE_LOW
+)
+
+# Bump when the cached rule layout or the validation rules change
+CACHE_VERSION = 1
+CACHE_ENV = "JSLEAK_CACHE_DIR"
+PACK_SUFFIXES = (".yml", ".yaml")
+
+SEVERITIES = (SEVERITY_CRITICAL, SEVERITY_HIGH, SEVERITY_MEDIUM, SEVERITY_LOW)
+CONFIDENCES = (CONFIDENCE_HIGH, CONFIDENCE_MEDIUM, CONFIDENCE_LOW)
+ANCHORS = ("start", "end")
+RULE_KEYS = ("id", "regex", "severity", "confidence", "entropy", "keywords", "anchors", "literal", "description")
+
+# Token characters a start/end anchor keeps from continuing the match
+_TOKEN_BOUNDARY = r"[A-Za-z0-9_\-]"
+_GLOBAL_FLAGS_RE = re.compile(r"^\(\?[aiLmsux]+\)")
+
+class RuleError(Exception):
+    """Raised when a rule pack cannot be read or a rule is invalid."""
+    pass
+
+class RuleSet(dict):
+    """
+    Pack rules by id. ``key`` identifies their content, so rules compiled for
+    one set are reused by every scanner given an equal set; treat it as frozen.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.key = rules_key(self)
+
+def default_cache_dir() -> str:
+    if os.environ.get(CACHE_ENV):
+        return os.environ[CACHE_ENV]
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "jsleak")
+
+def pack_files(paths: Iterable[str]) -> List[str]:
+    """Expands directories to the rule packs directly inside them, sorted by name."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, name) for name in sorted(os.listdir(path))
+                         if name.endswith(PACK_SUFFIXES) and os.path.isfile(os.path.join(path, name)))
+        elif os.path.isfile(path):
+            files.append(path)
+        else:
+            raise RuleError(f"Rule pack not found: {path}")
+    return files
+
+def anchored(regex: str, anchors: Iterable[str]) -> str:
+    """``regex`` wrapped so it cannot start (``start``) or end (``end``) inside a longer token."""
+    flags = _GLOBAL_FLAGS_RE.match(regex)
+    prefix = flags.group(0) if flags else ""
+    body = regex[len(prefix):]
+    if "start" in anchors:
+        body = f"(?<!{_TOKEN_BOUNDARY})(?:{body})"
+    if "end" in anchors:
+        body = f"(?:{body})(?!{_TOKEN_BOUNDARY})"
+    return prefix + body
+
+def validate_rule(rule: Any, where: str) -> Dict[str, Any]:
+    """
+    Checks one rule and returns it normalized (upper-case levels, lower-case
+    keywords, anchors applied to ``regex``). Raises ``RuleError``.
+    """
+    if not isinstance(rule, dict):
+        raise RuleError(f"{where}: rule must be a mapping")
+    rule_id = rule.get("id")
+    if not isinstance(rule_id, str) or not rule_id.strip():
+        raise RuleError(f"{where}: 'id' must be a non-empty string")
+    where = f"{where} ({rule_id})"
+    unknown = sorted(set(rule) - set(RULE_KEYS))
+    if unknown:
+        raise RuleError(f"{where}: unknown keys {', '.join(unknown)}")
+
+    regex = rule.get("regex")
+    if not isinstance(regex, str) or not regex:
+        raise RuleError(f"{where}: 'regex' must be a non-empty string")
+    severity = str(rule.get("severity", SEVERITY_MEDIUM)).upper()
+    if severity not in SEVERITIES:
+        raise RuleError(f"{where}: severity must be one of {', '.join(SEVERITIES)}")
+    confidence = str(rule.get("confidence", CONFIDENCE_MEDIUM)).upper()
+    if confidence not in CONFIDENCES:
+        raise RuleError(f"{where}: confidence must be one of {', '.join(CONFIDENCES)}")
+
+    entropy = rule.get("entropy")
+    if entropy is not None:
+        if isinstance(entropy, bool) or not isinstance(entropy, (int, float)) or not 0 <= entropy <= 8:
+            raise RuleError(f"{where}: entropy must be a number of bits per character between 0 and 8")
+        entropy = float(entropy)
+    keywords = rule.get("keywords", [])
+    if not isinstance(keywords, list) or not all(isinstance(k, str) and k for k in keywords):
+        raise RuleError(f"{where}: keywords must be a list of non-empty strings")
+    anchors = rule.get("anchors", [])
+    if isinstance(anchors, str):
+        anchors = ["start", "end"] if anchors == "both" else [anchors]
+    if not isinstance(anchors, list) or not set(anchors) <= set(ANCHORS):
+        raise RuleError(f"{where}: anchors must be a list of {', '.join(ANCHORS)} (or 'both')")
+    literal = rule.get("literal", False)
+    if not isinstance(literal, bool):
+        raise RuleError(f"{where}: literal must be true or false")
+
+    regex = anchored(regex, anchors)
+    try:
+        compiled = re.compile(regex)
+    except re.error as e:
+        raise RuleError(f"{where}: invalid regex: {e}") from None
+    if compiled.match(""):
+        raise RuleError(f"{where}: regex matches the empty string")
+    return {
+        "id": rule_id,
+        "regex": regex,
+        "severity": severity,
+        "confidence": confidence,
+        "entropy": entropy,
+        "keywords": sorted({k.lower() for k in keywords}),
+        "literal": literal,
+    }
+
+def _parse_pack(source: str, data: Any) -> List[Any]:
+    if data is None:
+        return []
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict) and isinstance(data.get("rules", []), list):
+        return data.get("rules", [])
+    raise RuleError(f"{source}: a rule pack is a 'rules' list")
+
+def _validate_packs(packs: List[Tuple[str, Any]]) -> List[Dict[str, Any]]:
+    rules: List[Dict[str, Any]] = []
+    seen: Dict[str, str] = {}
+    for source, data in packs:
+        for i, rule in enumerate(_parse_pack(source, data), 1):
+            checked = validate_rule(rule, f"{source}: rule {i}")
+            if checked["id"] in seen:
+                raise RuleError(f"{source}: rule {i}: duplicate id {checked['id']!r} (first defined in {seen[checked['id']]})")
+            seen[checked["id"]] = source
+            rules.append(checked)
+    return rules
+
+def _to_configs(rules: List[Dict[str, Any]]) -> Dict[str, PatternConfig]:
+    return {
+        rule["id"]: PatternConfig(
+            re.compile(rule["regex"]),
+            rule["severity"],
+            rule["confidence"],
+            rule["literal"],
+            rule["entropy"],
+            tuple(rule["keywords"])
+        )
+        for rule in rules
+    }
+
+def _read_cache(path: str) -> Optional[List[Dict[str, Any]]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == CACHE_VERSION:
+            return data["rules"]
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+    return None
+
+def _write_cache(path: str, rules: List[Dict[str, Any]]):
+    # Best effort: an unwritable cache only costs the next run a re-parse
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "rules": rules}, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+def load_rules(
+    paths: Iterable[str] = (),
+    inline: Optional[List[Any]] = None,
+    cache_dir: Optional[str] = None
+) -> RuleSet:
+    """
+    Loads and validates the rule packs in ``paths`` plus ``inline`` rules
+    (from ``.jsleak.yml``), using the compiled-rule cache in ``cache_dir``
+    (default: ``default_cache_dir()``; ``""`` disables it). Raises ``RuleError``.
+    """
+    files = pack_files(paths)
+    contents = []
+    for path in files:
+        try:
+            with open(path, "rb") as f:
+                contents.append(f.read())
+        except OSError as e:
+            raise RuleError(f"Cannot read rule pack {path}: {e}") from e
+    if not files and not inline:
+        return RuleSet()
+
+    digest = hashlib.sha256(f"jsleak-rules:{CACHE_VERSION}\0".encode())
+    for data in contents:
+        digest.update(hashlib.sha256(data).digest())
+    digest.update(json.dumps(inline or [], sort_keys=True, default=str).encode())
+    if cache_dir is None:
+        cache_dir = default_cache_dir()
+    cache_path = os.path.join(cache_dir, "rules", f"{digest.hexdigest()}.json") if cache_dir else None
+
+    rules = _read_cache(cache_path) if cache_path else None
+    if rules is None:
+        packs = []
+        for path, data in zip(files, contents):
+            try:
+                packs.append((path, yaml.safe_load(data)))
+            except yaml.YAMLError as e:
+                raise RuleError(f"{path}: invalid YAML: {e}") from None
+        if inline:
+            packs.append(("config", inline))
+        rules = _validate_packs(packs)
+        if cache_path:
+            _write_cache(cache_path, rules)
+    return RuleSet(_to_configs(rules))
+
+def rules_key(rules: Dict[str, PatternConfig]) -> str:
+    return hashlib.sha256(json.dumps(
+        [(name, c.pattern.pattern, c.severity, c.confidence, c.literal, c.entropy, c.keywords)
+         for name, c in rules.items()]
+    ).encode()).hexdigest()
@@ -1,76 +1,222 @@
+import io
 import json
-from typing import List, Dict, Any, Optional
+from typing import IO, List, Dict, Any, Iterable, Optional
 from .version import __version__
 
-def generate_sarif(results: List[Dict[str, Any]]) -> str:
+SARIF_SCHEMA = "https://raw.githubusercontent.com/oasis-tcs/sarif-spec/master/Schemata/sarif-schema-2.1.0.json"
+
+def generate_sarif(results: List[Dict[str, Any]], stats: Optional[Dict[str, Any]] = None, compact: bool = False) -> str:
     """
     Generates a SARIF output string from the scan results.
+
+    If ``stats`` is given it is stored in the run's property bag so that
+    shard reports can be merged with correct totals.
     """
-    
+
+    # All results are known, so the rule table can be written up front
     rules_dict = {}
-    results_sarif = []
-    
     for res in results:
-        file_uri = res["file"].replace("\\", "/") # normalize
-        
+        for match in res.get("matches", []):
+            rule = sarif_rule(match)
+            rules_dict.setdefault(rule["id"], rule)
+
+    out = io.StringIO()
+    writer = SarifWriter(out, rules=list(rules_dict.values()), compact=compact)
+    for res in results:
+        writer.write_file_result(res)
+    writer.close(stats)
+    return out.getvalue()
+
+def sarif_rule_id(secret_type: str) -> str:
+    return secret_type.replace(" ", "-").lower()
+
+def sarif_rule(match: Any) -> Dict[str, Any]:
+    """
+    Builds the SARIF rule describing a finding's type.
+    """
+    return {
+        "id": sarif_rule_id(match["type"]),
+        "name": match["type"],
+        "shortDescription": {"text": f"Detected {match['type']}"},
+        "defaultConfiguration": {
+            "level": _map_severity_to_level(match["severity"])
+        },
+        "properties": {
+             "params": {
+                 "severity": match["severity"],
+                 "confidence": match["confidence"]
+             }
+        }
+    }
+
+def sarif_result(match: Any, file_uri: str) -> Dict[str, Any]:
+    """
+    Builds the SARIF result for one finding in ``file_uri``.
+    """
+    region = {
+        "startLine": match.get("line", 1),
+        "startColumn": match.get("column", 1)
+    }
+    if match.get("byte_offset") is not None:
+        region["byteOffset"] = match["byte_offset"]
+
+    result = {
+        "ruleId": sarif_rule_id(match["type"]),
+        "level": _map_severity_to_level(match["severity"]),
+        "message": {"text": f"Found {match['type']} with {match['confidence']} confidence."},
+        "locations": [{
+            "physicalLocation": {
+                "artifactLocation": {"uri": file_uri},
+                "region": region
+            }
+        }],
+        "properties": {
+            "confidence": match["confidence"],
+            "severity": match["severity"]
+        }
+    }
+    for key in ("syntax", "encoding"):
+        if match.get(key):
+            result["properties"][key] = match[key]
+    return result
+
+def sarif_group_result(group: Any) -> Dict[str, Any]:
+    """
+    Builds one SARIF result for a ``correlate.SecretGroup``: the first
+    occurrence is the location, the others are ``relatedLocations``.
+    """
+    occurrences = group.occurrences()
+    first = next(occurrences)
+    match = {
+        "type": group.type,
+        "severity": group.severity,
+        "confidence": group.confidence,
+        "line": first.line,
+        "column": first.column
+    }
+    result = sarif_result(match, first.file.replace("\\", "/"))
+    related = []
+    for i, occurrence in enumerate(occurrences, 1):
+        location = {
+            "id": i,
+            "physicalLocation": {
+                "artifactLocation": {"uri": occurrence.file.replace("\\", "/")},
+                "region": {"startLine": occurrence.line, "startColumn": occurrence.column}
+            }
+        }
+        if occurrence.commit:
+            location["properties"] = {"commit": occurrence.commit}
+        related.append(location)
+    if related:
+        result["message"]["text"] = (f"Found {group.type} with {group.confidence} confidence "
+                                     f"in {group.count} locations.")
+        result["relatedLocations"] = related
+    result["properties"]["fingerprint"] = group.fingerprint
+    result["properties"]["occurrences"] = group.count
+    if first.commit:
+        result["properties"]["commit"] = first.commit
+    return result
+
+class SarifWriter:
+    """
+    Incremental SARIF writer.
+
+    Results are written to ``out`` as they are added, so memory does not grow
+    with the number of findings. If ``rules`` is given, the tool section with
+    that rule table is written first (this is what ``generate_sarif`` does);
+    otherwise rules are collected from the findings and the tool section is
+    written after the results. Both layouts are the same SARIF document, and
+    the bytes match ``json.dumps`` of it with ``indent=2`` (or compact separators).
+    """
+
+    def __init__(self, out: IO[str], rules: Optional[Iterable[Dict[str, Any]]] = None, compact: bool = False):
+        self.out = out
+        self.compact = compact
+        self.result_count = 0
+        self._rules: Dict[str, Dict[str, Any]] = {}
+        self._rules_written = rules is not None
+        self._first_member = True
+
+        if compact:
+            out.write('{"$schema":%s,"version":"2.1.0","runs":[{' % json.dumps(SARIF_SCHEMA))
+        else:
+            out.write('{\n  "$schema": %s,\n  "version": "2.1.0",\n  "runs": [\n    {' % json.dumps(SARIF_SCHEMA))
+        if rules is not None:
+            self._write_member("tool", self._tool(list(rules)))
+        self._write_member("results", None)
+        self.out.write("[")
+
+    def _dump(self, value: Any, level: int) -> str:
+        if self.compact:
+            return json.dumps(value, separators=(",", ":"))
+        return json.dumps(value, indent=2).replace("\n", "\n" + " " * level)
+
+    def _newline(self, level: int) -> str:
+        return "" if self.compact else "\n" + " " * level
+
+    def _write_member(self, key: str, value: Any):
+        # Member of the run object; value None leaves the value for the caller to write
+        if not self._first_member:
+            self.out.write(",")
+        self._first_member = False
+        self.out.write(self._newline(6) + json.dumps(key) + (":" if self.compact else ": "))
+        if value is not None:
+            self.out.write(self._dump(value, 6))
+
+    def _tool(self, rules: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            "driver": {
+                "name": "jsleak",
+                "version": __version__,
+                "rules": rules
+            }
+        }
+
+    def add_rule(self, rule: Dict[str, Any]):
+        """Registers a rule (first definition of an id wins) when rules are written at the end."""
+        if not self._rules_written:
+            self._rules.setdefault(rule["id"], rule)
+
+    def write_result(self, result: Dict[str, Any]):
+        """Writes one already built SARIF result object."""
+        if self.result_count:
+            self.out.write(",")
+        self.out.write(self._newline(8) + self._dump(result, 8))
+        self.result_count += 1
+
+    def write_file_result(self, res: Dict[str, Any]):
+        """Writes the results for every finding of a per-file scan result."""
         matches = res.get("matches", [])
-        
+        if not matches:
+            return
+        file_uri = res["file"].replace("\\", "/") # normalize
         for match in matches:
-            rule_id = match["type"].replace(" ", "-").lower()
-            
-            # Register Rule
-            if rule_id not in rules_dict:
-                rules_dict[rule_id] = {
-                    "id": rule_id,
-                    "name": match["type"],
-                    "shortDescription": {"text": f"Detected {match['type']}"},
-                    "defaultConfiguration": {
-                        "level": _map_severity_to_level(match["severity"])
-                    },
-                    "properties": {
-                         "params": {
-                             "severity": match["severity"],
-                             "confidence": match["confidence"]
-                         }
-                    }
-                }
-            
-            # Create Result
-            results_sarif.append({
-                "ruleId": rule_id,
-                "level": _map_severity_to_level(match["severity"]),
-                "message": {"text": f"Found {match['type']} with {match['confidence']} confidence."},
-                "locations": [{
-                    "physicalLocation": {
-                        "artifactLocation": {"uri": file_uri},
-                        "region": {
-                            "startLine": match.get("line", 1),
-                            "startColumn": match.get("column", 1)
-                        }
-                    }
-                }],
-                "properties": {
-                    "confidence": match["confidence"],
-                    "severity": match["severity"]
-                }
-            })
-
-    sarif_output = {
-        "$schema": "https://raw.githubusercontent.com/oasis-tcs/sarif-spec/master/Schemata/sarif-schema-2.1.0.json",
-        "version": "2.1.0",
-        "runs": [{
-            "tool": {
-                "driver": {
-                    "name": "jsleak",
-                    "version": __version__,
-                    "rules": list(rules_dict.values())
-                }
-            },
-            "results": results_sarif
-        }]
-    }
-    
-    return json.dumps(sarif_output, indent=2)
+            if not self._rules_written:
+                rule_id = sarif_rule_id(match["type"])
+                if rule_id not in self._rules:
+                    self._rules[rule_id] = sarif_rule(match)
+            result = sarif_result(match, file_uri)
+            if res.get("commit"):
+                result["properties"]["commit"] = res["commit"]
+            self.write_result(result)
+
+    def close(self, stats: Optional[Dict[str, Any]] = None):
+        """Closes the results array and writes the remaining run members."""
+        self.out.write(self._newline(6) + "]" if self.result_count else "]")
+        if not self._rules_written:
+            self._write_member("tool", self._tool(list(self._rules.values())))
+            self._rules_written = True
+        if stats is not None:
+            run_stats = {
+                "files_scanned": stats.get("files_scanned", 0),
+                "secrets_found": stats.get("secrets_found", 0),
+                "endpoints_found": stats.get("endpoints_found", 0),
+                "secrets_by_severity": stats.get("secrets_by_severity", {})
+            }
+            if "coverage" in stats:
+                run_stats["coverage"] = stats["coverage"]
+            self._write_member("properties", {"stats": run_stats})
+        self.out.write(self._newline(4) + "}" + self._newline(2) + "]" + self._newline(0) + "}")
 
 def _map_severity_to_level(severity: str) -> str:
     """
@@ -79,9 +225,8 @@ def _map_severity_to_level(severity: str) -> str:
     MEDIUM -> warning
     LOW -> note
     """
-    if severity in ["CRITICAL", "HIGH"]: 
+    if severity in ["CRITICAL", "HIGH"]:
         return "error"
     if severity == "MEDIUM":
         return "warning"
     return "note"
-
@@ -1,148 +1,625 @@
 import math
-from typing import Dict, List, Set, NamedTuple, Optional, Any
-from dataclasses import dataclass
-from .patterns import SECRETS_PATTERNS, ENDPOINT_PATTERNS, CONFIDENCE_HIGH, CONFIDENCE_MEDIUM, CONFIDENCE_LOW
+import os
+import re
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, List, Set, NamedTuple, Optional, Any, Iterable, Iterator, Tuple, Union
+from .patterns import CONFIDENCE_HIGH, CONFIDENCE_MEDIUM, CONFIDENCE_LOW
+from .fetcher import decode_bytes
+from .endpoints import EndpointIndex
+from .lexer import LiteralView
+from .decoder import Decoder
+from .engines import RE, CompiledRules, compile_rules, resolve_engine
+from .filetypes import FileType, SCRIPT, extract_spans
+from .rules import RuleSet
+from . import trace
 
-@dataclass
-class Location:
+class Location(NamedTuple):
     line: int
     column: int
     index: int
+    byte_offset: Optional[int] = None
 
-@dataclass
-class SecretMatch:
-    type: str
-    value: str
-    severity: str
-    confidence: str
-    location: Location
-
-    def to_dict(self):
-        return {
-            "type": self.type,
-            "value": self.value,
-            "severity": self.severity,
-            "confidence": self.confidence,
-            "line": self.location.line,
-            "column": self.location.column,
-            "index": self.location.index
-        }
-
-@dataclass
-class EndpointMatch:
-    type: str
-    value: str
-    location: Location
-    is_auth: bool = False
-
-    def to_dict(self):
-        return {
-            "type": self.type,
-            "value": self.value,
-            "line": self.location.line,
-            "column": self.location.column,
-            "is_auth": self.is_auth
-        }
-
-class ScanResult(NamedTuple):
-    secrets: Dict[str, List[str]] # Legacy
-    endpoints: Dict[str, List[str]] # Legacy
-    matches: List[SecretMatch] 
+class _MatchRecord:
+    """
+    Base for slotted match records.
+
+    The location is stored flattened in the record's own slots (``location``
+    rebuilds a ``Location`` on access). Records also answer ``record["line"]``
+    and ``record.get("line")`` like the dicts returned by ``to_dict``, so
+    filters and reporters consume them directly instead of converting every finding.
+    """
+    __slots__ = ("line", "column", "index", "byte_offset")
+    _dict_keys: Tuple[str, ...] = ()
+
+    @property
+    def location(self) -> Location:
+        return Location(self.line, self.column, self.index, self.byte_offset)
+
+    def _fields(self) -> Tuple[str, ...]:
+        return self.__slots__ + _MatchRecord.__slots__
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._dict_keys or key in self.__slots__:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: getattr(self, key) for key in self._dict_keys}
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self._fields())
+
+    __hash__ = None
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{self.__class__.__name__}({fields}, location={self.location!r})"
+
+class SecretMatch(_MatchRecord):
+    """
+    A secret finding. ``syntax`` is the lexer's kind for the value's position
+    ("string", "template", "regex", "comment" or "code"), or None without ``--lexer``.
+    A file type's extractor tags values with its own kinds ("script" for inline
+    HTML scripts, "value" for config values, "string" for JSON strings).
+    ``encoding`` is set for secrets found in decoded text ("base64", "hex",
+    "escape", or layers like "base64>escape"); the location is the encoded run's.
+    """
+    __slots__ = ("type", "value", "severity", "confidence", "context", "syntax", "encoding")
+    _dict_keys = ("type", "value", "severity", "confidence", "line", "column", "index", "byte_offset", "context")
+
+    def __init__(self, type: str, value: str, severity: str, confidence: str, location: Location,
+                 context: Optional[str] = None, syntax: Optional[str] = None, encoding: Optional[str] = None):
+        self.type = type
+        self.value = value
+        self.severity = severity
+        self.confidence = confidence
+        self.line, self.column, self.index, self.byte_offset = location
+        self.context = context
+        self.syntax = syntax
+        self.encoding = encoding
+
+class EndpointMatch(_MatchRecord):
+    __slots__ = ("type", "value", "is_auth")
+    _dict_keys = ("type", "value", "line", "column", "is_auth")
+
+    def __init__(self, type: str, value: str, location: Location, is_auth: bool = False):
+        self.type = type
+        self.value = value
+        self.line, self.column, self.index, self.byte_offset = location
+        self.is_auth = is_auth
+
+def legacy_secrets(matches: Iterable[SecretMatch]) -> Dict[str, List[str]]:
+    """Builds the legacy ``{type: sorted values}`` dict from matches."""
+    secrets_dict: Dict[str, List[str]] = {}
+    for m in matches:
+        secrets_dict.setdefault(m.type, []).append(m.value)
+    for values in secrets_dict.values():
+        values.sort()
+    return secrets_dict
+
+def legacy_endpoints(endpoint_matches: Iterable[EndpointMatch]) -> Dict[str, List[str]]:
+    """Builds the legacy ``{type: sorted unique values}`` dict from endpoint matches."""
+    endpoints_dict: Dict[str, Set[str]] = {}
+    for m in endpoint_matches:
+        endpoints_dict.setdefault(m.type, set()).add(m.value)
+    return {k: sorted(v) for k, v in endpoints_dict.items()}
+
+class ScanResult:
+    """
+    Result of ``Scanner.scan``.
+
+    ``matches`` and ``endpoint_matches`` are the primary data. The legacy
+    ``secrets`` and ``endpoints`` dicts are only built when first accessed.
+    Behaves like the former ``NamedTuple`` of ``(secrets, endpoints, matches,
+    endpoint_matches)``: it unpacks, indexes, compares equal to that tuple and
+    has ``_fields``/``_asdict``; only indexing a legacy dict builds it.
+    """
+    __slots__ = ("matches", "endpoint_matches", "_secrets", "_endpoints")
+    _fields = ("secrets", "endpoints", "matches", "endpoint_matches")
+
+    def __init__(
+        self,
+        secrets: Optional[Dict[str, List[str]]] = None,
+        endpoints: Optional[Dict[str, List[str]]] = None,
+        matches: Optional[List[SecretMatch]] = None,
+        endpoint_matches: Optional[List[EndpointMatch]] = None
+    ):
+        self.matches = matches if matches is not None else []
+        self.endpoint_matches = endpoint_matches if endpoint_matches is not None else []
+        self._secrets = secrets
+        self._endpoints = endpoints
+
+    @property
+    def secrets(self) -> Dict[str, List[str]]: # Legacy
+        if self._secrets is None:
+            self._secrets = legacy_secrets(self.matches)
+        return self._secrets
+
+    @property
+    def endpoints(self) -> Dict[str, List[str]]: # Legacy
+        if self._endpoints is None:
+            self._endpoints = legacy_endpoints(self.endpoint_matches)
+        return self._endpoints
+
+    def _astuple(self) -> Tuple[Any, ...]:
+        return (self.secrets, self.endpoints, self.matches, self.endpoint_matches)
+
+    def __iter__(self):
+        return iter(self._astuple())
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self._astuple()[key]
+        return getattr(self, self._fields[key])
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (ScanResult, tuple)):
+            return self._astuple() == tuple(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return "ScanResult(" + ", ".join(f"{name}={value!r}" for name, value in zip(self._fields, self._astuple())) + ")"
+
+    def _asdict(self) -> Dict[str, Any]:
+        return dict(zip(self._fields, self._astuple()))
+
+class BatchResult(NamedTuple):
+    """Result of one item of ``Scanner.scan_many``, without the legacy dicts."""
+    id: Any
+    matches: List[SecretMatch]
     endpoint_matches: List[EndpointMatch]
+    error: Optional[str] = None
+
+BACKENDS = ("serial", "thread", "process")
+
+# Code kept in front of each literal for non-literal patterns under the lexer (key name, ":" or "=")
+KEY_PREFIX_SIZE = 64
+
+# Windows of ``Scanner.scan_chunks``: characters scanned past a window's own range, so
+# findings crossing it match whole, and in front of it, for lookbehinds and key prefixes
+CHUNK_OVERLAP = 64 * 1024
+CHUNK_LOOKBEHIND = 1024
+
+AUTH_KEYWORDS = ["login", "signin", "auth", "token", "password", "credential"]
+# Matched against the lowercased value, a case-insensitive alternation is several times slower
+_AUTH_KEYWORDS_RE = re.compile("|".join(AUTH_KEYWORDS))
+
+class LineIndex:
+    """
+    Maps character offsets of a content string to line/column and UTF-8 byte offsets.
+
+    Lookups are mostly increasing (each rule's matches come in order), so the
+    index keeps a cursor: the last looked-up offset with its line and line
+    start. A lookup counts the newlines between the cursor and the offset, and
+    searches for a line start only within that span, so the content is never
+    copied or split and a minified bundle (one multi-megabyte line) is as cheap
+    as an ordinary file. ``origin`` is the location of the content's first
+    character when it is a window of a larger text; locations are then
+    reported in that text.
+    """
+
+    def __init__(self, content: str, origin: Optional[Location] = None):
+        self.content = content
+        self.origin = origin
+        self._is_ascii = content.isascii()
+        # Cursor: last looked-up offset, its line and the offset its line starts at
+        self._pos = 0
+        self._line = 1
+        self._line_start = 0
+        # Last converted (char, byte) position
+        self._byte_char = 0
+        self._byte_pos = 0
+
+    def _seek(self, index: int):
+        content = self.content
+        if index >= self._pos:
+            newlines = content.count("\n", self._pos, index)
+            if newlines:
+                self._line += newlines
+                self._line_start = content.rfind("\n", self._pos, index) + 1
+        else:
+            newlines = content.count("\n", index, self._pos)
+            if newlines:
+                self._line -= newlines
+                self._line_start = content.rfind("\n", 0, index) + 1
+        self._pos = index
+
+    def location(self, index: int) -> Location:
+        self._seek(index)
+        line = self._line
+        column = index - self._line_start + 1
+        byte_offset = index if self._is_ascii else self.byte_offset(index)
+        origin = self.origin
+        if origin is None:
+            return Location(line, column, index, byte_offset)
+        if line == 1:
+            column += origin.column - 1
+        return Location(origin.line + line - 1, column, origin.index + index, origin.byte_offset + byte_offset)
+
+    def byte_offset(self, index: int) -> int:
+        if self._is_ascii:
+            return index
+        if index < self._byte_char:
+            self._byte_char = 0
+            self._byte_pos = 0
+        segment = self.content[self._byte_char:index]
+        self._byte_pos += len(segment.encode("utf-8", errors="surrogatepass"))
+        self._byte_char = index
+        return self._byte_pos
+
+    def context(self, start: int, end: int, size: int) -> str:
+        # Bounded snippet around a hit, never more than 2 * size chars of surrounding text
+        return self.content[max(0, start - size):end + size]
+
+def _advance(origin: Location, text: str) -> Location:
+    # Location of the character following ``text``, which starts at ``origin``
+    newlines = text.count("\n")
+    column = len(text) - text.rfind("\n") if newlines else origin.column + len(text)
+    size = len(text) if text.isascii() else len(text.encode("utf-8", errors="surrogatepass"))
+    return Location(origin.line + newlines, column, origin.index + len(text), origin.byte_offset + size)
 
 class Scanner:
     """
     Scans text content for defined patterns of secrets and endpoints.
+
+    Args:
+        context_size: Number of characters captured on each side of a secret
+            as a context snippet (0 disables snippets).
+        lexer: Lex content as JavaScript first and run literal-only patterns
+            (``PatternConfig.literal`` and all endpoint patterns) over the
+            string, template, regex and comment spans only; other patterns
+            also see ``KEY_PREFIX_SIZE`` characters of code in front of each
+            span. Secret matches are tagged with the syntax of their value.
+        decoder: A ``Decoder`` whose decoded runs (escapes, hex, base64) are
+            rescanned for secrets, within its per-file budgets.
+        engine: Regex backend the rules run on (see ``engines``); an engine
+            that is not installed falls back to ``re``.
+        file_type: A ``filetypes.FileType`` whose extractor picks the parts of
+            the content every rule runs on (like the lexer's spans, with key
+            prefixes for non-literal patterns) and whose rule subset is run.
+        rules: A ``rules.RuleSet`` of pack rules run next to the built-in
+            ones (a pack rule replaces the built-in rule with its id). Only
+            this scanner runs them; they travel with it to worker processes.
     """
 
+    def __init__(self, context_size: int = 0, lexer: bool = False, decoder: Optional[Decoder] = None,
+                 engine: str = RE, file_type: Optional[FileType] = None, rules: Optional[RuleSet] = None):
+        self.context_size = context_size
+        self.lexer = lexer
+        self.decoder = decoder
+        # Only the name is kept, so scanners stay picklable for process pools
+        self.engine = resolve_engine(engine)
+        self.file_type = file_type
+        self.rules = rules if not rules or isinstance(rules, RuleSet) else RuleSet(rules)
+
+    def _rules(self) -> CompiledRules:
+        if self.file_type is None:
+            return compile_rules(self.engine, rules=self.rules)
+        return compile_rules(self.engine, self.file_type.rules, self.file_type.exclude_rules, self.rules)
+
+    def literal_view(self, content: str) -> Optional[LiteralView]:
+        """
+        Extracts the file type's spans of ``content``, or lexes it if the lexer
+        is enabled. Pass the view to ``scan_secrets`` and ``scan_endpoint_index``
+        to extract or lex a file only once.
+        """
+        if self.file_type is not None and self.file_type.extractor != SCRIPT:
+            with trace.span("extract"):
+                return LiteralView(content, extract_spans(self.file_type.extractor, content, self.lexer))
+        if not self.lexer:
+            return None
+        with trace.span("lex"):
+            return LiteralView(content)
+
     def scan(self, content: str) -> ScanResult:
         """
         Scans the provided content string for secrets and endpoints.
         """
-        matches = self._scan_secrets_rich(content)
-        endpoint_matches = self._scan_endpoints_rich(content)
-        
-        # Backwards compatibility
-        secrets_dict = {}
-        for m in matches:
-            if m.type not in secrets_dict:
-                secrets_dict[m.type] = []
-            secrets_dict[m.type].append(m.value)
-        
-        endpoints_dict = {}
-        for m in endpoint_matches:
-            if m.type not in endpoints_dict:
-                endpoints_dict[m.type] = set()
-            endpoints_dict[m.type].add(m.value)
-            
-        endpoints_desc = {k: sorted(list(v)) for k, v in endpoints_dict.items()}
-
-        # Sort dicts
-        for k in secrets_dict:
-            secrets_dict[k].sort()
-
-        return ScanResult(
-            secrets=secrets_dict, 
-            endpoints=endpoints_desc, 
-            matches=matches,
-            endpoint_matches=endpoint_matches
-        )
+        matches, endpoint_matches = self.scan_matches(content)
+        return ScanResult(matches=matches, endpoint_matches=endpoint_matches)
+
+    def scan_matches(self, content: str) -> Tuple[List[SecretMatch], List[EndpointMatch]]:
+        """
+        Scans content and returns only the rich match lists (no legacy dicts).
+        """
+        index = LineIndex(content)
+        view = self.literal_view(content)
+        return self._scan_secrets_rich(content, index, view), self._scan_endpoints_rich(content, index, view)
+
+    def scan_secrets(self, content: str, view: Optional[LiteralView] = None) -> List[SecretMatch]:
+        """
+        Scans content for secrets only.
+        """
+        if view is None:
+            view = self.literal_view(content)
+        return self._scan_secrets_rich(content, view=view)
+
+    def scan_endpoint_index(
+        self,
+        content: str,
+        index: Optional[EndpointIndex] = None,
+        view: Optional[LiteralView] = None,
+        bounds: Optional[Tuple[int, int]] = None
+    ) -> EndpointIndex:
+        """
+        Collects endpoints into a deduplicating ``EndpointIndex`` instead of one
+        ``EndpointMatch`` per occurrence (no locations are computed). With
+        ``bounds`` only endpoints starting in that range of ``content`` are added.
+        """
+        if index is None:
+            index = EndpointIndex()
+        if view is None:
+            view = self.literal_view(content)
+        text = content if view is None else view.text
+        for name, pattern in self._rules().endpoints.items():
+            with trace.span(name, "endpoints"):
+                for match in pattern.finditer(text):
+                    if bounds is not None:
+                        start = match.start() if view is None else view.position(match.start())
+                        if not bounds[0] <= start < bounds[1]:
+                            continue
+                    candidate = self._extract_match_text(match)
+                    if candidate:
+                        index.add(name, candidate)
+        return index
+
+    def scan_chunks(self, chunks: Iterable[str], index: Optional[EndpointIndex] = None) -> List[SecretMatch]:
+        """
+        Scans a text given as consecutive ``chunks``, for content too large to
+        hold whole. Only one window (a chunk plus ``CHUNK_OVERLAP`` and
+        ``CHUNK_LOOKBEHIND`` characters around it) is held at a time. Findings
+        carry their locations in the whole text and come in the order ``scan``
+        would report them; endpoints are added to ``index``. A finding longer
+        than the overlap, or a lexer literal opened before its window's
+        lookbehind, may be split at a window edge.
+        """
+        if index is None:
+            index = EndpointIndex()
+        matches: List[SecretMatch] = []
+        origin = Location(1, 1, 0, 0)
+        window, start = "", 0
+        for chunk in chunks:
+            window += chunk
+            end = len(window) - CHUNK_OVERLAP
+            if end <= start:
+                continue
+            matches.extend(self._scan_window(window, origin, start, end, index))
+            keep = max(end - CHUNK_LOOKBEHIND, 0)
+            origin = _advance(origin, window[:keep])
+            window, start = window[keep:], end - keep
+        if window:
+            matches.extend(self._scan_window(window, origin, start, len(window), index))
+
+        rank = {name: i for i, name in enumerate(self._rules().secrets)}
+        # Like a whole scan: rule by rule in text order, then decoded runs in text order
+        matches.sort(key=lambda m: (1, m.index, rank.get(m.type, 0)) if m.encoding else (0, rank.get(m.type, 0), m.index))
+        return matches
+
+    def _scan_window(self, window: str, origin: Location, start: int, end: int,
+                     index: EndpointIndex) -> List[SecretMatch]:
+        # Findings starting in [start, end) of the window belong to it, the others to its neighbours
+        with trace.span("window"):
+            view = self.literal_view(window)
+            low, high = origin.index + start, origin.index + end
+            matches = [m for m in self._scan_secrets_rich(window, LineIndex(window, origin), view)
+                       if low <= m.index < high]
+            self.scan_endpoint_index(window, index, view, (start, end))
+        return matches
+
+    def scan_many(
+        self,
+        items: Iterable[Tuple[Any, Union[str, bytes]]],
+        backend: str = "serial",
+        max_workers: Optional[int] = None,
+        chunksize: Optional[int] = None,
+        executor: Optional[Executor] = None
+    ) -> Iterator[BatchResult]:
+        """
+        Lazily scans ``(id, content)`` pairs and yields a ``BatchResult`` per item, in input order.
+
+        Args:
+            items: Iterable of ``(id, str | bytes)``; bytes are decoded like local files.
+            backend: "serial", "thread" or "process". Regex matching holds the GIL,
+                so "process" is the backend that adds CPU parallelism.
+            max_workers: Pool size for a pool created by this call.
+            chunksize: Items sent to a worker per task (default 1 for threads, 16 for processes).
+            executor: An existing executor to reuse across calls instead of creating a pool.
+
+        Only a bounded window of items is in flight, so ``items`` may be an endless stream.
+        Per-item failures are reported in ``BatchResult.error`` instead of raising.
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {', '.join(BACKENDS)}")
+
+        if executor is None and backend == "serial":
+            for item_id, content in items:
+                yield self._scan_item(item_id, content)
+            return
+
+        is_process = isinstance(executor, ProcessPoolExecutor) or (executor is None and backend == "process")
+        if chunksize is None:
+            chunksize = 16 if is_process else 1
+        own_executor = executor is None
+        if own_executor:
+            pool_class = ProcessPoolExecutor if backend == "process" else ThreadPoolExecutor
+            executor = pool_class(max_workers=max_workers)
+        window = 2 * (max_workers or os.cpu_count() or 1)
+
+        pending = deque()
+        iterator = iter(items)
+        try:
+            while True:
+                batch = list(islice(iterator, chunksize))
+                if not batch:
+                    break
+                pending.append(executor.submit(_scan_batch, self, batch))
+                if len(pending) >= window:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+            if own_executor:
+                executor.shutdown(wait=True)
+
+    def _scan_item(self, item_id: Any, content: Union[str, bytes]) -> BatchResult:
+        with trace.span("scan_item", args={"item": str(item_id)} if trace.active() else None):
+            try:
+                if isinstance(content, bytes):
+                    with trace.span("decode"):
+                        content = decode_bytes(content)
+                matches, endpoint_matches = self.scan_matches(content)
+                return BatchResult(item_id, matches, endpoint_matches)
+            except Exception as e:
+                return BatchResult(item_id, [], [], str(e))
 
     def _get_location(self, content: str, start_index: int) -> Location:
-        # Calculate line and column
-        # This can be slow for very large files if done repeatedly.
-        # But for typical JS files it's fine.
-        line = content.count('\n', 0, start_index) + 1
-        last_newline = content.rfind('\n', 0, start_index)
-        if last_newline == -1:
-            column = start_index + 1
-        else:
-            column = start_index - last_newline
-        
-        return Location(line=line, column=column, index=start_index)
+        # Single lookup helper, scans use a shared LineIndex instead
+        line_start = content.rfind("\n", 0, start_index) + 1
+        prefix = content[:start_index] if not content.isascii() else None
+        return Location(
+            content.count("\n", 0, start_index) + 1,
+            start_index - line_start + 1,
+            start_index,
+            start_index if prefix is None else len(prefix.encode("utf-8", errors="surrogatepass"))
+        )
 
-    def _scan_secrets_rich(self, content: str) -> List[SecretMatch]:
+    def _scan_secrets_rich(
+        self,
+        content: str,
+        index: Optional[LineIndex] = None,
+        view: Optional[LiteralView] = None
+    ) -> List[SecretMatch]:
         matches_found = []
+        if index is None:
+            index = LineIndex(content)
+        rules = self._rules()
+        present = None
 
-        for name, config in SECRETS_PATTERNS.items():
+        for name, config in rules.secrets.items():
+            if config.keywords:
+                if present is None:
+                    present = rules.present_keywords(content.lower())
+                if present.isdisjoint(config.keywords):
+                    continue
             pattern = config.pattern
-            # Use finditer for location info
-            for match in pattern.finditer(content):
-                candidate = self._extract_match_text(match)
-                if candidate:
+            text_view = view
+            if view is not None and not config.literal:
+                text_view = view.widened(content, KEY_PREFIX_SIZE)
+            with trace.span(name, "secrets"):
+                # Use finditer for location info
+                for match in pattern.finditer(content if text_view is None else text_view.text):
+                    candidate = self._extract_match_text(match)
+                    if candidate:
+                        confidence = self._calculate_confidence(name, candidate, config.confidence)
+                        if self._validate_secret(name, candidate, confidence, config.entropy):
+                            if text_view is None:
+                                start, end = match.start(), match.end()
+                            else:
+                                # A match may span the newline joining two ranges, so map both ends
+                                start = text_view.position(match.start())
+                                end = text_view.position(match.end() - 1) + 1
+                            loc = index.location(start)
+                            context = None
+                            if self.context_size:
+                                context = index.context(start, end, self.context_size)
+                            syntax = None
+                            if view is not None:
+                                syntax = view.kind_at(start + self._value_offset(match))
+                            matches_found.append(SecretMatch(
+                                type=name,
+                                value=candidate,
+                                severity=config.severity,
+                                confidence=confidence,
+                                location=loc,
+                                context=context,
+                                syntax=syntax
+                            ))
+
+        if self.decoder is not None:
+            with trace.span("decoded secrets"):
+                matches_found.extend(self._scan_decoded(content, index, view))
+        return matches_found
+
+    def _scan_decoded(self, content: str, index: LineIndex, view: Optional[LiteralView]) -> List[SecretMatch]:
+        # Secrets in decoded text are reported at the encoded run they came from. No context
+        # snippet: masking could not hide the still-encoded secret in it.
+        matches_found = []
+        rules = self._rules()
+        text = content if view is None else view.text
+        for run in self.decoder.decode_runs(text):
+            start = run.start if view is None else view.position(run.start)
+            loc = None
+            present = None
+            for name, config in rules.secrets.items():
+                if config.keywords:
+                    if present is None:
+                        present = rules.present_keywords(run.text.lower())
+                    if present.isdisjoint(config.keywords):
+                        continue
+                for match in config.pattern.finditer(run.text):
+                    candidate = self._extract_match_text(match)
+                    if not candidate:
+                        continue
                     confidence = self._calculate_confidence(name, candidate, config.confidence)
-                    if self._validate_secret(name, candidate, confidence):
-                        loc = self._get_location(content, match.start())
-                        matches_found.append(SecretMatch(
-                            type=name,
-                            value=candidate,
-                            severity=config.severity,
-                            confidence=confidence,
-                            location=loc
-                        ))
-        
+                    if not self._validate_secret(name, candidate, confidence, config.entropy):
+                        continue
+                    if loc is None:
+                        loc = index.location(start)
+                    matches_found.append(SecretMatch(
+                        type=name,
+                        value=candidate,
+                        severity=config.severity,
+                        confidence=confidence,
+                        location=loc,
+                        syntax=None if view is None else view.kind_at(start),
+                        encoding=run.encoding
+                    ))
         return matches_found
 
-    def _scan_endpoints_rich(self, content: str) -> List[EndpointMatch]:
+    def _scan_endpoints_rich(
+        self,
+        content: str,
+        index: Optional[LineIndex] = None,
+        view: Optional[LiteralView] = None
+    ) -> List[EndpointMatch]:
         results = []
-        auth_keywords = ["login", "signin", "auth", "token", "password", "credential"]
-
-        for name, pattern in ENDPOINT_PATTERNS.items():
-            for match in pattern.finditer(content):
-                candidate = self._extract_match_text(match)
-                if candidate:
-                   loc = self._get_location(content, match.start())
-                   
-                   # Check for auth context in the value itself
-                   is_auth = any(k in candidate.lower() for k in auth_keywords)
-                   
-                   results.append(EndpointMatch(
-                       type=name,
-                       value=candidate,
-                       location=loc,
-                       is_auth=is_auth
-                   ))
-        
+        if index is None:
+            index = LineIndex(content)
+
+        for name, pattern in self._rules().endpoints.items():
+            with trace.span(name, "endpoints"):
+                for match in pattern.finditer(content if view is None else view.text):
+                    candidate = self._extract_match_text(match)
+                    if candidate:
+                       loc = index.location(match.start() if view is None else view.position(match.start()))
+
+                       # Check for auth context in the value itself
+                       is_auth = _AUTH_KEYWORDS_RE.search(candidate.lower()) is not None
+
+                       results.append(EndpointMatch(
+                           type=name,
+                           value=candidate,
+                           location=loc,
+                           is_auth=is_auth
+                       ))
+
         return results
 
     def _extract_match_text(self, match) -> str:
@@ -152,6 +629,14 @@ class Scanner:
             return next((g for g in match.groups() if g is not None), "")
         return match.group(0)
 
+    def _value_offset(self, match) -> int:
+        # Offset of the extracted value within the match (the first group that matched)
+        if match.groups():
+            for i, g in enumerate(match.groups(), 1):
+                if g is not None:
+                    return match.start(i) - match.start()
+        return 0
+
     def _extract_match(self, match) -> str:
         # Legacy support for internal method if needed, but we moved to `_extract_match_text` with regex match obj
         if isinstance(match, tuple):
@@ -170,7 +655,9 @@ class Scanner:
                 confidence = CONFIDENCE_LOW
         return confidence
 
-    def _validate_secret(self, name: str, value: str, confidence: str) -> bool:
+    def _validate_secret(self, name: str, value: str, confidence: str, min_entropy: Optional[float] = None) -> bool:
+        if min_entropy is not None and self._get_entropy(value) <= min_entropy:
+            return False
         if name == "Generic API Key":
              return self._get_entropy(value) > 3.0
         return True
@@ -181,6 +668,14 @@ class Scanner:
         prob = [float(value.count(c)) / len(value) for c in dict.fromkeys(list(value))]
         return -sum([p * math.log(p) / math.log(2.0) for p in prob])
 
+def _scan_batch(scanner: Scanner, batch: List[Tuple[Any, Union[str, bytes]]]) -> List[BatchResult]:
+    # Module level so process pools can pickle it
+    trace.worker_begin()
+    try:
+        return [scanner._scan_item(item_id, content) for item_id, content in batch]
+    finally:
+        trace.worker_end()
+
 def scan_content(content: str) -> ScanResult:
     scanner = Scanner()
     return scanner.scan(content)
@@ -0,0 +1,181 @@
+"""
+Deadline-aware scan ordering for ``--max-time``.
+
+When a scan may not finish within its budget, files most likely to hold
+secrets are scanned first. Files are ranked by cheap signals: prior findings
+recorded in a store, telling names and recent modification, then anchor
+literals in the first bytes of the files for as long as a small share of the
+budget allows. The scan stops between files at the deadline
+and reports how much it covered.
+"""
+import os
+import re
+import time
+from contextlib import closing
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from .directory import FileResult, read_ahead_limits, scan_file
+from .pipeline import READ_AHEAD_WORKERS, read_ahead
+from .engines import RE
+from .filetypes import FileType
+from .ignorer import Ignorer
+from .memory import MemoryBudget
+from .rules import RuleSet
+
+# Bytes read per file for the anchor prefilter
+PREFILTER_BYTES = 64 * 1024
+# Share of the time budget the anchor prefilter may spend before scanning starts
+PREFILTER_SHARE = 0.1
+
+# Literal prefixes of the secret patterns, and words (matched lowercased) that usually sit
+# next to credentials. Plain substring tests, a regex alternation is ~50x slower here.
+_ANCHORS = (b"AKIA", b"ASIA", b"A3T", b"AIza", b"xox", b"-----BEGIN", b"eyJ")
+_ANCHOR_WORDS = (b"apikey", b"api_key", b"access_token", b"accesstoken", b"auth_token",
+                 b"authtoken", b"client_secret", b"clientsecret", b"password", b"aws_secret")
+_NAME_RE = re.compile(r"(?i)config|\benv\b|\.env|environment|settings|secret|credential|token|auth|keys?\b")
+
+PRIOR_FINDING_SCORE = 8
+ANCHOR_SCORE = 4
+NAME_SCORE = 3
+RECENT_DAY_SCORE = 2
+RECENT_WEEK_SCORE = 1
+
+class Coverage:
+    """Files and bytes planned versus actually scanned."""
+
+    def __init__(self, files_total: Optional[int] = None, bytes_total: Optional[int] = None):
+        self.files_total = files_total
+        self.bytes_total = bytes_total
+        self.files_scanned = 0
+        self.bytes_scanned = 0
+        self.timed_out = False
+
+    def add(self, size: int):
+        self.files_scanned += 1
+        self.bytes_scanned += size
+
+    @property
+    def complete(self) -> bool:
+        return not self.timed_out
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Totals are unknown when the work list is streamed (history scans)
+        return {
+            "complete": self.complete,
+            "files_scanned": self.files_scanned,
+            "files_skipped": None if self.files_total is None else self.files_total - self.files_scanned,
+            "bytes_scanned": None if self.bytes_total is None else self.bytes_scanned,
+            "bytes_skipped": None if self.bytes_total is None else self.bytes_total - self.bytes_scanned
+        }
+
+def has_anchor(data: bytes) -> bool:
+    """Cheap prefilter: True if ``data`` contains a secret anchor literal."""
+    if any(anchor in data for anchor in _ANCHORS):
+        return True
+    lower = data.lower()
+    return any(word in lower for word in _ANCHOR_WORDS)
+
+def _file_has_anchor(path: str) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return has_anchor(f.read(PREFILTER_BYTES))
+    except OSError:
+        return False
+
+def file_priority(path: str, mtime: float, now: float, prior: Set[str], prefilter: bool = True) -> int:
+    """Scores a file; higher scores are scanned first."""
+    score = 0
+    if path in prior:
+        score += PRIOR_FINDING_SCORE
+    if _NAME_RE.search(os.path.basename(path)):
+        score += NAME_SCORE
+    age = now - mtime
+    if age < 86400:
+        score += RECENT_DAY_SCORE
+    elif age < 7 * 86400:
+        score += RECENT_WEEK_SCORE
+    if prefilter and _file_has_anchor(path):
+        score += ANCHOR_SCORE
+    return score
+
+class Deadline:
+    """A monotonic-clock deadline ``seconds`` from creation (never expires if None)."""
+
+    def __init__(self, seconds: Optional[float]):
+        self.at = None if seconds is None else time.monotonic() + seconds
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (at least 0), or None without a deadline."""
+        return None if self.at is None else max(self.at - time.monotonic(), 0.0)
+
+    def expired(self) -> bool:
+        return self.at is not None and time.monotonic() >= self.at
+
+def prioritize(files: Iterable[str], prior: Optional[Set[str]] = None, prefilter: bool = True,
+               now: Optional[float] = None, deadline: Optional[Deadline] = None) -> List[Tuple[str, int]]:
+    """
+    Returns ``(path, size)`` pairs, highest priority first; equal scores go
+    smallest first so more files fit in the budget, then by path.
+
+    Files are first ranked by the stat-only signals. The anchor prefilter then
+    reads files in that order for at most ``PREFILTER_SHARE`` of the time left
+    on ``deadline``; files it does not reach keep their stat-only score. Files
+    not yet stat'ed when the deadline expires are planned unranked, last.
+    """
+    prior = prior or set()
+    now = time.time() if now is None else now
+    ranked = []
+    unranked = []
+    for path in files:
+        if unranked or (deadline is not None and deadline.expired()):
+            unranked.append((path, 0))
+            continue
+        try:
+            st = os.stat(path)
+        except OSError:
+            # Scanned anyway so the error is reported like in a full scan
+            ranked.append((0, 0, path))
+            continue
+        score = file_priority(path, st.st_mtime, now, prior, prefilter=False)
+        ranked.append((-score, st.st_size, path))
+    ranked.sort()
+    if prefilter and ranked:
+        remaining = deadline.remaining() if deadline is not None else None
+        stop = None if remaining is None else time.monotonic() + remaining * PREFILTER_SHARE
+        for i, (score, size, path) in enumerate(ranked):
+            if stop is not None and time.monotonic() >= stop:
+                break
+            if size and _file_has_anchor(path):
+                ranked[i] = (score - ANCHOR_SCORE, size, path)
+        ranked.sort()
+    return [(path, size) for _, size, path in ranked] + unranked
+
+def scan_plan(
+    plan: List[Tuple[str, int]],
+    deadline: Deadline,
+    coverage: Coverage,
+    ignorer: Ignorer = None,
+    max_endpoints_per_file: Optional[int] = None,
+    hash_content: bool = False,
+    lexer: bool = False,
+    decode: bool = False,
+    engine: str = RE,
+    read_ahead_workers: int = READ_AHEAD_WORKERS,
+    file_types: Optional[Tuple[FileType, ...]] = None,
+    memory: Optional[MemoryBudget] = None,
+    rules: Optional[RuleSet] = None
+) -> Iterator[FileResult]:
+    """
+    Scans ``prioritize`` output in order until the deadline, recording coverage.
+    A file that has started is always finished. Files are read ahead as in
+    ``scan_directory``, within the ``memory`` budget; reads queued at the
+    deadline are cancelled. ``rules`` are passed on as to ``scan_file``.
+    """
+    limits = read_ahead_limits(memory, lexer, file_types)
+    with closing(read_ahead((path for path, _ in plan), read_ahead_workers, **limits)) as reads:
+        for path, size in plan:
+            if deadline.expired():
+                coverage.timed_out = True
+                return
+            coverage.add(size)
+            yield scan_file(path, ignorer, max_endpoints_per_file, hash_content, lexer, decode, engine, next(reads),
+                            file_types, memory, rules)
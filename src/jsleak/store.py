@@ -0,0 +1,305 @@
+"""
+Persistent SQLite findings store.
+
+Each run records its files, findings and endpoints so later runs and the
+``jsleak query`` command can answer cross-run questions with indexed lookups.
+Secret values are never written; findings are identified by a fingerprint
+(SHA-256 of type and value) and by the baseline signature.
+"""
+import hashlib
+import queue
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set
+from .version import __version__
+
+SQLITE_MAGIC = b"SQLite format 3\0"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    target TEXT NOT NULL,
+    version TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    files_scanned INTEGER,
+    secrets_found INTEGER,
+    endpoints_found INTEGER
+);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    path TEXT NOT NULL,
+    content_hash TEXT,
+    git_commit TEXT,
+    git_blob TEXT,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS findings (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    file_id INTEGER NOT NULL REFERENCES files(id),
+    type TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    signature TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    confidence TEXT NOT NULL,
+    line INTEGER,
+    col INTEGER,
+    occurrences INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS endpoints (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    file_id INTEGER NOT NULL REFERENCES files(id),
+    host TEXT NOT NULL,
+    type TEXT NOT NULL,
+    value TEXT NOT NULL,
+    occurrences INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_files_run ON files(run_id);
+CREATE INDEX IF NOT EXISTS idx_findings_fingerprint ON findings(fingerprint, run_id);
+CREATE INDEX IF NOT EXISTS idx_findings_run ON findings(run_id);
+CREATE INDEX IF NOT EXISTS idx_endpoints_host ON endpoints(host, run_id);
+"""
+
+class StoreError(Exception):
+    """Raised when the store cannot be opened or a query is invalid."""
+    pass
+
+def fingerprint(secret_type: str, value: str) -> str:
+    """Identifies a secret independently of where it was found."""
+    return hashlib.sha256(f"{secret_type}:{value}".encode("utf-8")).hexdigest()
+
+def is_store(path: str) -> bool:
+    """True if ``path`` is a SQLite database file."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(SQLITE_MAGIC)) == SQLITE_MAGIC
+    except OSError:
+        return False
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+def _host(origin: str) -> str:
+    return origin.split("://", 1)[1] if origin else ""
+
+class FindingsStore:
+    """
+    Writes scan results into a SQLite database.
+
+    Rows are buffered and each ``batch_size`` files are inserted with
+    ``executemany`` in one transaction on a writer thread (SQLite releases the
+    GIL), with the database in WAL mode, so recording overlaps with scanning.
+    File ids are assigned by SQLite as file rows are inserted, so concurrent
+    runs on one store never collide. ``start_run`` must be called before
+    ``add_result``; a failed write is raised as ``StoreError`` by the next
+    ``add_result``.
+    """
+
+    def __init__(self, path: str, batch_size: int = 500):
+        try:
+            self.conn = sqlite3.connect(path, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(_SCHEMA)
+        except sqlite3.DatabaseError as e:
+            raise StoreError(f"Cannot open store {path}: {e}")
+        self.batch_size = batch_size
+        self.run_id: Optional[int] = None
+        self._files: List[tuple] = []
+        self._findings: List[tuple] = []
+        self._endpoints: List[tuple] = []
+        self._batches: "queue.Queue" = queue.Queue(maxsize=2)
+        self._write_error: Optional[Exception] = None
+        self._writer = threading.Thread(target=self._write_batches, name="jsleak-store", daemon=True)
+        self._writer.start()
+
+    def start_run(self, target: str) -> int:
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO runs (target, version, started_at) VALUES (?, ?, ?)",
+                (target, __version__, _now())
+            )
+        self.run_id = cur.lastrowid
+        return self.run_id
+
+    def add_result(self, res: Dict[str, Any], signature=None):
+        """
+        Buffers one per-file result. ``signature(match, file)`` computes the
+        baseline signature (``BaselineManager.generate_signature``).
+        """
+        if self._write_error is not None:
+            raise StoreError(f"Cannot write to store: {self._write_error}")
+        # Rows refer to their file by its position in the batch until the writer knows its id
+        file_id = len(self._files)
+        path = res["file"]
+        self._files.append((
+            self.run_id, path, res.get("content_hash"),
+            res.get("commit"), res.get("blob"), res.get("error")
+        ))
+        # One row per distinct secret in a file, at its first location; bundles repeat secrets a lot
+        rows: Dict[tuple, list] = {}
+        for m in res.get("matches", []):
+            key = (m.type, m.value)
+            row = rows.get(key)
+            if row is None:
+                rows[key] = [
+                    self.run_id, file_id, m.type, fingerprint(m.type, m.value),
+                    signature(m, path) if signature else "",
+                    m.severity, m.confidence, m.line, m.column, 1
+                ]
+            else:
+                row[9] += 1
+        self._findings.extend(rows.values())
+        endpoint_index = res.get("endpoint_index")
+        if endpoint_index is not None:
+            for origin, endpoint_type, value, count in endpoint_index.by_origin():
+                self._endpoints.append((self.run_id, file_id, _host(origin), endpoint_type, value, count))
+        if len(self._files) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Hands the buffered rows to the writer thread."""
+        if self._files:
+            self._batches.put((self._files, self._findings, self._endpoints))
+            self._files, self._findings, self._endpoints = [], [], []
+
+    def _write_batches(self):
+        while True:
+            batch = self._batches.get()
+            if batch is None:
+                return
+            if self._write_error is not None:
+                continue
+            files, findings, endpoints = batch
+            try:
+                with self.conn:
+                    file_ids = [
+                        self.conn.execute(
+                            "INSERT INTO files (run_id, path, content_hash, git_commit, git_blob, error) VALUES (?, ?, ?, ?, ?, ?)",
+                            row
+                        ).lastrowid
+                        for row in files
+                    ]
+                    for row in findings:
+                        row[1] = file_ids[row[1]]
+                    endpoints = [(run_id, file_ids[i], *rest) for run_id, i, *rest in endpoints]
+                    self.conn.executemany(
+                        "INSERT INTO findings (run_id, file_id, type, fingerprint, signature, severity, confidence, line, col, occurrences)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        findings
+                    )
+                    self.conn.executemany(
+                        "INSERT INTO endpoints (run_id, file_id, host, type, value, occurrences) VALUES (?, ?, ?, ?, ?, ?)",
+                        endpoints
+                    )
+            except sqlite3.Error as e:
+                self._write_error = e
+
+    def _stop_writer(self):
+        if self._writer.is_alive():
+            self._batches.put(None)
+            self._writer.join()
+
+    def finish_run(self, stats: Dict[str, Any]):
+        self.flush()
+        self._stop_writer()
+        if self._write_error is not None:
+            raise StoreError(f"Cannot write to store: {self._write_error}")
+        with self.conn:
+            self.conn.execute(
+                "UPDATE runs SET finished_at = ?, files_scanned = ?, secrets_found = ?, endpoints_found = ? WHERE id = ?",
+                (_now(), stats.get("files_scanned", 0), stats.get("secrets_found", 0),
+                 stats.get("endpoints_found", 0), self.run_id)
+            )
+
+    def close(self):
+        self._stop_writer()
+        self.conn.close()
+
+class StoreReader:
+    """
+    Read-only queries over a findings store. All lookups go through indexes.
+    """
+
+    def __init__(self, path: str):
+        if not is_store(path):
+            raise StoreError(f"Not a jsleak store: {path}")
+        self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        self.conn.row_factory = sqlite3.Row
+
+    def close(self):
+        self.conn.close()
+
+    def runs(self) -> List[Dict[str, Any]]:
+        return [dict(r) for r in self.conn.execute("SELECT * FROM runs ORDER BY id")]
+
+    def resolve_run(self, value: str) -> int:
+        """
+        Resolves a run id, or an ISO date/time to the last run started before it.
+        """
+        if value.isdigit():
+            return int(value)
+        row = self.conn.execute(
+            "SELECT MAX(id) FROM runs WHERE started_at < ?", (value,)
+        ).fetchone()
+        return row[0] or 0
+
+    def latest_run(self) -> int:
+        return self.conn.execute("SELECT MAX(id) FROM runs").fetchone()[0] or 0
+
+    def new_since(self, since_run: int, run: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Findings of ``run`` (default: latest) whose fingerprint no run up to ``since_run`` had."""
+        if run is None:
+            run = self.latest_run()
+        rows = self.conn.execute("""
+            SELECT f.run_id, r.target, fl.path, fl.git_commit AS "commit", f.type, f.fingerprint,
+                   f.severity, f.confidence, f.line, f.col AS "column", f.occurrences
+            FROM findings f
+            JOIN files fl ON fl.id = f.file_id
+            JOIN runs r ON r.id = f.run_id
+            WHERE f.run_id = ? AND NOT EXISTS (
+                SELECT 1 FROM findings p WHERE p.fingerprint = f.fingerprint AND p.run_id <= ?
+            )
+            ORDER BY fl.path, f.line
+        """, (run, since_run))
+        return [dict(r) for r in rows]
+
+    def by_fingerprint(self, value: str) -> List[Dict[str, Any]]:
+        """Every recorded occurrence of a fingerprint, oldest run first."""
+        rows = self.conn.execute("""
+            SELECT f.run_id, r.target, r.started_at, fl.path, fl.git_commit AS "commit", f.type,
+                   f.severity, f.line, f.col AS "column", f.occurrences
+            FROM findings f
+            JOIN files fl ON fl.id = f.file_id
+            JOIN runs r ON r.id = f.run_id
+            WHERE f.fingerprint = ?
+            ORDER BY f.run_id, fl.path, f.line
+        """, (value,))
+        return [dict(r) for r in rows]
+
+    def by_host(self, host: str) -> List[Dict[str, Any]]:
+        """Endpoints on ``host`` grouped by target, with total occurrences and last run."""
+        rows = self.conn.execute("""
+            SELECT r.target, e.type, e.value, SUM(e.occurrences) AS occurrences,
+                   COUNT(DISTINCT e.file_id) AS files, MAX(e.run_id) AS last_run
+            FROM endpoints e
+            JOIN runs r ON r.id = e.run_id
+            WHERE e.host = ?
+            GROUP BY r.target, e.type, e.value
+            ORDER BY r.target, occurrences DESC, e.value
+        """, (host.lower(),))
+        return [dict(r) for r in rows]
+
+    def paths_with_findings(self) -> Set[str]:
+        """Paths that had at least one finding in any run."""
+        return {r[0] for r in self.conn.execute(
+            "SELECT DISTINCT fl.path FROM findings f JOIN files fl ON fl.id = f.file_id"
+        )}
+
+    def signatures(self) -> Set[str]:
+        """Baseline signatures of every recorded finding."""
+        return {r[0] for r in self.conn.execute("SELECT DISTINCT signature FROM findings WHERE signature != ''")}
@@ -0,0 +1,152 @@
+"""
+Chrome/Perfetto trace-event output for ``--trace``.
+
+``span(name)`` records a complete ("X") event for the enclosed block when
+tracing is active and returns a shared no-op context manager otherwise, so
+instrumented code costs one function call when tracing is off. Events are
+buffered per process and written to a part file next to the trace in batches.
+Worker processes of ``Scanner.scan_many`` find the trace path in the
+environment, record into their own buffer and flush after each batch.
+``stop`` merges every part into one JSON file for chrome://tracing or
+ui.perfetto.dev. Events carry the process and thread ids, so each worker
+shows up as its own track.
+"""
+import glob
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+TRACE_ENV = "JSLEAK_TRACE"
+# Events kept in memory before a process appends them to its part file
+FLUSH_EVENTS = 8192
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ("tracer", "name", "cat", "args", "start")
+
+    def __init__(self, tracer: "Tracer", name: str, cat: str, args: Optional[Dict[str, Any]]):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        self.tracer.add(self.name, self.cat, self.start, end - self.start, self.args)
+        return False
+
+class Tracer:
+    """Buffers trace events of one process and appends them to ``<path>.<pid>.part``."""
+
+    def __init__(self, path: str, process_name: str, worker: bool = False):
+        self.path = path
+        self.pid = os.getpid()
+        self.worker = worker
+        self.events: List[Dict[str, Any]] = [{
+            "name": "process_name", "ph": "M", "pid": self.pid, "tid": 0,
+            "args": {"name": f"{process_name} {self.pid}"}
+        }]
+        self._lock = threading.Lock()
+
+    def span(self, name: str, cat: str, args: Optional[Dict[str, Any]]) -> _Span:
+        return _Span(self, name, cat, args)
+
+    def add(self, name: str, cat: str, start_ns: int, duration_ns: int, args: Optional[Dict[str, Any]] = None):
+        event = {
+            "name": name, "cat": cat, "ph": "X",
+            # perf_counter is the system-wide monotonic clock, so workers line up with the main process
+            "ts": start_ns / 1000, "dur": duration_ns / 1000,
+            "pid": self.pid, "tid": threading.get_ident()
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            self.events.append(event)
+            full = len(self.events) >= FLUSH_EVENTS
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            events, self.events = self.events, []
+            if not events:
+                return
+            with open(f"{self.path}.{self.pid}.part", "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(e, separators=(",", ":")) + "\n" for e in events))
+
+_active: Optional[Tracer] = None
+
+def span(name: str, cat: str = "scan", args: Optional[Dict[str, Any]] = None):
+    """Context manager recording ``name`` as a trace event if tracing is active."""
+    tracer = _active
+    if tracer is None:
+        return _NULL_SPAN
+    return tracer.span(name, cat, args)
+
+def active() -> bool:
+    return _active is not None
+
+def start(path: str):
+    """Starts tracing this process and any worker processes it starts, writing to ``path``."""
+    global _active
+    for part in glob.glob(glob.escape(path) + ".*.part"):
+        os.remove(part)
+    _active = Tracer(path, "jsleak")
+    os.environ[TRACE_ENV] = path
+
+def worker_begin():
+    """
+    Called by worker processes before a batch: starts this process's own tracer
+    if the parent is tracing (a forked worker drops the copy of the parent's buffer).
+    """
+    global _active
+    path = os.environ.get(TRACE_ENV)
+    if path is None:
+        return
+    if _active is None or _active.pid != os.getpid():
+        _active = Tracer(path, "jsleak worker", worker=True)
+
+def worker_end():
+    """Called by worker processes after a batch: flushes this process's buffered events."""
+    if _active is not None and _active.worker:
+        _active.flush()
+
+def stop():
+    """Stops tracing and merges the part files of every process into the trace file."""
+    global _active
+    tracer = _active
+    if tracer is None:
+        return
+    _active = None
+    os.environ.pop(TRACE_ENV, None)
+    tracer.flush()
+    parts = sorted(glob.glob(glob.escape(tracer.path) + ".*.part"))
+    with open(tracer.path, "w", encoding="utf-8") as out:
+        out.write('{"displayTimeUnit":"ms","traceEvents":[')
+        first = True
+        for part in parts:
+            with open(part, encoding="utf-8") as f:
+                for line in f:
+                    line = line.rstrip("\n")
+                    if not line:
+                        continue
+                    out.write(line if first else "," + line)
+                    first = False
+            os.remove(part)
+        out.write("]}\n")
@@ -0,0 +1,360 @@
+"""
+Watch mode: rescan files as they change and report new or resolved findings.
+
+Change detection uses inotify on Linux (through ctypes, no extra dependency)
+and falls back to polling directory and file stats elsewhere. Both block between events, so
+an idle watch costs next to no CPU.
+"""
+import os
+import stat
+import sys
+import time
+import select
+import struct
+import ctypes
+import ctypes.util
+from collections import Counter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# inotify(7) event masks
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+_WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+               | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Files stat'ed per poll besides those of changed directories, for edits in place
+SWEEP_FILES = 1000
+# Directory mtimes this close to their listing time are not trusted (coarse timestamps)
+RACY_NS = 2 * 10**9
+
+class WatchError(Exception):
+    """Raised when a watcher backend cannot be set up."""
+    pass
+
+def _list_dirs(root: str, recursive: bool) -> List[str]:
+    if not recursive:
+        return [root]
+    dirs = []
+    for current, subdirs, _ in os.walk(root):
+        subdirs.sort()
+        dirs.append(current)
+    return dirs
+
+class InotifyWatcher:
+    """
+    Linux inotify backend. Watches every directory under ``root`` (plus the
+    parent directories of ``extra_files``) and reports changed paths.
+    """
+
+    def __init__(self, root: str, recursive: bool = False, extra_files: Iterable[str] = ()):
+        if not sys.platform.startswith("linux"):
+            raise WatchError("inotify is only available on Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise WatchError(f"inotify_init1 failed: {os.strerror(ctypes.get_errno())}")
+        self.recursive = recursive
+        self._dirs: Dict[int, str] = {}
+        self._extra = {os.path.abspath(f): f for f in extra_files}
+        if os.path.isdir(root):
+            for directory in _list_dirs(root, recursive):
+                self._add_watch(directory)
+        else:
+            self._add_watch(os.path.dirname(root) or ".")
+            self._extra[os.path.abspath(root)] = root
+        self._root_is_dir = os.path.isdir(root)
+        for path in list(self._extra.values()):
+            parent = os.path.dirname(path) or "."
+            if os.path.isdir(parent) and parent not in self._dirs.values():
+                self._add_watch(parent)
+
+    def _add_watch(self, directory: str):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), _WATCH_MASK)
+        if wd >= 0:
+            self._dirs[wd] = directory
+
+    def _read_events(self) -> Set[str]:
+        changed: Set[str] = set()
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    # Events were lost, report every watched directory as changed
+                    changed.update(self._dirs.values())
+                    continue
+                directory = self._dirs.get(wd)
+                if directory is None:
+                    continue
+                if mask & IN_IGNORED:
+                    del self._dirs[wd]
+                    continue
+                path = os.path.join(directory, name) if name else directory
+                if not self._root_is_dir and os.path.abspath(path) not in self._extra:
+                    continue
+                if mask & IN_ISDIR:
+                    if self.recursive and mask & (IN_CREATE | IN_MOVED_TO):
+                        # New subtree: watch it and report the files already inside
+                        for sub in _list_dirs(path, True):
+                            self._add_watch(sub)
+                            changed.update(os.path.join(sub, f) for f in os.listdir(sub))
+                    elif mask & (IN_DELETE | IN_MOVED_FROM):
+                        changed.add(path)
+                    continue
+                changed.add(path)
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        """Blocks until something changes (or ``timeout`` seconds pass) and returns changed paths."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        return self._read_events()
+
+    def close(self):
+        os.close(self.fd)
+
+class PollingWatcher:
+    """
+    Portable backend polling every ``interval`` seconds.
+
+    A poll stats the directories only. A directory whose mtime changed (an
+    entry was added, removed or renamed) is listed again and its files are
+    compared by ``(mtime, size)``. Files edited in place leave their
+    directory's mtime alone, so each poll also stats up to ``sweep`` known
+    files in rotation. ``extra_files`` are stat'ed on every poll.
+    """
+
+    def __init__(self, root: str, recursive: bool = False, extra_files: Iterable[str] = (),
+                 interval: float = 1.0, include: Optional[Callable[[str], bool]] = None,
+                 sweep: int = SWEEP_FILES):
+        self.root = root
+        self.recursive = recursive
+        self.extra_files = list(extra_files)
+        if not os.path.isdir(root):
+            self.extra_files.append(root)
+        self.interval = interval
+        self.include = include
+        self.sweep = sweep
+        # Directory -> (mtime when listed, wall clock time of the listing), its subdirectories and files
+        self._dirs: Dict[str, Tuple[int, int]] = {}
+        self._subdirs: Dict[str, List[str]] = {}
+        self._files: Dict[str, Dict[str, Tuple[int, int]]] = {}
+        self._extra: Dict[str, Optional[Tuple[int, int]]] = {}
+        self._rotation: Iterator[Tuple[str, str]] = iter(())
+        # The first poll only records the tree
+        self._poll()
+
+    def _list(self, directory: str, changed: Set[str]) -> List[str]:
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            names = []
+        subdirs = []
+        files = {}
+        for name in names:
+            path = os.path.join(directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if stat.S_ISDIR(st.st_mode):
+                subdirs.append(path)
+            elif not self.include or self.include(name):
+                files[path] = (st.st_mtime_ns, st.st_size)
+        old = self._files.get(directory, {})
+        changed.update(p for p in old.keys() | files.keys() if old.get(p) != files.get(p))
+        self._files[directory] = files
+        return sorted(subdirs)
+
+    def _poll_dirs(self, changed: Set[str]):
+        now = time.time_ns()
+        seen = set()
+        pending = [self.root] if os.path.isdir(self.root) else []
+        while pending:
+            directory = pending.pop()
+            try:
+                mtime = os.stat(directory).st_mtime_ns
+            except OSError:
+                continue
+            seen.add(directory)
+            known = self._dirs.get(directory)
+            # Listed again within the timestamp granularity of its last listing, the
+            # directory may have changed since without its mtime moving
+            if known is None or known[0] != mtime or mtime >= known[1] - RACY_NS:
+                self._subdirs[directory] = self._list(directory, changed)
+                self._dirs[directory] = (mtime, now)
+            if self.recursive:
+                pending.extend(self._subdirs[directory])
+        for directory in [d for d in self._dirs if d not in seen]:
+            changed.update(self._files.pop(directory, {}))
+            del self._dirs[directory]
+            del self._subdirs[directory]
+
+    def _poll_files(self, changed: Set[str]):
+        for path in self.extra_files:
+            try:
+                st = os.stat(path)
+                current = None if stat.S_ISDIR(st.st_mode) else (st.st_mtime_ns, st.st_size)
+            except OSError:
+                current = None
+            if path in self._extra and self._extra[path] != current:
+                changed.add(path)
+            self._extra[path] = current
+        checked = 0
+        while checked < self.sweep:
+            entry = next(self._rotation, None)
+            if entry is None:
+                # A new round over the files known now
+                self._rotation = iter([(d, p) for d in self._files for p in self._files[d]])
+                entry = next(self._rotation, None)
+                if entry is None:
+                    return
+            checked += 1
+            directory, path = entry
+            files = self._files.get(directory)
+            if files is None or path not in files:
+                continue
+            try:
+                st = os.stat(path)
+                current = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                # Gone: reported now, the directory listing catches up on its next change
+                del files[path]
+                changed.add(path)
+                continue
+            if files[path] != current:
+                files[path] = current
+                changed.add(path)
+
+    def _poll(self) -> Set[str]:
+        changed: Set[str] = set()
+        self._poll_dirs(changed)
+        self._poll_files(changed)
+        return changed
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            delay = self.interval if deadline is None else max(0.0, min(self.interval, deadline - time.monotonic()))
+            time.sleep(delay)
+            changed = self._poll()
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self):
+        pass
+
+def create_watcher(root: str, recursive: bool = False, extra_files: Iterable[str] = (),
+                   backend: str = "auto", interval: float = 1.0,
+                   include: Optional[Callable[[str], bool]] = None):
+    """
+    Returns an inotify watcher when available (``backend="auto"``/``"inotify"``), else a polling one.
+    """
+    if backend in ("auto", "inotify"):
+        try:
+            return InotifyWatcher(root, recursive, extra_files)
+        except (WatchError, OSError, AttributeError):
+            if backend == "inotify":
+                raise
+    return PollingWatcher(root, recursive, extra_files, interval, include)
+
+# A finding's identity for diffs; lines are left out so edits above a secret don't report it as new
+FindingKey = Tuple[str, str]
+
+class WatchSession:
+    """
+    Keeps per-file findings of a watched tree and turns change sets into diffs.
+
+    Args:
+        scan: Scans one path, returning the filtered matches (or None if the
+            path is not scannable or no longer exists).
+        list_files: Returns every scannable path of the tree.
+        on_diff: Called as ``on_diff(path, new_matches, resolved_keys)`` for each file that changed.
+        reload: Called before a full rescan when one of ``control_files`` changed.
+        control_files: Ignore/config/baseline files whose change triggers a reload.
+    """
+
+    def __init__(self, scan, list_files, on_diff, reload=None, control_files: Iterable[str] = ()):
+        self.scan = scan
+        self.list_files = list_files
+        self.on_diff = on_diff
+        self.reload = reload
+        self.control_files = {os.path.abspath(f) for f in control_files}
+        self.findings: Dict[str, Counter] = {}
+
+    def initial_scan(self):
+        """Records the findings already in the tree as the baseline for diffs, without reporting them."""
+        self._rescan(self.list_files(), report=False)
+
+    def handle(self, changed: Iterable[str]):
+        changed = set(changed)
+        if any(os.path.abspath(p) in self.control_files for p in changed):
+            if self.reload:
+                self.reload()
+            # Rules may include or exclude any file, rescan everything known or listed
+            self._rescan(set(self.list_files()) | set(self.findings))
+            return
+        self._rescan(sorted(changed))
+
+    def _rescan(self, paths: Iterable[str], report: bool = True):
+        paths = set(paths)
+        for path in list(paths):
+            if path not in self.findings and not os.path.isfile(path):
+                # A removed or moved directory is reported by its own path; resolve the files under it
+                prefix = path.rstrip(os.sep) + os.sep
+                paths.update(p for p in self.findings if p.startswith(prefix))
+        for path in sorted(paths):
+            matches = self.scan(path)
+            old = self.findings.get(path, Counter())
+            if matches is None:
+                self.findings.pop(path, None)
+                new_matches = []
+                current = Counter()
+            else:
+                current = Counter((m.type, m.value) for m in matches)
+                self.findings[path] = current
+                added = current - old
+                new_matches = []
+                for m in matches:
+                    key = (m.type, m.value)
+                    if added[key] > 0:
+                        added[key] -= 1
+                        new_matches.append(m)
+            resolved = list((old - current).elements())
+            if report and (new_matches or resolved):
+                self.on_diff(path, new_matches, resolved)
+
+    @property
+    def finding_count(self) -> int:
+        return sum(sum(c.values()) for c in self.findings.values())
+
+    def run(self, watcher, debounce: float = 0.3):
+        """Processes change bursts forever; a burst ends after ``debounce`` quiet seconds."""
+        while True:
+            changed = watcher.wait(None)
+            while changed:
+                more = watcher.wait(debounce)
+                if not more:
+                    break
+                changed |= more
+            if changed:
+                self.handle(changed)
@@ -0,0 +1,65 @@
+import unittest
+import io
+import json
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+from jsleak.checkpoint import CheckpointJournal, CheckpointError
+from jsleak.cli import main
+import jsleak.directory
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.src = os.path.join(self.test_dir, "src")
+        os.mkdir(self.src)
+        for i in range(6):
+            with open(os.path.join(self.src, f"f{i}.js"), "w") as f:
+                f.write(f"var k = 'AKIA{i:016d}'; fetch('https://api.example.com/v{i}');\n" * (i + 1))
+        self.journal = os.path.join(self.test_dir, "scan.ckpt")
+        self.config = os.path.join(self.test_dir, "none.yml")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _run(self, *extra):
+        with patch("sys.stdout", new_callable=io.StringIO) as out:
+            with self.assertRaises(SystemExit) as cm:
+                main([self.src, "--format", "json", "--config", self.config, *extra])
+        return cm.exception.code, out.getvalue()
+
+    def test_resume_matches_uninterrupted_run(self):
+        expected = self._run()
+        self.assertEqual(self._run("--checkpoint", self.journal), expected)
+
+        # Simulate a kill after two files, in the middle of writing the third record
+        with open(self.journal, "rb") as f:
+            lines = f.readlines()
+        self.assertEqual(len(lines), 7)
+        with open(self.journal, "wb") as f:
+            f.writelines(lines[:3])
+            f.write(lines[3][:20])
+
+        scanned = []
+        real_scan_file = jsleak.directory.scan_file
+        def counting_scan_file(path, *args):
+            scanned.append(os.path.basename(path))
+            return real_scan_file(path, *args)
+
+        with patch("jsleak.directory.scan_file", counting_scan_file):
+            self.assertEqual(self._run("--checkpoint", self.journal, "--resume"), expected)
+        self.assertEqual(scanned, ["f2.js", "f3.js", "f4.js", "f5.js"])
+        with open(self.journal, "rb") as f:
+            self.assertEqual(f.readlines(), lines)
+
+    def test_different_scan_rejected(self):
+        CheckpointJournal(self.journal, {"target": "a"}).close()
+        with self.assertRaises(CheckpointError):
+            CheckpointJournal(self.journal, {"target": "b"}, resume=True)
+        # Without resume the old journal is replaced
+        CheckpointJournal(self.journal, {"target": "b"}).close()
+        CheckpointJournal(self.journal, {"target": "b"}, resume=True).close()
+
+if __name__ == '__main__':
+    unittest.main()
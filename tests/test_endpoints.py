@@ -0,0 +1,84 @@
+import unittest
+import os
+import tempfile
+import shutil
+from jsleak.endpoints import EndpointIndex, normalize_endpoint
+from jsleak.directory import scan_directory
+
+class TestEndpointIndex(unittest.TestCase):
+    def test_normalize(self):
+        self.assertEqual(normalize_endpoint("HTTPS://API.Example.com:443/v1//users/?q=1"),
+                         ("https://api.example.com", ("v1", "users"), "?q=1"))
+        self.assertEqual(normalize_endpoint("http://a.com:8080"), ("http://a.com:8080", (), ""))
+        self.assertEqual(normalize_endpoint("/api/v2/user"), ("", ("api", "v2", "user"), ""))
+
+    def test_dedupe_and_count(self):
+        index = EndpointIndex()
+        for _ in range(3):
+            index.add("Absolute URL", "https://a.com/v1/x?y=1")
+        index.add("Absolute URL", "https://A.com/v1/x/?y=1")
+        index.add("Absolute URL", "https://a.com/v1")
+        index.add("Relative API Path", "/api/v1")
+        self.assertEqual(index.unique, 3)
+        self.assertEqual(index.total, 6)
+        self.assertEqual(list(index), [
+            ("Relative API Path", "/api/v1", 1),
+            ("Absolute URL", "https://a.com/v1", 1),
+            ("Absolute URL", "https://a.com/v1/x?y=1", 4),
+        ])
+
+    def test_reports_value_as_first_seen(self):
+        index = EndpointIndex()
+        index.add("Absolute URL", "HTTPS://API.Example.com:443/v1/users/")
+        index.add("Absolute URL", "https://api.example.com/v1/users")
+        index.add("Relative API Path", "/api//v2")
+        self.assertEqual(list(index), [
+            ("Relative API Path", "/api//v2", 1),
+            ("Absolute URL", "HTTPS://API.Example.com:443/v1/users/", 2),
+        ])
+        self.assertEqual(next(index.by_origin())[0], "")
+        total = EndpointIndex()
+        total.merge(index)
+        total.add("Absolute URL", "https://api.example.com/v1/users")
+        self.assertEqual(total.to_legacy()["Absolute URL"], ["HTTPS://API.Example.com:443/v1/users/"])
+        self.assertEqual(list(total.summary()["hosts"]), ["https://api.example.com", "(relative)"])
+
+    def test_cap(self):
+        index = EndpointIndex(max_endpoints=2)
+        self.assertTrue(index.add("Absolute URL", "https://a.com/1"))
+        self.assertTrue(index.add("Absolute URL", "https://a.com/2"))
+        self.assertFalse(index.add("Absolute URL", "https://a.com/3"))
+        self.assertTrue(index.add("Absolute URL", "https://a.com/1"))
+        self.assertEqual((index.unique, index.total, index.dropped), (2, 4, 1))
+
+    def test_merge_and_summary(self):
+        a = EndpointIndex()
+        a.add("Absolute URL", "https://a.com/v1/x")
+        a.add("Absolute URL", "https://b.com/v2/y")
+        b = EndpointIndex()
+        b.add("Absolute URL", "https://a.com/v1/x")
+        b.add("Absolute URL", "https://a.com/v1/z")
+        total = EndpointIndex(max_endpoints=10)
+        total.merge(a)
+        total.merge(b)
+        summary = total.summary()
+        self.assertEqual(summary["unique_endpoints"], 3)
+        host = summary["hosts"]["https://a.com"]
+        self.assertEqual(host["count"], 3)
+        self.assertEqual(host["prefixes"], {"/v1": 3})
+        self.assertEqual(host["endpoints"][0], {"type": "Absolute URL", "value": "https://a.com/v1/x", "count": 2})
+        self.assertEqual(list(summary["hosts"])[0], "https://a.com")
+
+    def test_directory_per_file_cap(self):
+        test_dir = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(test_dir, "a.js"), "w") as f:
+                f.write("\n".join(f'fetch("https://cdn.example.com/{i}")' for i in range(100)))
+            res = list(scan_directory(test_dir, max_endpoints_per_file=10))[0]
+            self.assertEqual(res["endpoint_index"].unique, 10)
+            self.assertEqual(len(res["endpoints"]["Absolute URL"]), 10)
+        finally:
+            shutil.rmtree(test_dir)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import os
+import json
+import tempfile
+import shutil
+from jsleak.scanner import Scanner, LineIndex
+from jsleak.directory import scan_directory
+from jsleak.reporter import Reporter
+from jsleak.sarif import generate_sarif
+
+class TestMinified(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.min_file = os.path.join(self.test_dir, "bundle.min.js")
+        with open(self.min_file, "w") as f:
+            f.write("var a=1;" * 1000 + 'var k="AKIA1234567890123456";' + "var b=2;" * 1000)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_minified_skipped_by_default(self):
+        self.assertEqual(list(scan_directory(self.test_dir)), [])
+
+    def test_include_minified(self):
+        results = list(scan_directory(self.test_dir, include_minified=True))
+        self.assertEqual(len(results), 1)
+        match = results[0]["matches"][0]
+        self.assertEqual(match["line"], 1)
+        self.assertEqual(match["column"], 8000 + len('var k="') + 1)
+        self.assertEqual(match["byte_offset"], 8000 + len('var k="'))
+        self.assertIn("AKIA1234567890123456", match["context"])
+        self.assertLessEqual(len(match["context"]), len("AKIA1234567890123456") + 80)
+
+    def test_line_index(self):
+        index = LineIndex("ab\ncd\n\nef")
+        loc = index.location(8)
+        self.assertEqual((loc.line, loc.column), (4, 2))
+        loc = index.location(0)
+        self.assertEqual((loc.line, loc.column), (1, 1))
+
+    def test_byte_offset_non_ascii(self):
+        content = 'var s="héllo";var k="AKIA1234567890123456";'
+        res = Scanner().scan(content)
+        match = res.matches[0]
+        self.assertEqual(match.location.index, content.index("AKIA"))
+        self.assertEqual(match.location.byte_offset, content.encode("utf-8").index(b"AKIA"))
+
+    def test_context_masked_in_json(self):
+        results = list(scan_directory(self.test_dir, include_minified=True))
+        from io import StringIO
+        import sys
+        captured = StringIO()
+        sys.stdout = captured
+        try:
+            Reporter("json").report(results, {})
+        finally:
+            sys.stdout = sys.__stdout__
+        output = json.loads(captured.getvalue())
+        entry = output[0]["secrets"]["AWS Access Key"][0]
+        self.assertNotIn("AKIA1234567890123456", entry["context"])
+        self.assertIn("byte_offset", entry)
+
+    def test_sarif_byte_offset(self):
+        results = list(scan_directory(self.test_dir, include_minified=True))
+        sarif = json.loads(generate_sarif(results))
+        region = sarif["runs"][0]["results"][0]["locations"][0]["physicalLocation"]["region"]
+        self.assertEqual(region["byteOffset"], results[0]["matches"][0]["byte_offset"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+from jsleak import pipeline
+from jsleak.pipeline import read_ahead
+from jsleak.fetcher import FetcherError
+from jsleak.directory import scan_directory
+
+class TestReadAhead(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.paths = []
+        for i in range(12):
+            path = os.path.join(self.test_dir, f"f{i:02}.js")
+            with open(path, "w") as f:
+                f.write(f"var k{i} = 'AKIAABCDEFGHIJKLMN{i:02}';" if i % 3 == 0 else "x" * 100)
+            self.paths.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_order_kept_with_uneven_reads(self):
+        real_read = pipeline.read_file_bytes
+        def slow_read(path):
+            time.sleep(random.random() * 0.01)
+            return real_read(path)
+        with patch("jsleak.pipeline.read_file_bytes", slow_read):
+            reads = list(read_ahead(self.paths + [os.path.join(self.test_dir, "missing.js")], workers=4))
+        self.assertEqual([r.path for r in reads[:-1]], self.paths)
+        self.assertIsNone(reads[0].error)
+        self.assertIsInstance(reads[-1].error, FetcherError)
+
+    def test_backpressure_in_bytes(self):
+        started = []
+        lock = threading.Lock()
+        def record(path):
+            with lock:
+                started.append(path)
+            return b"x"
+        paths = [p for p in self.paths if os.path.getsize(p) == 100]
+        with patch("jsleak.pipeline.read_file_bytes", record):
+            reads = read_ahead(paths, workers=4, max_bytes=250)
+            next(reads)
+            time.sleep(0.05)
+            # The yielded file plus two queued 100-byte files fit the budget
+            self.assertEqual(len(started), 2)
+            next(reads)
+            time.sleep(0.05)
+            self.assertEqual(len(started), 3)
+            reads.close()
+        with patch("jsleak.pipeline.read_file_bytes", record):
+            # A file larger than the budget is still read, alone
+            self.assertEqual(len(list(read_ahead(paths[:3], workers=2, max_bytes=10))), 3)
+
+    def test_scan_directory_results_match_sequential(self):
+        def summary(results):
+            return [(r["file"], [(m.type, m.value, m.index) for m in r["matches"]], r["size"]) for r in results]
+        sequential = summary(scan_directory(self.test_dir, read_ahead_workers=0))
+        self.assertEqual(len(sequential), 12)
+        self.assertEqual(summary(scan_directory(self.test_dir, read_ahead_workers=4)), sequential)
+
+if __name__ == '__main__':
+    unittest.main()
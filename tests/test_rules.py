@@ -0,0 +1,150 @@
+import unittest
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+from jsleak.rules import load_rules, RuleError
+from jsleak.patterns import SECRETS_PATTERNS
+from jsleak.pattern_utils import get_severity
+from jsleak.scanner import Scanner
+from jsleak.directory import scan_directory
+from jsleak.filetypes import resolve_file_types, FileTypeError
+from jsleak.cli import main
+
+PACK = """
+rules:
+  - id: Acme Token
+    regex: 'acme_[a-z0-9]{24}'
+    severity: critical
+    confidence: HIGH
+    keywords: [ACME_]
+    anchors: both
+  - id: Acme Session Secret
+    regex: '(?i)session_secret\\s*=\\s*"([A-Za-z0-9]{16,})"'
+    severity: MEDIUM
+    entropy: 3.0
+"""
+
+SOURCE = '''
+var t = "acme_0123456789abcdefghijklmn";
+var longer = "xacme_0123456789abcdefghijklmnop";
+session_secret = "aaaaaaaaaaaaaaaaaaaa";
+SESSION_SECRET = "q8Zr2LmX0pWv7YtN4kHs";
+'''
+
+class TestRulePacks(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.test_dir, "cache")
+        self.rules_dir = os.path.join(self.test_dir, "rules")
+        os.mkdir(self.rules_dir)
+        self._write_pack("acme.yml", PACK)
+        # The default cache directory, for loads that do not name one
+        cache_env = patch.dict(os.environ, {"JSLEAK_CACHE_DIR": self.cache_dir})
+        cache_env.start()
+        self.addCleanup(cache_env.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _write_pack(self, name, text):
+        with open(os.path.join(self.rules_dir, name), "w") as f:
+            f.write(text)
+
+    def _load(self):
+        return load_rules([self.rules_dir], cache_dir=self.cache_dir)
+
+    def test_rules_plug_into_scanner_and_severity(self):
+        rules = self._load()
+        self.assertEqual(get_severity("Acme Token", rules), "CRITICAL")
+        self.assertEqual(get_severity("Acme Token"), "LOW")
+        matches = Scanner(rules=rules).scan(SOURCE).matches
+        # Anchors skip the token inside a longer one, the entropy threshold drops "aaaa..."
+        self.assertEqual([(m.type, m.value, m.line) for m in matches], [
+            ("Acme Token", "acme_0123456789abcdefghijklmn", 2),
+            ("Acme Session Secret", "q8Zr2LmX0pWv7YtN4kHs", 5),
+        ])
+        self.assertEqual(Scanner(rules=rules).scan(SOURCE.replace("acme_", "acne_")).matches[0].type,
+                         "Acme Session Secret")
+        # Scanners without the packs, made before or after, never see them
+        self.assertNotIn("Acme Token", SECRETS_PATTERNS)
+        self.assertEqual(Scanner().scan(SOURCE).matches, [])
+
+    def test_directory_scans_keep_rule_sets_apart(self):
+        src = os.path.join(self.test_dir, "src")
+        os.mkdir(src)
+        with open(os.path.join(src, "app.js"), "w") as f:
+            f.write(SOURCE)
+        def found(**kwargs):
+            return [m.type for res in scan_directory(src, **kwargs) for m in res["matches"]]
+        self.assertEqual(found(), [])
+        self.assertEqual(found(rules=self._load()), ["Acme Token", "Acme Session Secret"])
+        self.assertEqual(found(), [])
+        # File types may pick pack rules only when given the packs
+        configured = {"js": {"rules": ["Acme Token"]}}
+        self.assertEqual(found(rules=self._load(), file_types=resolve_file_types(None, configured, self._load())),
+                         ["Acme Token"])
+        with self.assertRaises(FileTypeError):
+            resolve_file_types(None, configured)
+
+    def test_validation_errors(self):
+        bad_rules = [
+            ("- id: X\n  regex: '('\n", "invalid regex"),
+            ("- id: X\n  regex: 'a'\n  severity: URGENT\n", "severity"),
+            ("- id: X\n  regex: 'a'\n  entropy: high\n", "entropy"),
+            ("- id: X\n  regex: 'a*'\n", "empty string"),
+            ("- id: X\n  regex: 'a'\n  keyword: [a]\n", "unknown keys keyword"),
+            ("- id: X\n  regex: 'a'\n- id: X\n  regex: 'b'\n", "duplicate id"),
+        ]
+        for text, message in bad_rules:
+            self._write_pack("acme.yml", text)
+            with self.assertRaises(RuleError) as cm:
+                self._load()
+            self.assertIn(message, str(cm.exception))
+            self.assertIn("acme.yml", str(cm.exception))
+
+    def test_compiled_rules_cached_by_content(self):
+        first = self._load()
+        with patch("jsleak.rules.yaml.safe_load", side_effect=AssertionError("parsed again")):
+            cached = self._load()
+        self.assertEqual({n: (c.pattern.pattern, c.severity, c.entropy, c.keywords) for n, c in cached.items()},
+                         {n: (c.pattern.pattern, c.severity, c.entropy, c.keywords) for n, c in first.items()})
+        self._write_pack("acme.yml", PACK.replace("critical", "LOW"))
+        self.assertEqual(self._load()["Acme Token"].severity, "LOW")
+
+    def test_spawned_workers_receive_rules(self):
+        items = [(i, SOURCE) for i in range(2)]
+        with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as executor:
+            results = list(Scanner(rules=self._load()).scan_many(items, executor=executor))
+        self.assertEqual([[m.type for m in r.matches] for r in results],
+                         [["Acme Token", "Acme Session Secret"]] * 2)
+
+    def test_cli_rules_from_flag_and_config(self):
+        src = os.path.join(self.test_dir, "src")
+        os.mkdir(src)
+        with open(os.path.join(src, "app.js"), "w") as f:
+            f.write(SOURCE)
+        config = os.path.join(self.test_dir, "jsleak.yml")
+        with open(config, "w") as f:
+            f.write("rules:\n  - id: Session Var\n    regex: 'var longer'\n    severity: LOW\n")
+        with patch("sys.stdout", new_callable=io.StringIO) as out:
+            with self.assertRaises(SystemExit) as cm:
+                main([src, "--format", "json", "--config", config, "--rules", self.rules_dir,
+                      "--fail-on-severity", "CRITICAL"])
+        self.assertEqual(cm.exception.code, 2)
+        secrets = json.loads(out.getvalue())[0]["secrets"]
+        self.assertEqual(sorted(secrets), ["Acme Session Secret", "Acme Token", "Session Var"])
+
+        self._write_pack("broken.yaml", "rules: {}")
+        with patch("sys.stdout", new_callable=io.StringIO), patch("sys.stderr", new_callable=io.StringIO) as err:
+            with self.assertRaises(SystemExit) as cm:
+                main([src, "--config", config, "--rules", self.rules_dir])
+        self.assertEqual(cm.exception.code, 3)
+        self.assertIn("broken.yaml", err.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from jsleak import Scanner, BatchResult
+
+def _items(count):
+    for i in range(count):
+        yield (i, f"var k = 'AKIA{i:016d}'; fetch('https://api.example.com/{i}');")
+
+class TestScanMany(unittest.TestCase):
+    def _check(self, results, count):
+        self.assertEqual([r.id for r in results], list(range(count)))
+        for r in results:
+            self.assertIsInstance(r, BatchResult)
+            self.assertIsNone(r.error)
+            self.assertEqual(r.matches[0].value, f"AKIA{r.id:016d}")
+            self.assertEqual(len(r.endpoint_matches), 1)
+
+    def test_serial(self):
+        self._check(list(Scanner().scan_many(_items(10))), 10)
+
+    def test_thread_backend(self):
+        self._check(list(Scanner().scan_many(_items(50), backend="thread", max_workers=4)), 50)
+
+    def test_process_backend(self):
+        results = list(Scanner().scan_many(_items(40), backend="process", max_workers=2, chunksize=8))
+        self._check(results, 40)
+
+    def test_shared_executor(self):
+        scanner = Scanner()
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            for _ in range(2):
+                self._check(list(scanner.scan_many(_items(5), executor=pool)), 5)
+
+    def test_bytes_and_lazy(self):
+        def endless():
+            i = 0
+            while True:
+                yield (i, b"var k = 'AKIA0000000000000000';")
+                i += 1
+        results = Scanner().scan_many(endless(), backend="thread", max_workers=2)
+        first = [next(results) for _ in range(3)]
+        results.close()
+        self.assertEqual([r.id for r in first], [0, 1, 2])
+        self.assertEqual(first[0].matches[0].type, "AWS Access Key")
+
+    def test_item_error(self):
+        results = list(Scanner().scan_many([("bad", None)]))
+        self.assertIsNotNone(results[0].error)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            list(Scanner().scan_many([], backend="gpu"))
+
+if __name__ == '__main__':
+    unittest.main()
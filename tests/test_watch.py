@@ -0,0 +1,156 @@
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+from jsleak.watcher import WatchSession, PollingWatcher, InotifyWatcher, RACY_NS
+from jsleak.scanner import SecretMatch, Location
+
+def _match(value):
+    return SecretMatch("AWS Access Key", value, "HIGH", "HIGH", Location(1, 1, 0))
+
+class TestWatchSession(unittest.TestCase):
+    def setUp(self):
+        self.files = {"a.js": [_match("AKIA1")], "b.js": []}
+        self.diffs = []
+        self.reloads = 0
+
+        def reload():
+            self.reloads += 1
+
+        self.session = WatchSession(
+            scan=lambda p: self.files.get(p),
+            list_files=lambda: sorted(self.files),
+            on_diff=lambda p, new, resolved: self.diffs.append((p, [m.value for m in new], resolved)),
+            reload=reload,
+            control_files=[".jsleakignore"]
+        )
+
+    def test_initial_and_incremental(self):
+        # Findings already there are the baseline, not news
+        self.session.initial_scan()
+        self.assertEqual(self.diffs, [])
+        self.assertEqual(self.session.finding_count, 1)
+
+        self.files["a.js"] = [_match("AKIA1"), _match("AKIA2")]
+        self.files["b.js"] = [_match("AKIA1")]
+        self.session.handle({"a.js"})
+        self.assertEqual(self.diffs, [("a.js", ["AKIA2"], [])])
+        self.diffs.clear()
+
+        del self.files["a.js"]
+        self.session.handle({"a.js", "b.js"})
+        self.assertEqual(self.diffs, [
+            ("a.js", [], [("AWS Access Key", "AKIA1"), ("AWS Access Key", "AKIA2")]),
+            ("b.js", ["AKIA1"], []),
+        ])
+        self.assertEqual(self.session.finding_count, 1)
+
+    def test_removed_directory_resolves_its_files(self):
+        nested = os.path.join("sub", "c.js")
+        self.files[nested] = [_match("AKIA4")]
+        self.session.initial_scan()
+        del self.files[nested]
+        self.session.handle({"sub"})
+        self.assertEqual(self.diffs, [(nested, [], [("AWS Access Key", "AKIA4")])])
+        self.assertEqual(self.session.finding_count, 1)
+
+    def test_control_file_reloads(self):
+        self.session.initial_scan()
+        self.files["b.js"] = [_match("AKIA3")]
+        self.session.handle({os.path.abspath(".jsleakignore")})
+        self.assertEqual(self.reloads, 1)
+        self.assertEqual(self.diffs[-1], ("b.js", ["AKIA3"], []))
+
+class TestWatchers(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, "a.js")
+        with open(self.path, "w") as f:
+            f.write("var a = 1;")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _modify(self):
+        with open(self.path, "a") as f:
+            f.write("var b = 2;")
+
+    def test_polling(self):
+        watcher = PollingWatcher(self.test_dir, interval=0.01)
+        self.assertEqual(watcher.wait(0.02), set())
+        self._modify()
+        self.assertEqual(watcher.wait(1.0), {self.path})
+
+    def test_polling_lists_only_changed_directories(self):
+        sub = os.path.join(self.test_dir, "sub")
+        os.mkdir(sub)
+        watcher = PollingWatcher(self.test_dir, recursive=True, interval=0.01, sweep=0)
+        listed = []
+        real_list = watcher._list
+        def counting_list(directory, changed):
+            listed.append(directory)
+            return real_list(directory, changed)
+        watcher._list = counting_list
+        # Listings are trusted once their directory's mtime is older than the racy window
+        for directory in watcher._dirs:
+            mtime, _ = watcher._dirs[directory]
+            watcher._dirs[directory] = (mtime, mtime + 2 * RACY_NS)
+        self.assertEqual(watcher.wait(0.02), set())
+        self.assertEqual(listed, [])
+
+        new_file = os.path.join(sub, "b.js")
+        with open(new_file, "w") as f:
+            f.write("x")
+        self.assertEqual(watcher.wait(1.0), {new_file})
+        self.assertEqual(listed, [sub])
+        os.remove(self.path)
+        self.assertIn(self.path, watcher.wait(1.0))
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify is Linux only")
+    def test_inotify(self):
+        watcher = InotifyWatcher(self.test_dir, recursive=True)
+        try:
+            self.assertEqual(watcher.wait(0.01), set())
+            self._modify()
+            self.assertIn(self.path, watcher.wait(1.0))
+            sub = os.path.join(self.test_dir, "sub")
+            os.mkdir(sub)
+            watcher.wait(1.0)
+            new_file = os.path.join(sub, "b.js")
+            with open(new_file, "w") as f:
+                f.write("x")
+            self.assertIn(new_file, watcher.wait(1.0))
+        finally:
+            watcher.close()
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify is Linux only")
+    def test_directory_moved_away_resolves_its_files(self):
+        sub = os.path.join(self.test_dir, "sub")
+        os.mkdir(sub)
+        nested = os.path.join(sub, "b.js")
+        with open(nested, "w") as f:
+            f.write("x")
+        diffs = []
+        session = WatchSession(
+            scan=lambda p: [_match("AKIA5")] if p == nested and os.path.isfile(p) else None,
+            list_files=lambda: [nested],
+            on_diff=lambda p, new, resolved: diffs.append((p, resolved))
+        )
+        session.initial_scan()
+        watcher = InotifyWatcher(self.test_dir, recursive=True)
+        outside = tempfile.mkdtemp()
+        try:
+            # Only the directory itself is reported, not the files it took along
+            os.rename(sub, os.path.join(outside, "sub"))
+            changed = watcher.wait(1.0)
+            self.assertEqual(changed, {sub})
+            session.handle(changed)
+        finally:
+            watcher.close()
+            shutil.rmtree(outside)
+        self.assertEqual(diffs, [(nested, [("AWS Access Key", "AKIA5")])])
+        self.assertEqual(session.finding_count, 0)
+
+if __name__ == '__main__':
+    unittest.main()